@@ -6,8 +6,21 @@ Supports both individual agents and group chat participation
 import asyncio
 import json
 import logging
-from typing import Any, Optional, List, Dict
+import time
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, List, Dict, Tuple, Type, TypeVar
+from pydantic import BaseModel
 from app.config import ModelClientFactory, Config
+from app.llm_cache import ResponseCache, get_response_cache
+from app.single_flight import SingleFlight
+from app.rate_limiter import RateLimiterRegistry, estimate_tokens
+from app.hedging import HedgeStats, LatencyTracker, run_hedged
+from app.metrics import observe_request, observe_usage, observe_structured_output
+from app.retry_policy import (
+    RetryPolicy, classify_error, classify_message, retry_after_seconds,
+    RATE_LIMIT, BAD_REQUEST, INVALID_OUTPUT, UNKNOWN
+)
+from app.structured_output import StructuredOutputError, parse_structured, repair_prompt
 
 # Import AutoGen components
 try:
@@ -20,20 +33,70 @@ except Exception:
     except Exception as e:
         raise ImportError("Could not import AssistantAgent.") from e
 
+try:
+    from autogen_core.model_context import UnboundedChatCompletionContext
+    from autogen_core.models import AssistantMessage, UserMessage
+except Exception:
+    UnboundedChatCompletionContext = None
+
+try:
+    from autogen_agentchat.base import TaskResult
+    from autogen_agentchat.messages import ModelClientStreamingChunkEvent
+except Exception:
+    ModelClientStreamingChunkEvent = None
+
 logger = logging.getLogger(__name__)
 
+# Shared by every agent instance so that e.g. two /match_score requests
+# (each with its own EvaluatorAgent) still coalesce
+request_coalescer = SingleFlight("agent_requests")
+
+# Hedging counters for every agent
+hedge_stats = HedgeStats()
+
+T = TypeVar("T", bound=BaseModel)
+
+
+class AgentCallError(Exception):
+    """Raised when a model call fails after the retry policy gave up"""
+    
+    def __init__(
+        self,
+        message: str,
+        kind: str = UNKNOWN,
+        attempts: int = 1,
+        provider: Optional[str] = None
+    ):
+        super().__init__(message)
+        self.kind = kind
+        self.attempts = attempts
+        self.provider = provider
+
+
+class StreamInterruptedError(AgentCallError):
+    """Raised when a stream fails after part of the response was yielded (never retried)"""
+
 
 class BaseAgent:
     """
     Enhanced base class for all interview agents.
     Supports both individual operation and group chat participation.
+    
+    By default every ``ask`` is stateless: the model sees only the system
+    message plus the call's own prompt/context, so singleton agents shared
+    by all sessions keep a flat per-call prompt size. Passing ``session_id``
+    opts that call into session-scoped memory.
     """
     
+    # Recent call latencies per agent name (shared by instances of an agent)
+    _latency_trackers: Dict[str, LatencyTracker] = {}
+    
     def __init__(
         self, 
         name: str, 
         system_message: str,
-        description: Optional[str] = None
+        description: Optional[str] = None,
+        stateless: Optional[bool] = None
     ):
         """
         Initialize a base agent with AutoGen capabilities.
@@ -42,6 +105,8 @@ class BaseAgent:
             name: Agent name (e.g., "CodingAgent")
             system_message: Instructions for the agent
             description: Brief description for group chat context
+            stateless: Build a fresh model context per call
+                (defaults to Config.AGENT_STATELESS)
         """
         logger.info("=" * 60)
         logger.info(f"🤖 Creating {name}")
@@ -52,6 +117,7 @@ class BaseAgent:
         model_client = ModelClientFactory.get_client()
         
         # Create the Autogen agent with enhanced configuration
+        # (used directly by group chats and by the stateful mode)
         self.agent = AssistantAgent(
             name=name,
             system_message=system_message,
@@ -66,29 +132,63 @@ class BaseAgent:
         self.error_count = 0
         self.conversation_history: List[Dict] = []
         
+        if stateless is None:
+            stateless = Config.AGENT_STATELESS
+        if stateless and UnboundedChatCompletionContext is None:
+            logger.warning("⚠️ autogen_core model contexts unavailable - falling back to stateful mode")
+            stateless = False
+        self.stateless = stateless
+        self._session_memory: Dict[str, List[Dict]] = {}
+        
         logger.info(f"✅ {name} created successfully")
         logger.info(f"📊 Using provider: {Config.CURRENT_PROVIDER}")
+        logger.info(f"🧠 Invocation mode: {'stateless' if self.stateless else 'stateful'}")
         logger.info("=" * 60)
     
     async def ask(
         self, 
         prompt: str, 
         retry_on_failure: bool = True,
-        context: Optional[List[Dict]] = None
+        context: Optional[List[Dict]] = None,
+        session_id: Optional[str] = None,
+        use_cache: bool = True,
+        hedge: Optional[bool] = None,
+        raise_on_error: bool = False,
+        method: Optional[str] = None,
+        output_schema: Optional[Type[BaseModel]] = None
     ) -> str:
         """
         Send a prompt to the agent and get a response.
-        Automatically handles failover if API quota is exceeded.
+        Transient errors are retried with backoff (rate limits also fail
+        over to the backup provider).
+        Identical stateless calls are served from the response cache, and
+        identical concurrent calls share a single provider request.
         
         Args:
             prompt: The question/task for the agent
-            retry_on_failure: Whether to retry with backup API on failure
+            retry_on_failure: Whether to retry transient failures
             context: Optional conversation context
+                (list of {"role": ..., "content": ...} dicts)
+            session_id: Opt into session-scoped memory; earlier turns of
+                this session are replayed to the model
+            use_cache: Set False for calls that must be answered fresh
+                (no cached response, no sharing with identical
+                concurrent calls), e.g. question generation
+            hedge: Race slow calls against the backup provider
+                (defaults to Config.HEDGE_ENABLED)
+            raise_on_error: Raise AgentCallError instead of returning an
+                "ERROR..." string when the call fails
+            method: Caller name for the metrics (e.g. "evaluate")
+            output_schema: Pydantic model to request as native structured
+                output where the provider supports it. Only responses that
+                match it are cached.
             
         Returns:
             Agent's response as string
         """
         self.call_count += 1
+        method = method or "ask"
+        start = time.monotonic()
         
         logger.info("─" * 60)
         logger.info(f"🤖 {self.name} - Call #{self.call_count}")
@@ -98,88 +198,630 @@ class BaseAgent:
         logger.info("─" * 60)
         
         # Store in conversation history
-        self.conversation_history.append({
-            "role": "user",
-            "content": prompt
-        })
+        self._record_history("user", prompt)
+        
+        # Only stateless calls without session memory are shareable
+        # (cacheable and coalescable)
+        shareable = self.stateless and session_id is None and use_cache
+        # Look up the answer of the provider the call would be routed to
+        route = ModelClientFactory.peek_route()
+        request_key = self._cache_key(prompt, context, route, output_schema) if shareable else None
+        
+        cache = get_response_cache() if shareable else None
+        if cache is not None:
+            cached = await cache.get(request_key)
+            if cached is not None:
+                logger.info(f"🎯 {self.name} served from cache")
+                self._record_history("assistant", cached)
+                observe_request(self.name, method, route, "hit", "success", time.monotonic() - start)
+                return cached
+        cache_state = "miss" if cache is not None else "bypass"
         
         try:
-            # Attempt to call the agent
-            logger.debug(f"⏳ Sending request to {Config.CURRENT_PROVIDER}...")
-            result = await self.agent.run(task=prompt)
+            if request_key is not None and Config.SINGLE_FLIGHT_ENABLED:
+                # Identical concurrent requests wait on one provider call
+                response, provider = await request_coalescer.do(
+                    request_key,
+                    lambda: self._call_model(
+                        prompt, context, session_id, retry_on_failure, hedge, method, output_schema
+                    )
+                )
+            else:
+                response, provider = await self._call_model(
+                    prompt, context, session_id, retry_on_failure, hedge, method, output_schema
+                )
+        except AgentCallError as e:
+            self._record_history("assistant", str(e))
+            observe_request(self.name, method, e.provider, cache_state, "error", time.monotonic() - start)
+            if raise_on_error:
+                raise
+            return str(e)
+        
+        observe_request(self.name, method, provider, cache_state, "success", time.monotonic() - start)
+        self._record_history("assistant", response)
+        self._remember(session_id, prompt, response)
+        if cache is not None and (output_schema is None or parse_structured(response, output_schema) is not None):
+            # Key the entry under the provider that answered
+            await cache.set(self._cache_key(prompt, context, provider, output_schema), response)
+        
+        return response
+    
+    async def ask_structured(
+        self,
+        prompt: str,
+        schema: Type[T],
+        context: Optional[List[Dict]] = None,
+        session_id: Optional[str] = None,
+        use_cache: bool = True,
+        method: Optional[str] = None
+    ) -> T:
+        """
+        Ask for a response matching a pydantic schema.
+        
+        Uses the provider's native structured output where supported and
+        falls back to JSON requested in the prompt. A response that still
+        doesn't validate gets one repair call before giving up.
+        
+        Args:
+            prompt: The question/task for the agent (should describe the JSON)
+            schema: Pydantic model the response must match
+            context: Optional conversation context
+            session_id: Opt into session-scoped memory
+            use_cache: Set False for calls that must be answered fresh
+            method: Caller name for the metrics (e.g. "evaluate")
             
-            # Extract response
-            response = self._extract_response(result)
+        Returns:
+            The validated schema instance
             
-            # Store response in history
-            self.conversation_history.append({
-                "role": "assistant",
-                "content": response
-            })
+        Raises:
+            AgentCallError: If the model call fails
+            StructuredOutputError: If the response can't be parsed even after repair
+        """
+        method = method or "ask"
+        options = dict(context=context, session_id=session_id, use_cache=use_cache,
+                       raise_on_error=True, method=method)
+        
+        try:
+            raw = await self.ask(prompt, output_schema=schema, **options)
+        except AgentCallError as e:
+            if e.kind not in (INVALID_OUTPUT, BAD_REQUEST):
+                raise
+            # The native response didn't validate, or the provider rejected
+            # the schema: ask for JSON in the prompt instead
+            logger.warning(f"⚠️ {self.name} structured output failed ({e.kind}) - retrying as plain JSON")
+            raw = await self.ask(prompt, **options)
+        
+        parsed = parse_structured(raw, schema)
+        if parsed is not None:
+            observe_structured_output(self.name, method, "valid")
+            return parsed
+        
+        return await self.repair_structured(raw, schema, method)
+    
+    async def repair_structured(self, raw: str, schema: Type[T], method: Optional[str] = None) -> T:
+        """
+        Make one repair call for a response that didn't match its schema.
+        
+        Args:
+            raw: The invalid response
+            schema: Pydantic model the response must match
+            method: Caller name for the metrics
             
-            logger.info(f"✅ {self.name} responded successfully")
-            logger.info(f"📤 Response length: {len(response)} characters")
-            logger.debug(f"📤 Response preview: {response[:200]}...")
-            logger.info("─" * 60)
+        Returns:
+            The validated schema instance
             
-            return response
+        Raises:
+            AgentCallError: If the repair call fails
+            StructuredOutputError: If the repaired response still doesn't match
+        """
+        method = method or "ask"
+        logger.warning(f"🔧 {self.name} response didn't match {schema.__name__} - requesting a repair")
+        repaired = await self.ask(
+            repair_prompt(raw, schema), output_schema=schema, use_cache=False,
+            raise_on_error=True, method=method
+        )
+        parsed = parse_structured(repaired, schema)
+        if parsed is not None:
+            observe_structured_output(self.name, method, "repaired")
+            return parsed
+        
+        observe_structured_output(self.name, method, "failed")
+        logger.error(f"❌ {self.name} response still doesn't match {schema.__name__} after repair")
+        raise StructuredOutputError(f"Response did not match {schema.__name__}", raw=raw)
+    
+    async def ask_stream(
+        self,
+        prompt: str,
+        context: Optional[List[Dict]] = None,
+        session_id: Optional[str] = None,
+        use_cache: bool = True,
+        raise_on_error: bool = False,
+        method: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Streaming variant of ask: yields response text as the model
+        generates it (via AutoGen's run_stream).
+        
+        Each attempt streams under the same retry policy, rate limiter and
+        single-flight as ask, so failures before the first chunk are retried
+        (or fail over); once text has been yielded the error is raised.
+        Cache hits, stateful agents and callers joining an identical call
+        in flight yield the whole response at once.
+        
+        Args:
+            prompt: The question/task for the agent
+            context: Optional conversation context
+            session_id: Opt into session-scoped memory
+            use_cache: Set False for calls that must be answered fresh
+            raise_on_error: Raise AgentCallError instead of yielding an
+                "ERROR..." string when the call fails
+            method: Caller name for the metrics (e.g. "evaluate")
+            
+        Yields:
+            Chunks of the response text
+        """
+        self.call_count += 1
+        method = method or "ask"
+        start = time.monotonic()
+        
+        logger.info("─" * 60)
+        logger.info(f"🤖 {self.name} - Call #{self.call_count} (streaming)")
+        logger.info(f"📝 Prompt: {prompt[:150]}...")
+        logger.info("─" * 60)
+        
+        self._record_history("user", prompt)
+        
+        shareable = self.stateless and session_id is None
+        cache = get_response_cache() if (use_cache and shareable) else None
+        route = ModelClientFactory.peek_route()
+        if cache is not None:
+            cached = await cache.get(self._cache_key(prompt, context, route))
+            if cached is not None:
+                logger.info(f"🎯 {self.name} served from cache")
+                self._record_history("assistant", cached)
+                observe_request(self.name, method, route, "hit", "success", time.monotonic() - start)
+                yield cached
+                return
+        cache_state = "miss" if cache is not None else "bypass"
+        
+        chunks: asyncio.Queue = asyncio.Queue()
+        invoke = None
+        if self.stateless and ModelClientStreamingChunkEvent is not None:
+            async def invoke(provider: str, generation: int) -> Tuple[str, str]:
+                # One streamed attempt under _call_model's retry policy
+                streamed = False
+                try:
+                    # aclosing releases the provider promptly if the call is cancelled
+                    stream_call = self._stream_on(provider, generation, prompt, context, session_id, method)
+                    async with aclosing(stream_call) as stream:
+                        async for kind, text in stream:
+                            if kind == "result":
+                                return text, provider
+                            streamed = True
+                            chunks.put_nowait(text)
+                except Exception as e:
+                    if not streamed:
+                        raise
+                    self.error_count += 1
+                    raise StreamInterruptedError(
+                        f"ERROR_CALLING_AGENT: {str(e)}", kind=classify_error(e), provider=provider
+                    ) from e
+        
+        def call_model():
+            return self._call_model(prompt, context, session_id, True, method=method, invoke=invoke)
+        
+        if cache is not None and Config.SINGLE_FLIGHT_ENABLED:
+            # Identical concurrent requests (streamed or not) wait on one
+            # provider call; only the caller that started it gets chunks
+            call = asyncio.ensure_future(request_coalescer.do(self._cache_key(prompt, context, route), call_model))
+        else:
+            call = asyncio.ensure_future(call_model())
+        
+        streamed = False
+        try:
+            while not call.done() or not chunks.empty():
+                if chunks.empty():
+                    getter = asyncio.ensure_future(chunks.get())
+                    await asyncio.wait({call, getter}, return_when=asyncio.FIRST_COMPLETED)
+                    if not getter.done():
+                        getter.cancel()
+                        continue
+                    text = getter.result()
+                else:
+                    text = chunks.get_nowait()
+                streamed = True
+                yield text
+            response, provider = call.result()
+        except AgentCallError as e:
+            self._record_history("assistant", str(e))
+            observe_request(self.name, method, e.provider, cache_state, "error", time.monotonic() - start)
+            if streamed or raise_on_error:
+                raise
+            yield str(e)
+            return
+        finally:
+            # The consumer stopped reading early: stop waiting on the call
+            # (a shared one runs on for the callers joined to it)
+            call.cancel()
+        if not streamed:
+            yield response
+        
+        logger.info(f"✅ {self.name} finished streaming ({len(response)} characters)")
+        observe_request(self.name, method, provider, cache_state, "success", time.monotonic() - start)
+        self._record_history("assistant", response)
+        self._remember(session_id, prompt, response)
+        if cache is not None:
+            await cache.set(self._cache_key(prompt, context, provider), response)
+    
+    async def _stream_on(
+        self,
+        provider: str,
+        generation: int,
+        prompt: str,
+        context: Optional[List[Dict]] = None,
+        session_id: Optional[str] = None,
+        method: str = "ask"
+    ) -> AsyncIterator[Tuple[str, str]]:
+        """
+        Stream one call from one provider and report the outcome to its
+        circuit breaker.
+        
+        Yields:
+            ("chunk", text) per streamed delta, then ("result", full response)
+        """
+        history = self._call_history(context, session_id)
+        agent = self._build_agent(history, provider, stream=True)
+        limiter = RateLimiterRegistry.get(provider)
+        estimated = estimate_tokens(self.system_message, prompt, *(str(h.get("content", "")) for h in history))
         
+        result = None
+        try:
+            async with limiter.acquire(estimated):
+                async for message in agent.run_stream(task=prompt):
+                    if isinstance(message, ModelClientStreamingChunkEvent):
+                        if message.content:
+                            yield "chunk", message.content
+                    elif isinstance(message, TaskResult):
+                        result = message
+        except (asyncio.CancelledError, GeneratorExit):
+            # Cancelled, or the consumer stopped reading (client went away)
+            ModelClientFactory.release_provider(provider)
+            raise
         except Exception as e:
-            self.error_count += 1
-            error_msg = str(e)
+            kind = classify_error(e)
+            if kind == BAD_REQUEST:
+                ModelClientFactory.release_provider(provider)
+            else:
+                ModelClientFactory.record_failure(
+                    provider, str(e), trip=(kind == RATE_LIMIT), generation=generation
+                )
+            raise
+        
+        ModelClientFactory.record_success(provider, generation)
+        self._observe_usage(method, provider, result)
+        yield "result", self._extract_response(result)
+    
+    async def _call_model(
+        self,
+        prompt: str,
+        context: Optional[List[Dict]],
+        session_id: Optional[str],
+        retry_on_failure: bool,
+        hedge: Optional[bool] = None,
+        method: str = "ask",
+        output_schema: Optional[Type[BaseModel]] = None,
+        invoke: Optional[Callable[[str, int], Awaitable[Tuple[str, str]]]] = None
+    ) -> Tuple[str, str]:
+        """
+        Call the provider chosen by the circuit breakers under the retry
+        policy. Every attempt is routed afresh, so a rate limit that opened
+        the primary's circuit is retried on the backup without waiting;
+        other transient errors back off with jitter.
+        
+        Args:
+            invoke: Runs one attempt on the routed (provider, generation)
+                instead of a (hedged) call, e.g. a streamed one
+        
+        Returns:
+            Tuple of (response, provider that answered)
             
-            logger.error("❌" + "=" * 60)
-            logger.error(f"❌ ERROR in {self.name}")
-            logger.error(f"❌ Error #{self.error_count}")
-            logger.error(f"❌ Error type: {type(e).__name__}")
-            logger.error(f"❌ Error message: {error_msg}")
-            logger.error("❌" + "=" * 60)
+        Raises:
+            AgentCallError: If the error is not retryable, or the policy
+                ran out of attempts or time
+        """
+        policy = RetryPolicy.from_config()
+        max_attempts = max(1, policy.max_attempts) if retry_on_failure else 1
+        start = time.monotonic()
+        attempt = 0
+        
+        while True:
+            attempt += 1
+            provider, generation = ModelClientFactory.acquire_route()
             
-            # Check if it's a quota/rate limit error
-            is_quota_error = self._is_quota_error(error_msg)
+            try:
+                # Attempt to call the agent
+                logger.debug(f"⏳ Sending request to {provider} (attempt {attempt}/{max_attempts})...")
+                if invoke is not None:
+                    response, provider = await invoke(provider, generation)
+                else:
+                    response, provider = await self._invoke_hedged(
+                        provider, generation, prompt, context, session_id, hedge, method, output_schema
+                    )
+                
+                if attempt > 1:
+                    logger.info(f"✅ {self.name} retry SUCCESSFUL on attempt {attempt} ({provider})")
+                logger.info(f"✅ {self.name} responded successfully")
+                logger.info(f"📤 Response length: {len(response)} characters")
+                logger.debug(f"📤 Response preview: {response[:200]}...")
+                logger.info("─" * 60)
+                
+                return response, provider
             
-            if is_quota_error and retry_on_failure:
-                logger.warning("🔄 Detected quota/rate limit error")
-                logger.warning("🔄 Attempting automatic failover...")
+            except StreamInterruptedError:
+                raise
+            except Exception as e:
+                if attempt == 1:
+                    self.error_count += 1
+                error_msg = str(e)
+                kind = classify_error(e)
                 
-                try:
-                    # Switch to backup provider
-                    new_client = ModelClientFactory.switch_to_backup(error_msg)
-                    
-                    # Update this agent's client
-                    self.agent.model_client = new_client
-                    
-                    logger.info("🔄 Retrying with new provider...")
-                    
-                    # Retry the request
-                    result = await self.agent.run(task=prompt)
-                    response = self._extract_response(result)
-                    
-                    # Store response
-                    self.conversation_history.append({
-                        "role": "assistant",
-                        "content": response
-                    })
-                    
-                    logger.info("✅" + "=" * 60)
-                    logger.info(f"✅ {self.name} retry SUCCESSFUL")
-                    logger.info(f"✅ Now using: {Config.CURRENT_PROVIDER}")
-                    logger.info("✅" + "=" * 60)
-                    
-                    return response
+                logger.error("❌" + "=" * 60)
+                logger.error(f"❌ ERROR in {self.name} (attempt {attempt}/{max_attempts})")
+                logger.error(f"❌ Error type: {type(e).__name__} → {kind}")
+                logger.error(f"❌ Error message: {error_msg}")
+                logger.error("❌" + "=" * 60)
+                
+                if not policy.is_retryable(kind) or attempt >= max_attempts:
+                    break
                 
-                except Exception as retry_error:
-                    logger.critical("❌" + "=" * 60)
-                    logger.critical("❌ RETRY FAILED!")
-                    logger.critical(f"❌ Retry error: {str(retry_error)}")
-                    logger.critical("❌ Both providers exhausted")
-                    logger.critical("❌" + "=" * 60)
-                    
-                    return f"ERROR: Both API providers failed. Original: {error_msg}, Retry: {str(retry_error)}"
+                if kind == RATE_LIMIT and ModelClientFactory.get_alternate(provider) is not None:
+                    # The failed provider's circuit is open; the next route
+                    # goes to the healthy backup straight away
+                    delay = 0.0
+                    logger.warning(f"🔄 {kind} on {provider} - failing over without delay")
+                else:
+                    delay = policy.backoff(attempt, retry_after_seconds(e))
+                
+                elapsed = time.monotonic() - start
+                if elapsed + delay > policy.deadline:
+                    logger.error(f"❌ Retry deadline of {policy.deadline}s reached after {elapsed:.2f}s")
+                    break
+                
+                logger.warning(f"🔄 Retrying {self.name} in {delay:.2f}s ({kind})")
+                if delay > 0:
+                    await asyncio.sleep(delay)
+        
+        if attempt == 1:
+            message = f"ERROR_CALLING_AGENT: {error_msg}"
+        else:
+            message = f"ERROR: {self.name} failed after {attempt} attempts ({kind}). Last error: {error_msg}"
+        logger.critical(f"❌ Giving up: {message[:200]}")
+        raise AgentCallError(message, kind=kind, attempts=attempt, provider=provider)
+    
+    async def _invoke_hedged(
+        self,
+        provider: str,
+        generation: int,
+        prompt: str,
+        context: Optional[List[Dict]],
+        session_id: Optional[str],
+        hedge: Optional[bool] = None,
+        method: str = "ask",
+        output_schema: Optional[Type[BaseModel]] = None
+    ) -> Tuple[str, str]:
+        """
+        Call the routed provider, hedging to the backup if the call runs
+        past this agent's latency percentile.
+        
+        Returns:
+            Tuple of (response, provider that answered)
+        """
+        tracker = self._latency_trackers.setdefault(self.name, LatencyTracker(Config.HEDGE_WINDOW))
+        if hedge is None:
+            hedge = Config.HEDGE_ENABLED
+        backup = ModelClientFactory.get_alternate(provider) if (hedge and self.stateless) else None
+        
+        start = time.monotonic()
+        if backup is None:
+            response = await self._invoke_on(
+                provider, generation, prompt, context, session_id, method, output_schema
+            )
+            tracker.record(time.monotonic() - start)
+            return response, provider
+        
+        threshold = tracker.percentile(Config.HEDGE_PERCENTILE, Config.HEDGE_MIN_SAMPLES)
+        delay = max(Config.HEDGE_MIN_DELAY, threshold if threshold is not None else Config.HEDGE_DEFAULT_DELAY)
+        
+        response, winner, hedged = await run_hedged(
+            lambda: self._invoke_on(provider, generation, prompt, context, session_id, method, output_schema),
+            lambda: self._invoke_on(backup, generation, prompt, context, session_id, method, output_schema),
+            delay,
+            # The backup's circuit may have opened while the primary ran
+            allow_backup=lambda: ModelClientFactory.admit_request(backup)
+        )
+        # A backup win still tells us the primary took at least this long
+        tracker.record(time.monotonic() - start)
+        hedge_stats.record(self.name, hedged, winner)
+        
+        return response, (provider if winner == "primary" else backup)
+    
+    async def _invoke_on(
+        self,
+        provider: str,
+        generation: int,
+        prompt: str,
+        context: Optional[List[Dict]] = None,
+        session_id: Optional[str] = None,
+        method: str = "ask",
+        output_schema: Optional[Type[BaseModel]] = None
+    ) -> str:
+        """
+        Call one provider and report the outcome to its circuit breaker,
+        tagged with the failover generation the call was routed under.
+        
+        Returns:
+            Extracted response text
+        """
+        try:
+            result = await self._invoke(prompt, context, session_id, provider, output_schema)
+        except asyncio.CancelledError:
+            ModelClientFactory.release_provider(provider)
+            raise
+        except Exception as e:
+            kind = classify_error(e)
+            if kind in (BAD_REQUEST, INVALID_OUTPUT):
+                # Our request (or its schema) was at fault, not the provider
+                ModelClientFactory.release_provider(provider)
+            else:
+                ModelClientFactory.record_failure(
+                    provider, str(e), trip=(kind == RATE_LIMIT), generation=generation
+                )
+            raise
+        
+        ModelClientFactory.record_success(provider, generation)
+        self._observe_usage(method, provider, result)
+        return self._extract_response(result)
+    
+    async def _invoke(
+        self,
+        prompt: str,
+        context: Optional[List[Dict]] = None,
+        session_id: Optional[str] = None,
+        provider: Optional[str] = None,
+        output_schema: Optional[Type[BaseModel]] = None
+    ) -> Any:
+        """
+        Run a single model call under the provider's rate limiter.
+        
+        In stateless mode a throwaway AssistantAgent is built for the call,
+        seeded only with the explicit context and (if requested) this
+        session's memory. In stateful mode the shared agent is reused.
+        
+        Args:
+            prompt: The question/task for the agent
+            context: Optional conversation context
+            session_id: Session whose memory should be replayed
+            provider: Provider to call (defaults to the active one)
+            output_schema: Pydantic model for native structured output
+                (stateless mode, providers that support it)
             
+        Returns:
+            The result object from agent.run()
+        """
+        provider = provider or Config.CURRENT_PROVIDER
+        limiter = RateLimiterRegistry.get(provider)
+        
+        if not self.stateless:
+            # Point the shared agent at the routed provider's client
+            client = ModelClientFactory.get_client(provider)
+            if getattr(self.agent, "_model_client", client) is not client:
+                self.agent._model_client = client
+            async with limiter.acquire(estimate_tokens(self.system_message, prompt)):
+                return await self.agent.run(task=prompt)
+        
+        history = self._call_history(context, session_id)
+        logger.debug(f"🧠 Stateless call with {len(history)} context messages")
+        if output_schema is not None and not ModelClientFactory.supports_structured_output(provider):
+            output_schema = None
+        agent = self._build_agent(history, provider, output_schema=output_schema)
+        
+        estimated = estimate_tokens(self.system_message, prompt, *(str(h.get("content", "")) for h in history))
+        async with limiter.acquire(estimated):
+            return await agent.run(task=prompt)
+    
+    def _call_history(self, context: Optional[List[Dict]], session_id: Optional[str]) -> List[Dict]:
+        """Messages replayed before the prompt: session memory, then explicit context"""
+        history: List[Dict] = []
+        if session_id is not None:
+            history.extend(self._session_memory.get(session_id, []))
+        if context:
+            history.extend(context)
+        return history
+    
+    def _build_agent(
+        self,
+        history: List[Dict],
+        provider: Optional[str] = None,
+        stream: bool = False,
+        output_schema: Optional[Type[BaseModel]] = None
+    ) -> AssistantAgent:
+        """
+        Build a per-call AssistantAgent seeded with the given history.
+        
+        Args:
+            history: List of {"role": ..., "content": ...} dicts
+            provider: Provider whose client to use (defaults to the active one)
+            stream: Emit model output chunks from run_stream
+            output_schema: Pydantic model to request as structured output
+            
+        Returns:
+            A fresh AssistantAgent
+        """
+        messages = []
+        for item in history:
+            content = str(item.get("content", ""))
+            if item.get("role") == "assistant":
+                messages.append(AssistantMessage(content=content, source=self.name))
             else:
-                logger.error(f"❌ Not attempting failover (quota_error={is_quota_error}, retry={retry_on_failure})")
-                return f"ERROR_CALLING_AGENT: {error_msg}"
+                messages.append(UserMessage(content=content, source=item.get("source", "user")))
+        
+        return AssistantAgent(
+            name=self.name,
+            system_message=self.system_message,
+            model_client=ModelClientFactory.get_client(provider),
+            description=self.description or f"I am {self.name}, specialized in my domain.",
+            model_context=UnboundedChatCompletionContext(initial_messages=messages),
+            model_client_stream=stream,
+            output_content_type=output_schema
+        )
+    
+    def _cache_key(
+        self,
+        prompt: str,
+        context: Optional[List[Dict]] = None,
+        provider: Optional[str] = None,
+        output_schema: Optional[Type[BaseModel]] = None
+    ) -> str:
+        """Build the response-cache key for a call (defaults to the active provider)"""
+        provider = provider or Config.CURRENT_PROVIDER
+        return ResponseCache.make_key(
+            system_message=self.system_message,
+            prompt=prompt,
+            provider=provider,
+            model=Config.get_model_name(provider),
+            temperature=Config.TEMPERATURE,
+            context=context,
+            output_schema=output_schema.__name__ if output_schema is not None else None
+        )
+    
+    def _remember(self, session_id: Optional[str], prompt: str, response: str):
+        """Append a turn to the session-scoped memory (opt-in only)"""
+        if session_id is None or not self.stateless:
+            return
+        
+        memory = self._session_memory.setdefault(session_id, [])
+        memory.append({"role": "user", "content": prompt})
+        memory.append({"role": "assistant", "content": response})
+        
+        # Keep only the most recent turns (2 messages per turn)
+        limit = Config.AGENT_SESSION_MEMORY_TURNS * 2
+        if len(memory) > limit:
+            del memory[:len(memory) - limit]
+    
+    def _record_history(self, role: str, content: str):
+        """Append to the bounded local conversation log"""
+        self.conversation_history.append({
+            "role": role,
+            "content": content
+        })
+        overflow = len(self.conversation_history) - Config.AGENT_HISTORY_LIMIT
+        if overflow > 0:
+            del self.conversation_history[:overflow]
+    
+    def clear_session_memory(self, session_id: str):
+        """Drop the memory kept for a session"""
+        if self._session_memory.pop(session_id, None) is not None:
+            logger.info(f"🗑️ Cleared session memory for {self.name} ({session_id})")
     
     def _extract_response(self, result: Any) -> str:
         """
@@ -197,6 +839,9 @@ class BaseAgent:
         if hasattr(result, "messages") and result.messages:
             response = result.messages[-1].content
             logger.debug(f"✅ Extracted from messages (count: {len(result.messages)})")
+            if isinstance(response, BaseModel):
+                # Native structured output
+                return response.model_dump_json()
             return response
         
         if hasattr(result, "content"):
@@ -209,6 +854,20 @@ class BaseAgent:
         logger.debug("⚠️ Used fallback str() conversion")
         return response
     
+    def _observe_usage(self, method: str, provider: str, result: Any):
+        """Record the token usage reported on a TaskResult's messages"""
+        prompt_tokens = completion_tokens = 0
+        reported = False
+        for message in getattr(result, "messages", None) or []:
+            usage = getattr(message, "models_usage", None)
+            if usage is not None:
+                reported = True
+                prompt_tokens += usage.prompt_tokens
+                completion_tokens += usage.completion_tokens
+        
+        if reported:
+            observe_usage(self.name, method, provider, prompt_tokens, completion_tokens)
+    
     def _is_quota_error(self, error_msg: str) -> bool:
         """
         Check if error message indicates quota/rate limit exceeded.
@@ -219,24 +878,7 @@ class BaseAgent:
         Returns:
             True if it's a quota error
         """
-        error_lower = error_msg.lower()
-        
-        quota_keywords = [
-            "quota",
-            "rate limit",
-            "too many requests",
-            "429",
-            "resource exhausted",
-            "limit exceeded",
-            "insufficient_quota",
-        ]
-        
-        for keyword in quota_keywords:
-            if keyword in error_lower:
-                logger.debug(f"🔍 Quota error detected: keyword '{keyword}' found")
-                return True
-        
-        return False
+        return classify_message(error_msg) == RATE_LIMIT
     
     def get_stats(self) -> dict:
         """
@@ -251,15 +893,25 @@ class BaseAgent:
             "error_count": self.error_count,
             "success_rate": f"{((self.call_count - self.error_count) / max(self.call_count, 1)) * 100:.1f}%",
             "current_provider": Config.CURRENT_PROVIDER,
-            "conversation_length": len(self.conversation_history)
+            "conversation_length": len(self.conversation_history),
+            "stateless": self.stateless,
+            "sessions_with_memory": len(self._session_memory),
+            "latency_p50": self._latency_percentile(50),
+            "latency_p95": self._latency_percentile(95)
         }
     
+    def _latency_percentile(self, pct: float) -> Optional[float]:
+        tracker = self._latency_trackers.get(self.name)
+        value = tracker.percentile(pct) if tracker else None
+        return round(value, 3) if value is not None else None
+    
     def reset_stats(self):
         """Reset usage statistics"""
         logger.info(f"🔄 Resetting stats for {self.name}")
         self.call_count = 0
         self.error_count = 0
         self.conversation_history = []
+        self._session_memory = {}
     
     def get_conversation_history(self) -> List[Dict]:
         """Get the agent's conversation history"""
@@ -23,7 +23,8 @@ class BehaviorAgent(BaseAgent):
         
         prompt = f"Generate {count} behavioral interview questions suitable for the job role in the job description."
         
-        text = await self.ask(prompt)
+        # Each candidate gets freshly generated questions
+        text = await self.ask(prompt, use_cache=False, method="generate_questions")
         
         # Parse into list of questions
         questions = [q.strip(" -0123456789.") for q in text.split("\n") if q.strip()]
@@ -1,6 +1,7 @@
 # app/agents/coding_agent.py
 import logging
 from app.agents.base_agent import BaseAgent
+from app.prompt_budget import PromptBudget
 
 logger = logging.getLogger(__name__)
 
@@ -19,19 +20,43 @@ class CodingAgent(BaseAgent):
         super().__init__(name="CodingAgent", system_message=system)
         logger.info("CodingAgent initialized")
 
-    async def generate_problem(self, resume_text: str = "", jd_text: str = "", difficulty: str = "medium") -> str:
-        """Generate a coding problem"""
+    async def generate_problem(
+        self,
+        resume_text: str = "",
+        jd_text: str = "",
+        difficulty: str = "medium",
+        previous_problem: str = ""
+    ) -> str:
+        """
+        Generate a coding problem.
+        
+        Args:
+            resume_text: Candidate resume
+            jd_text: Job description
+            difficulty: "easy", "medium" or "hard"
+            previous_problem: Problem already asked, which this one must not repeat
+        """
         logger.info(f"Generating {difficulty} coding problem")
         logger.debug(f"Resume context: {len(resume_text)} chars")
         logger.debug(f"JD context: {len(jd_text)} chars")
         
+        sections = {"resume": resume_text, "jd": jd_text}
+        if previous_problem:
+            sections["previous"] = previous_problem
+        context = PromptBudget.for_prompt("coding_problem").fit(
+            sections,
+            queries={"resume": jd_text, "jd": resume_text}
+        )
         prompt = (
             f"Generate ONE {difficulty} difficulty coding interview problem relevant to this role.\n"
-            f"Resume context:\n{resume_text[:500]}\n\nJob description:\n{jd_text[:500]}\n\n"
-            "Return only the problem statement, constraints, and sample I/O."
+            f"Resume context:\n{context['resume']}\n\nJob description:\n{context['jd']}\n\n"
         )
+        if previous_problem:
+            prompt += f"The candidate has just solved this problem, so ask about a different topic:\n{context['previous']}\n\n"
+        prompt += "Return only the problem statement, constraints, and sample I/O."
         
-        problem = await self.ask(prompt)
+        # Each candidate gets a freshly generated problem
+        problem = await self.ask(prompt, use_cache=False, method="generate_problem")
         logger.info(f"Problem generated: {len(problem)} characters")
         return problem
 
@@ -46,7 +71,8 @@ class CodingAgent(BaseAgent):
             "Return as bullet lines."
         )
         
-        followups = await self.ask(prompt)
+        # Deterministic in the problem (the prompt is the cache key), so cached
+        followups = await self.ask(prompt, method="generate_followups")
         logger.info("Follow-ups generated")
         return followups
     
@@ -62,7 +88,8 @@ class CodingAgent(BaseAgent):
             "Keep them short and conversational."
         )
         
-        followups = await self.ask(prompt)
+        # Cached under the problem and answer
+        followups = await self.ask(prompt, method="followups_for_answer")
         logger.info("Follow-ups for answer generated")
         return followups
 
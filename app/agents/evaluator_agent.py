@@ -1,9 +1,14 @@
 # app/agents/evaluator_agent.py
+import asyncio
 import logging
-from app.agents.base_agent import BaseAgent
-from typing import Dict, Any
-import json
-import re
+from app.agents.base_agent import BaseAgent, AgentCallError
+from app.config import Config
+from app.models import EvaluationResult, BatchEvaluationResult
+from app.json_extract import JSONObjectExtractor
+from app.metrics import observe_structured_output
+from app.prompt_budget import PromptBudget
+from app.structured_output import StructuredOutputError
+from typing import Dict, Any, AsyncIterator, List, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -46,38 +51,171 @@ class EvaluatorAgent(BaseAgent):
         logger.debug(f"Question: {question[:100]}...")
         logger.debug(f"Answer: {answer[:100]}...")
         
-        prompt = (
+        prompt = self._build_prompt(question, answer, round_type)
+        
+        try:
+            evaluation = await self.ask_structured(prompt, EvaluationResult, method="evaluate")
+        except AgentCallError as e:
+            return self._failed_evaluation(e)
+        except StructuredOutputError as e:
+            return self._unparsed_evaluation(e.raw)
+        
+        return self._evaluation_dict(evaluation)
+
+    async def evaluate_stream(
+        self,
+        question: str,
+        answer: str,
+        round_type: str = "coding"
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Evaluate a candidate's answer, streaming the model output
+        
+        Args:
+            question: The interview question
+            answer: Candidate's answer
+            round_type: Type of round (coding, resume, behavior)
+            
+        Yields:
+            ("token", text) while the response is generated, then
+            ("evaluation", dict) with the parsed result. The evaluation is
+            yielded as soon as its JSON object is complete; any trailing
+            text is consumed without being yielded.
+        """
+        logger.info(f"Evaluating {round_type} answer (streaming)")
+        
+        prompt = self._build_prompt(question, answer, round_type)
+        extractor = JSONObjectExtractor(EvaluationResult)
+        
+        try:
+            async for chunk in self.ask_stream(prompt, raise_on_error=True, method="evaluate"):
+                if extractor.result is not None:
+                    continue
+                yield "token", chunk
+                if extractor.feed(chunk) is not None:
+                    observe_structured_output(self.name, "evaluate", "valid")
+                    yield "evaluation", self._evaluation_dict(extractor.result)
+        except AgentCallError as e:
+            if extractor.result is None:
+                yield "evaluation", self._failed_evaluation(e)
+            return
+        
+        if extractor.result is not None:
+            return
+        if extractor.finish() is not None:
+            observe_structured_output(self.name, "evaluate", "valid")
+            yield "evaluation", self._evaluation_dict(extractor.result)
+            return
+        
+        # One short repair call rather than discarding the answer
+        try:
+            evaluation = await self.repair_structured(extractor.text, EvaluationResult, method="evaluate")
+        except AgentCallError as e:
+            yield "evaluation", self._failed_evaluation(e)
+            return
+        except StructuredOutputError as e:
+            yield "evaluation", self._unparsed_evaluation(e.raw)
+            return
+        yield "evaluation", self._evaluation_dict(evaluation)
+
+    async def evaluate_batch(self, items: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """
+        Evaluate several answers with one call per batch of
+        Config.EVALUATION_BATCH_SIZE Q&A pairs (batches run concurrently).
+        
+        Args:
+            items: (question, answer) pairs
+            
+        Returns:
+            One evaluation dict per pair, in order
+        """
+        size = max(1, Config.EVALUATION_BATCH_SIZE)
+        batches = [items[i:i + size] for i in range(0, len(items), size)]
+        logger.info(f"Evaluating {len(items)} answers in {len(batches)} batch(es)")
+        
+        results = await asyncio.gather(*(self._evaluate_chunk(batch) for batch in batches))
+        return [evaluation for batch in results for evaluation in batch]
+
+    async def _evaluate_chunk(self, items: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """Evaluate one batch; pairs missing from the response are evaluated one by one"""
+        try:
+            batch = await self.ask_structured(
+                self._build_batch_prompt(items), BatchEvaluationResult, method="evaluate_batch"
+            )
+            by_index = {item.index: item for item in batch.evaluations}
+        except AgentCallError as e:
+            return [self._failed_evaluation(e) for _ in items]
+        except StructuredOutputError:
+            by_index = {}
+        
+        missing = [i for i in range(1, len(items) + 1) if i not in by_index]
+        if missing:
+            logger.warning(f"⚠️ Batch response missed {len(missing)} answer(s) - evaluating them individually")
+        singles = await asyncio.gather(*(self.evaluate(*items[i - 1]) for i in missing))
+        fallback = dict(zip(missing, singles))
+        
+        return [
+            self._evaluation_dict(by_index[i]) if i in by_index else fallback[i]
+            for i in range(1, len(items) + 1)
+        ]
+
+    def _build_batch_prompt(self, items: List[Tuple[str, str]]) -> str:
+        header = (
+            f"Evaluate each of the following {len(items)} interview answers independently. "
+            "For every numbered Q&A pair give a score 0-10, a short feedback paragraph and up to 3 recommendations. "
+            "Return JSON: {\"evaluations\": [{\"index\": int, \"score\": int, \"feedback\": str, "
+            "\"recommendations\": [str]}]} with one entry per pair.\n\n"
+        )
+        sections, weights = {}, {}
+        for i, (question, answer) in enumerate(items, 1):
+            sections[f"q{i}"] = question
+            sections[f"a{i}"] = answer
+            weights[f"a{i}"] = 2.0
+        labels = "".join(f"#{i}\nQUESTION:\n\nCANDIDATE ANSWER:\n\n\n" for i in range(1, len(items) + 1))
+        fitted = PromptBudget.for_prompt("evaluation_batch").without(header, labels).fit(sections, weights)
+        
+        prompt = header
+        for i in range(1, len(items) + 1):
+            prompt += f"#{i}\nQUESTION:\n{fitted[f'q{i}']}\n\nCANDIDATE ANSWER:\n{fitted[f'a{i}']}\n\n\n"
+        return prompt
+
+    def _build_prompt(self, question: str, answer: str, round_type: str) -> str:
+        return (
             f"QUESTION:\n{question}\n\nCANDIDATE ANSWER:\n{answer}\n\n"
             f"Evaluate this answer for a {round_type} interview round. "
             "Return JSON: {\"score\": int, \"feedback\": str, \"recommendations\": [str]}."
         )
+
+    def _failed_evaluation(self, error: AgentCallError) -> Dict[str, Any]:
+        """Evaluation returned when the model call failed (the error text is not scored)"""
+        logger.error(f"❌ Evaluation call failed ({error.kind}, {error.attempts} attempts)")
+        return {
+            "score": 0,
+            "feedback": "Evaluation is temporarily unavailable. Please try again.",
+            "recommendations": ["Retry evaluation"],
+            "error": error.kind,
+        }
+
+    def _evaluation_dict(self, evaluation: EvaluationResult) -> Dict[str, Any]:
+        """Evaluation as the dict stored with each answer"""
+        result = {
+            "score": evaluation.score,
+            "feedback": evaluation.feedback.strip(),
+            "recommendations": evaluation.recommendations,
+        }
+        logger.info(f"✅ Evaluation complete - Score: {result['score']}/10")
+        return result
+
+    def _unparsed_evaluation(self, raw: str) -> Dict[str, Any]:
+        """Evaluation returned when the response didn't match the schema"""
+        logger.error("❌ Failed to parse evaluation")
+        logger.debug(f"Raw response was: {raw}")
         
-        raw = await self.ask(prompt)
-        logger.debug(f"Raw evaluation response: {raw[:200]}...")
-        
-        try:
-            # Try to extract JSON from response
-            m = re.search(r"\{.*\}", raw, re.S)
-            parsed = json.loads(m.group(0)) if m else json.loads(raw)
-            
-            result = {
-                "score": int(parsed.get("score", 0)),
-                "feedback": parsed.get("feedback", "").strip(),
-                "recommendations": parsed.get("recommendations", []),
-            }
-            
-            logger.info(f"✅ Evaluation complete - Score: {result['score']}/10")
-            return result
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to parse evaluation: {str(e)}")
-            logger.debug(f"Raw response was: {raw}")
-            
-            return {
-                "score": 0,
-                "feedback": f"Could not parse evaluation. Raw: {raw[:300]}",
-                "recommendations": ["Retry evaluation"],
-            }
+        return {
+            "score": 0,
+            "feedback": f"Could not parse evaluation. Raw: {raw[:300]}",
+            "recommendations": ["Retry evaluation"],
+        }
 
     def set_mode(self, mode: str):
         """Change mode at runtime (teach / experience)"""
@@ -6,6 +6,7 @@ Implements RoundRobin and Selective Speaker patterns
 import logging
 from typing import List, Dict, Optional, Any
 from app.config import ModelClientFactory, Config
+from app.prompt_budget import PromptBudget
 
 # Import AutoGen team components
 try:
@@ -115,10 +116,15 @@ class InterviewGroupChat:
         
         # Build context-aware task
         if context:
+            resume, jd = context.get('resume', ''), context.get('jd', '')
+            brief = PromptBudget.for_prompt("group_chat").fit(
+                {"resume": resume, "jd": jd},
+                queries={"resume": jd, "jd": resume}
+            )
             task = f"""
             Interview Context:
-            - Resume: {context.get('resume', '')[:200]}...
-            - Job Description: {context.get('jd', '')[:200]}...
+            - Resume: {brief['resume']}
+            - Job Description: {brief['jd']}
             - Mode: {context.get('mode', 'standard')}
             
             Task: {initial_task}
@@ -255,16 +261,19 @@ class RoundRobinInterviewManager:
         agent = self.agents[round_type]
         
         # Build prompt based on round type
+        budget = PromptBudget.for_prompt("group_chat")
         if round_type == "coding":
+            resume, jd = context.get('resume', ''), context.get('jd', '')
+            brief = budget.fit({"resume": resume, "jd": jd}, queries={"resume": jd, "jd": resume})
             prompt = f"""
             Generate a coding interview question.
-            Resume: {context.get('resume', '')[:300]}
-            JD: {context.get('jd', '')[:300]}
+            Resume: {brief['resume']}
+            JD: {brief['jd']}
             """
         elif round_type == "resume":
             prompt = f"""
             Generate technical questions based on experience.
-            Resume: {context.get('resume', '')[:500]}
+            Resume: {budget.truncate(context.get('resume', ''))}
             """
         elif round_type == "behavior":
             prompt = "Generate behavioral interview questions using STAR method."
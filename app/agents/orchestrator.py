@@ -4,15 +4,28 @@ Enhanced Orchestrator with AutoGen Multi-Agent Patterns
 Supports both sequential and collaborative interview modes
 """
 
+import os
 import uuid
+import time
+import asyncio
 import logging
-from typing import Dict, Any, Optional, List
+from collections.abc import Mapping
+from typing import Dict, Any, AsyncIterator, Optional, List, Tuple, Union
 from app.agents.coding_agent import CodingAgent
 from app.agents.resume_agent import ResumeAgent
 from app.agents.behavior_agent import BehaviorAgent
 from app.agents.evaluator_agent import EvaluatorAgent
 from app.agents.group_chat_manager import InterviewGroupChat, RoundRobinInterviewManager
+from app.agents.base_agent import AgentCallError
+from app.blob_store import build_blob_store
 from app.config import Config
+from app.metrics import observe_speculative, observe_structured_output
+from app.models import InterviewReport
+from app.prompt_budget import PromptBudget
+from app.session_events import CURSOR_KEYS, record_event
+from app.session_model import Progress, QuestionSet, Session, to_plain
+from app.session_store import CachedSessionStore, SessionStore, SQLiteSessionStore, build_session_store
+from app.structured_output import StructuredOutputError, parse_structured
 
 # Import mock data
 from app.agents.mock_data import (
@@ -25,8 +38,82 @@ from app.agents.mock_data import (
 
 logger = logging.getLogger(__name__)
 
-# In-memory store for interview sessions
-SESSIONS: Dict[str, Dict[str, Any]] = {}
+
+class _SessionAgents(Mapping):
+    """Live agents of a session loaded from storage, built on first use"""
+
+    def __init__(self, mode: str):
+        self.mode = mode
+        self._evaluator: Optional[EvaluatorAgent] = None
+
+    def __getitem__(self, name: str) -> Optional[EvaluatorAgent]:
+        if name != "evaluator":
+            raise KeyError(name)
+        if self._evaluator is None and not Config.MOCK_MODE:
+            self._evaluator = EvaluatorAgent(mode=self.mode)
+        return self._evaluator
+
+    def __iter__(self):
+        return iter(("evaluator",))
+
+    def __len__(self) -> int:
+        return 1
+
+
+def _restore_session(sess: Dict[str, Any]) -> Dict[str, Any]:
+    """Attach live agents to a session loaded from storage (most reads never use them)"""
+    sess["agents"] = _SessionAgents(sess.get("mode", "experience"))
+    return sess
+
+
+def _release_session(sess: Dict[str, Any]):
+    """Drop the blob references of a session that is gone for good"""
+    for key in ("resume_hash", "jd_hash"):
+        if key in sess:
+            BLOBS.release(sess[key])
+
+
+def _session_text(sess: Dict[str, Any], name: str) -> str:
+    """Resume or JD text of a session ("resume" / "jd")"""
+    digest = sess.get(f"{name}_hash")
+    if digest is None:
+        # Sessions stored before texts were interned
+        return sess.get(name, "")
+    return BLOBS.get(digest)
+
+
+def _forget_session(session_id: str, reason: str):
+    """Cancel background work of a session that is gone (expired, dropped or deleted)"""
+    logger.info(f"🧹 Cancelling background work of session {session_id} ({reason})")
+    _cancel_coding_prefetch(session_id)
+    for task in EVALUATION_TASKS.pop(session_id, {}).values():
+        task.cancel()
+    flush = EVALUATION_FLUSHES.pop(session_id, None)
+    if flush is not None:
+        flush.cancel()
+
+
+# Identifies this process in the evaluation claims stored on sessions
+WORKER_ID = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+# Interview sessions (SQLite shared by workers behind a hot in-process
+# cache, or in memory only with idle TTL and LRU eviction)
+SESSIONS: Union[CachedSessionStore, SQLiteSessionStore, SessionStore] = build_session_store(
+    restore=_restore_session, on_evict=_forget_session, release=_release_session
+)
+
+# Resume/JD texts, stored once per unique document and referenced by digest
+# (in the session database, on the same connection)
+BLOBS = build_blob_store(SESSIONS)
+
+# Running batch evaluations of deferred answers, per session
+EVALUATION_FLUSHES: Dict[str, asyncio.Task] = {}
+
+# Running background evaluations of single answers, per session and answer index
+EVALUATION_TASKS: Dict[str, Dict[int, asyncio.Task]] = {}
+
+# Speculatively generated second coding problems, per session ("q2_easy"/"q2_hard")
+CODING_PREFETCHES: Dict[str, Dict[str, asyncio.Task]] = {}
 
 # Agent singletons
 if not Config.MOCK_MODE:
@@ -41,13 +128,95 @@ else:
     resume_agent = None
     behavior_agent = None
 
+# Fallbacks used when a question-generation branch fails or times out
+FALLBACK_FOLLOWUPS = "1. What's the brute force approach?\n2. Can you optimize it?"
+FALLBACK_SECOND_PROBLEMS = {
+    "q2_easy": "Explain how you would implement a simple cache.",
+    "q2_hard": "Design a distributed caching system with consistency guarantees."
+}
+
+
+def _is_error_result(result: Any) -> bool:
+    """Check whether an agent result is an error string from BaseAgent.ask"""
+    if isinstance(result, str):
+        return result.startswith("ERROR")
+    if isinstance(result, list):
+        return not result or any(isinstance(r, str) and r.startswith("ERROR") for r in result)
+    return result is None
+
+
+async def _run_branch(name: str, coro, fallback: Any, timeout: Optional[float] = None):
+    """
+    Await one question-generation branch with a timeout.
+    
+    Args:
+        name: Branch name for logging
+        coro: Coroutine producing the branch result
+        fallback: Value used if the branch fails, times out or returns an error
+        timeout: Seconds to wait (defaults to Config.SESSION_BRANCH_TIMEOUT)
+        
+    Returns:
+        Tuple of (result, ok)
+    """
+    if timeout is None:
+        timeout = Config.SESSION_BRANCH_TIMEOUT
+    
+    try:
+        result = await asyncio.wait_for(coro, timeout=timeout)
+    except asyncio.TimeoutError:
+        logger.error(f"⏱️ {name} timed out after {timeout}s - using fallback")
+        return fallback, False
+    except Exception as e:
+        logger.error(f"❌ {name} failed: {str(e)} - using fallback", exc_info=True)
+        return fallback, False
+    
+    if _is_error_result(result):
+        logger.error(f"❌ {name} returned an error - using fallback")
+        return fallback, False
+    
+    logger.info(f"✅ {name} ready")
+    return result, True
+
+
+async def _generate_coding_questions(resume_text: str, jd_text: str):
+    """
+    Generate the coding problem, then its follow-ups (the only dependent
+    step). Both share one SESSION_BRANCH_TIMEOUT budget, so the branch is
+    bounded like the others; follow-ups get whatever the problem left.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + Config.SESSION_BRANCH_TIMEOUT
+    coding_q, ok = await _run_branch(
+        "Coding problem",
+        coding_agent.generate_problem(
+            resume_text=resume_text,
+            jd_text=jd_text,
+            difficulty="medium"
+        ),
+        fallback=MOCK_CODING_PROBLEMS[0]
+    )
+    followups, followups_ok = await _run_branch(
+        "Coding follow-ups",
+        coding_agent.generate_followups(coding_q),
+        fallback=FALLBACK_FOLLOWUPS,
+        timeout=max(deadline - loop.time(), 0.0)
+    )
+    
+    degraded = []
+    if not ok:
+        degraded.append("coding")
+    if not followups_ok:
+        degraded.append("followups")
+    return coding_q, followups, degraded
+
 
 async def create_session(
     resume_text: str,
     jd_text: str,
     mode: str = "experience",
     user_name: Optional[str] = "Candidate",
-    collaboration_mode: str = "sequential"  # NEW: "sequential" or "collaborative"
+    collaboration_mode: str = "sequential",  # NEW: "sequential" or "collaborative"
+    evaluation_mode: Optional[str] = None
 ):
     """
     Create a new interview session with enhanced AutoGen patterns.
@@ -58,6 +227,9 @@ async def create_session(
         mode: "teach" or "experience"
         user_name: Candidate's name
         collaboration_mode: "sequential" (default) or "collaborative" (GroupChat)
+        evaluation_mode: "immediate", "deferred" (batched evaluation) or
+            "background" (next question first, feedback polled later);
+            defaults to deferred in experience mode, background in teach mode
     
     Returns:
         Session details with first question
@@ -70,9 +242,20 @@ async def create_session(
     
     session_id = str(uuid.uuid4())
     logger.info(f"Generated session ID: {session_id}")
+    
+    if evaluation_mode is None:
+        if mode == "experience" and Config.EXPERIENCE_DEFERRED_EVALUATION:
+            evaluation_mode = "deferred"
+        elif mode == "teach" and Config.TEACH_BACKGROUND_EVALUATION:
+            evaluation_mode = "background"
+        else:
+            evaluation_mode = "immediate"
 
     # Create evaluator
     evaluator = EvaluatorAgent(mode=mode) if not Config.MOCK_MODE else None
+    
+    # Branches that fell back to canned questions
+    degraded: List[str] = []
 
     # COLLABORATIVE MODE - Using GroupChat
     if collaboration_mode == "collaborative" and not Config.MOCK_MODE:
@@ -91,11 +274,15 @@ async def create_session(
         )
         
         # Run collaborative question generation
+        brief = PromptBudget.for_prompt("group_chat").fit(
+            {"resume": resume_text, "jd": jd_text},
+            queries={"resume": jd_text, "jd": resume_text}
+        )
         initial_task = f"""
         We need to prepare interview questions for a candidate.
         
-        Resume Summary: {resume_text[:300]}...
-        Job Description: {jd_text[:300]}...
+        Resume Summary: {brief['resume']}
+        Job Description: {brief['jd']}
         
         CodingAgent: Please generate 2 coding problems (1 medium, 1 adaptive)
         ResumeAgent: Please generate 3-4 experience-based questions
@@ -150,52 +337,72 @@ async def create_session(
             import random
             
             coding_q = random.choice(MOCK_CODING_PROBLEMS)
-            followups = "1. What's the brute force approach?\n2. Can you optimize it?"
+            followups = FALLBACK_FOLLOWUPS
             resume_questions = MOCK_RESUME_QUESTIONS
             behavior_questions = MOCK_BEHAVIORAL_QUESTIONS
         else:
-            logger.info("📋 Using SEQUENTIAL mode (original approach)")
+            logger.info("📋 Using SEQUENTIAL mode (concurrent generation)")
             
-            # Generate coding problem
-            coding_q = await coding_agent.generate_problem(
-                resume_text=resume_text,
-                jd_text=jd_text,
-                difficulty="medium"
+            # Independent branches run concurrently; follow-ups chain
+            # after the coding problem inside its own branch
+            coding_branch, resume_branch, behavior_branch = await asyncio.gather(
+                _generate_coding_questions(resume_text, jd_text),
+                _run_branch(
+                    "Resume questions",
+                    resume_agent.generate_questions(
+                        resume_text=resume_text,
+                        jd_text=jd_text
+                    ),
+                    fallback=list(MOCK_RESUME_QUESTIONS)
+                ),
+                _run_branch(
+                    "Behavioral questions",
+                    behavior_agent.generate_questions(count=5),
+                    fallback=list(MOCK_BEHAVIORAL_QUESTIONS)
+                )
             )
-            followups = await coding_agent.generate_followups(coding_q)
             
-            # Generate resume and behavioral questions
-            resume_questions = await resume_agent.generate_questions(
-                resume_text=resume_text,
-                jd_text=jd_text
-            )
-            behavior_questions = await behavior_agent.generate_questions(count=5)
-
-    # Store session
-    SESSIONS[session_id] = {
-        "mode": mode,
-        "collaboration_mode": collaboration_mode,
-        "user_name": user_name,
-        "resume": resume_text,
-        "jd": jd_text,
-        "agents": {"evaluator": evaluator},
-        "questions": {
-            "coding": {
-                "q1": coding_q,
-                "followups": followups,
-                "q2_easy": "Explain how you would implement a simple cache.",
-                "q2_hard": "Design a distributed caching system with consistency guarantees."
-            },
-            "resume": resume_questions if isinstance(resume_questions, list) else [resume_questions],
-            "behavior": behavior_questions if isinstance(behavior_questions, list) else [behavior_questions]
-        },
-        "progress": {
-            "round": 1,
-            "answers": [],
-            "resume_index": 0,
-            "behavior_index": 0
-        },
-    }
+            coding_q, followups, degraded = coding_branch
+            resume_questions, resume_ok = resume_branch
+            behavior_questions, behavior_ok = behavior_branch
+            
+            if not resume_ok:
+                degraded.append("resume")
+            if not behavior_ok:
+                degraded.append("behavior")
+            if degraded:
+                logger.warning(f"⚠️ Session started with fallback questions for: {', '.join(degraded)}")
+
+    # Store session (with its texts, in one transaction)
+    with SESSIONS.transaction():
+        SESSIONS[session_id] = Session(
+            mode=mode,
+            collaboration_mode=collaboration_mode,
+            evaluation_mode=evaluation_mode,
+            user_name=user_name,
+            resume_hash=BLOBS.put(resume_text),
+            jd_hash=BLOBS.put(jd_text),
+            agents={"evaluator": evaluator},
+            questions=QuestionSet(
+                coding={
+                    "q1": coding_q,
+                    "followups": followups,
+                    **FALLBACK_SECOND_PROBLEMS
+                },
+                resume=resume_questions if isinstance(resume_questions, list) else [resume_questions],
+                behavior=behavior_questions if isinstance(behavior_questions, list) else [behavior_questions]
+            ),
+            progress=Progress(
+                round=1,
+                answers=[],
+                resume_index=0,
+                behavior_index=0
+            ),
+            degraded=degraded,
+        )
+    
+    if not Config.MOCK_MODE and Config.CODING_PREFETCH_ENABLED:
+        _schedule_coding_prefetch(session_id, coding_q)
     
     logger.info(f"✅ Session {session_id} created")
     logger.info("=" * 70)
@@ -221,7 +428,6 @@ async def submit_answer(
         return {"error": "invalid_session"}
 
     sess = SESSIONS[session_id]
-    prog = sess["progress"]
     collaboration_mode = sess.get("collaboration_mode", "sequential")
     
     # Evaluate
@@ -259,29 +465,411 @@ async def submit_answer(
             "feedback": conversation[:300],
             "recommendations": ["See detailed feedback above"]
         }
+    elif _evaluates_later(sess):
+        def record(s: Dict[str, Any]):
+            round_before = s["progress"]["round"]
+            result = _advance_interview(s, question, answer, _pending_evaluation())
+            result["answer_index"] = len(s["progress"]["answers"]) - 1
+            return result, s["progress"]["round"] != round_before
+        
+        result, round_changed = SESSIONS.update_session(session_id, record)
+        answer_index = result["answer_index"]
+        if sess["evaluation_mode"] == "background":
+            # Return the next question now, evaluate while the candidate reads it
+            logger.info(f"⏳ Background evaluation - answer #{answer_index} queued")
+            _schedule_evaluation(session_id, answer_index)
+        else:
+            # Record now, evaluate in a batch at the end of the round
+            logger.info("⏳ Deferred evaluation - answer recorded")
+            if round_changed:
+                _schedule_evaluation_flush(session_id)
+        logger.info("=" * 70)
+        return result
     else:
         # Standard evaluation
         evaluator: EvaluatorAgent = sess["agents"]["evaluator"]
         eval_result = await evaluator.evaluate(question, answer)
     
     logger.info(f"✅ Evaluation complete - Score: {eval_result.get('score', 0)}/10")
+    
+    if _is_adaptive_step(sess):
+        await _use_prefetched_problem(session_id, eval_result)
+
+    return SESSIONS.update_session(session_id, lambda s: _advance_interview(s, question, answer, eval_result))
+
+
+def _second_problem_key(eval_result: Dict[str, Any]) -> str:
+    """Adaptive step: a strong first answer gets the hard second problem"""
+    return "q2_hard" if eval_result.get("score", 5) >= 7 else "q2_easy"
+
+
+def _is_adaptive_step(sess: Dict[str, Any]) -> bool:
+    """Whether the next answer is the first coding answer, whose score picks the second problem"""
+    prog = sess["progress"]
+    return prog["round"] == 1 and len(prog["answers"]) == 0
+
+
+def _schedule_coding_prefetch(session_id: str, coding_q: str):
+    """Generate both candidate second problems while the first one is being answered"""
+    sess = SESSIONS[session_id]
+    tasks = {}
+    for key, difficulty in (("q2_easy", "easy"), ("q2_hard", "hard")):
+        tasks[key] = asyncio.create_task(_run_branch(
+            f"Prefetch {key}",
+            coding_agent.generate_problem(
+                resume_text=_session_text(sess, "resume"),
+                jd_text=_session_text(sess, "jd"),
+                difficulty=difficulty,
+                previous_problem=coding_q
+            ),
+            fallback=FALLBACK_SECOND_PROBLEMS[key]
+        ))
+    CODING_PREFETCHES[session_id] = tasks
+    logger.info("🔮 Prefetching easy and hard second coding problems")
+
+
+def _cancel_coding_prefetch(session_id: str, keep: Optional[str] = None) -> Optional[asyncio.Task]:
+    """
+    Cancel a session's speculative problem generation.
+    
+    Args:
+        session_id: Session ID
+        keep: Prefetch to leave running and return ("q2_easy"/"q2_hard")
+        
+    Returns:
+        The kept task, if any
+    """
+    tasks = CODING_PREFETCHES.pop(session_id, {})
+    kept = tasks.pop(keep, None) if keep else None
+    for key, task in tasks.items():
+        observe_speculative(key, "discarded" if task.done() else "cancelled")
+        task.cancel()
+    if tasks:
+        logger.info(f"🗑️ Dropped unused prefetch: {', '.join(tasks)}")
+    return kept
+
+
+async def _use_prefetched_problem(session_id: str, eval_result: Dict[str, Any]):
+    """Store the prefetched second problem the first score calls for, dropping the other"""
+    key = _second_problem_key(eval_result)
+    task = _cancel_coding_prefetch(session_id, keep=key)
+    if task is None:
+        return
+    
+    try:
+        problem, ok = await asyncio.wait_for(asyncio.shield(task), Config.CODING_PREFETCH_WAIT_SECONDS)
+    except asyncio.TimeoutError:
+        # Don't hold the answer up: the canned second problem stays
+        task.cancel()
+        observe_speculative(key, "cancelled")
+        logger.warning(f"⚠️ Prefetched {key} not ready after {Config.CODING_PREFETCH_WAIT_SECONDS}s - using the fallback")
+        return
+    except asyncio.CancelledError:
+        if not task.cancelled():
+            # The request itself was cancelled, not the prefetch
+            task.cancel()
+            raise
+        return
+    
+    def store(s: Dict[str, Any]):
+        record_event(s, "question_replaced", round="coding", key=key, text=problem)
+    
+    SESSIONS.update_session(session_id, store)
+    observe_speculative(key, "used")
+    logger.info(f"🔮 Using prefetched {key} ({'generated' if ok else 'fallback'})")
+
+
+def _pending_evaluation() -> Dict[str, Any]:
+    """Placeholder stored for an answer awaiting deferred or background evaluation"""
+    return {"status": "pending"}
+
+
+def _is_pending(evaluation: Optional[Dict[str, Any]]) -> bool:
+    return isinstance(evaluation, Mapping) and evaluation.get("status") == "pending"
+
+
+def _evaluates_later(sess: Dict[str, Any]) -> bool:
+    """Whether the next question can be returned before this answer is evaluated"""
+    if sess.get("evaluation_mode") not in ("deferred", "background"):
+        return False
+    # The first coding answer picks the adaptive second problem, so it needs its score now
+    return not _is_adaptive_step(sess)
+
+
+def _store_evaluations(session_id: str, evaluations: Dict[int, Dict[str, Any]]):
+    """Attach evaluations (by answer index) to answers that are still pending"""
+    
+    def attach(s: Dict[str, Any]):
+        answers = s["progress"]["answers"]
+        for index, evaluation in evaluations.items():
+            if _is_pending(answers[index]["evaluation"]):
+                record_event(s, "evaluation_attached", index=index, evaluation=evaluation)
+    
+    SESSIONS.update_session(session_id, attach)
+
+
+def _claimed_elsewhere(evaluation: Dict[str, Any], now: float) -> bool:
+    """Whether another process claimed a pending evaluation recently enough to still be on it"""
+    owner = evaluation.get("claimed_by")
+    return (
+        owner is not None and owner != WORKER_ID
+        and now - evaluation.get("claimed_at", 0) < Config.EVALUATION_CLAIM_SECONDS
+    )
+
+
+def _claimable(sess: Dict[str, Any], indices: Optional[List[int]], now: float) -> List[int]:
+    answers = sess["progress"]["answers"]
+    return [
+        i for i in (range(len(answers)) if indices is None else indices)
+        if _is_pending(answers[i]["evaluation"]) and not _claimed_elsewhere(answers[i]["evaluation"], now)
+    ]
+
+
+def _claim_evaluations(session_id: str, indices: Optional[List[int]] = None) -> List[int]:
+    """
+    Claim pending answers for this process before evaluating them.
+    
+    Args:
+        session_id: Session ID
+        indices: Answers to claim (all pending answers if omitted)
+        
+    Returns:
+        Indices claimed; answers another process claimed recently are left out
+    """
+    sess = SESSIONS.get(session_id)
+    if sess is None or not _claimable(sess, indices, time.time()):
+        return []
+    
+    def claim(s: Dict[str, Any]) -> List[int]:
+        now = time.time()
+        claimed = _claimable(s, indices, now)
+        if claimed:
+            record_event(s, "evaluation_claimed", indices=claimed, owner=WORKER_ID, at=now)
+        return claimed
+    
+    try:
+        return SESSIONS.update_session(session_id, claim)
+    except KeyError:
+        return []
+
+
+async def _flush_pending_evaluations(session_id: str) -> int:
+    """
+    Evaluate every pending answer of a session (not claimed by another
+    process) in batches.
+    
+    Returns:
+        Number of answers evaluated
+    """
+    pending = _claim_evaluations(session_id)
+    if not pending:
+        return 0
+    sess = SESSIONS.get(session_id)
+    if sess is None:
+        return 0
+    answers = sess["progress"]["answers"]
+    
+    evaluator: EvaluatorAgent = sess["agents"]["evaluator"]
+    evaluations = await evaluator.evaluate_batch([(answers[i]["question"], answers[i]["answer"]) for i in pending])
+    _store_evaluations(session_id, dict(zip(pending, evaluations)))
+    logger.info(f"✅ Batch-evaluated {len(pending)} deferred answers")
+    return len(pending)
+
+
+def _schedule_evaluation_flush(session_id: str):
+    """Evaluate a session's pending answers in the background (after any running flush)"""
+    previous = EVALUATION_FLUSHES.get(session_id)
+    
+    async def flush():
+        if previous is not None:
+            await asyncio.gather(previous, return_exceptions=True)
+        await _flush_pending_evaluations(session_id)
+    
+    task = asyncio.create_task(flush())
+    EVALUATION_FLUSHES[session_id] = task
+    
+    def forget(done: asyncio.Task):
+        if EVALUATION_FLUSHES.get(session_id) is done:
+            del EVALUATION_FLUSHES[session_id]
+        if not done.cancelled() and done.exception() is not None:
+            logger.error(f"❌ Background evaluation failed for {session_id}: {done.exception()}")
+    
+    task.add_done_callback(forget)
+
+
+def _schedule_evaluation(session_id: str, answer_index: int):
+    """Evaluate one answer in the background and store the result on the session"""
+    
+    async def evaluate():
+        if not _claim_evaluations(session_id, [answer_index]):
+            return
+        sess = SESSIONS.get(session_id)
+        if sess is None:
+            return
+        entry = sess["progress"]["answers"][answer_index]
+        evaluator: EvaluatorAgent = sess["agents"]["evaluator"]
+        evaluation = await evaluator.evaluate(entry["question"], entry["answer"])
+        _store_evaluations(session_id, {answer_index: evaluation})
+        logger.info(f"✅ Background evaluation of answer #{answer_index} complete - "
+                    f"Score: {evaluation.get('score', 0)}/10")
+    
+    task = asyncio.create_task(evaluate())
+    EVALUATION_TASKS.setdefault(session_id, {})[answer_index] = task
+    
+    def forget(done: asyncio.Task):
+        tasks = EVALUATION_TASKS.get(session_id, {})
+        if tasks.get(answer_index) is done:
+            del tasks[answer_index]
+            if not tasks:
+                EVALUATION_TASKS.pop(session_id, None)
+        if not done.cancelled() and done.exception() is not None:
+            logger.error(f"❌ Background evaluation failed for {session_id} #{answer_index}: {done.exception()}")
+    
+    task.add_done_callback(forget)
+
+
+async def _complete_evaluations(session_id: str):
+    """
+    Wait for background evaluations, then evaluate anything still pending.
+    Answers another process is evaluating are waited for (until their
+    claim lapses) rather than evaluated again.
+    """
+    tasks = list(EVALUATION_TASKS.get(session_id, {}).values())
+    flush = EVALUATION_FLUSHES.get(session_id)
+    if flush is not None:
+        tasks.append(flush)
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
+    while True:
+        await _flush_pending_evaluations(session_id)
+        sess = SESSIONS.get(session_id)
+        if sess is None:
+            return
+        now = time.time()
+        if not any(
+            _is_pending(a["evaluation"]) and _claimed_elsewhere(a["evaluation"], now)
+            for a in sess["progress"]["answers"]
+        ):
+            return
+        logger.info(f"⏳ Waiting for evaluations claimed by another worker ({session_id})")
+        await asyncio.sleep(Config.EVALUATION_CLAIM_POLL_SECONDS)
+
+
+def get_evaluation(session_id: str, answer_index: int) -> Dict[str, Any]:
+    """
+    Current evaluation of one answer, for polling.
+    
+    Args:
+        session_id: Session ID
+        answer_index: Index returned as "answer_index" by submit_answer
+        
+    Returns:
+        {"answer_index", "status": "pending" | "complete", "evaluation"},
+        or {"error": ...}
+    """
+    if session_id not in SESSIONS:
+        return {"error": "invalid_session"}
+    answers = SESSIONS[session_id]["progress"]["answers"]
+    if not 0 <= answer_index < len(answers):
+        return {"error": "invalid_answer_index"}
+    
+    evaluation = answers[answer_index]["evaluation"]
+    if _is_pending(evaluation):
+        return {"answer_index": answer_index, "status": "pending", "evaluation": None}
+    return {"answer_index": answer_index, "status": "complete", "evaluation": to_plain(evaluation)}
+
+
+async def evaluation_stream(session_id: str, answer_index: int) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Wait for one answer's evaluation.
+    
+    Yields:
+        ("pending", {...}) while a background evaluation is running, then
+        ("evaluation", {...}) with the get_evaluation result (still
+        "pending" if a deferred answer has no evaluation scheduled yet),
+        or ("error", {...})
+    """
+    status = get_evaluation(session_id, answer_index)
+    if "error" in status:
+        yield "error", status
+        return
+    
+    if status["status"] == "pending":
+        task = EVALUATION_TASKS.get(session_id, {}).get(answer_index) or EVALUATION_FLUSHES.get(session_id)
+        if task is not None:
+            yield "pending", status
+            await asyncio.gather(task, return_exceptions=True)
+            status = get_evaluation(session_id, answer_index)
+    yield "evaluation", status
+
+
+async def submit_answer_stream(
+    session_id: str,
+    question: str,
+    answer: str,
+    question_meta: dict = None
+) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Streaming answer submission: evaluation text is yielded as the model
+    generates it, followed by the same result submit_answer returns.
+    Mock and collaborative sessions yield only the final result.
+    
+    Yields:
+        ("token", {"text": ...}) events, then ("result", {...}) or
+        ("error", {"error": ...})
+    """
+    logger.info("=" * 70)
+    logger.info("📝 SUBMIT ANSWER (streaming)")
+    logger.info(f"Session: {session_id} | Mock: {Config.MOCK_MODE}")
+    
+    if session_id not in SESSIONS:
+        logger.error(f"❌ Invalid session ID: {session_id}")
+        yield "error", {"error": "invalid_session"}
+        return
+    
+    sess = SESSIONS[session_id]
+    if (Config.MOCK_MODE or sess.get("collaboration_mode", "sequential") == "collaborative"
+            or _evaluates_later(sess)):
+        yield "result", await submit_answer(session_id, question, answer, question_meta)
+        return
+    
+    evaluator: EvaluatorAgent = sess["agents"]["evaluator"]
+    async for event, data in evaluator.evaluate_stream(question, answer):
+        if event == "token":
+            yield "token", {"text": data}
+        else:
+            # Sent as soon as the evaluation JSON is complete
+            logger.info(f"✅ Evaluation complete - Score: {data.get('score', 0)}/10")
+            if _is_adaptive_step(sess):
+                await _use_prefetched_problem(session_id, data)
+            yield "result", SESSIONS.update_session(session_id, lambda s: _advance_interview(s, question, answer, data))
+
+
+def _advance_interview(sess: Dict[str, Any], question: str, answer: str, eval_result: Dict[str, Any]) -> Dict[str, Any]:
+    """Record the evaluated answer and pick the next question"""
+    prog = sess["progress"]
 
     # Store answer + evaluation
-    prog["answers"].append({
-        "question": question,
-        "answer": answer,
-        "evaluation": eval_result
-    })
-
-    # Interview Flow (same adaptive logic as before)
-    if prog["round"] == 1 and len(prog["answers"]) == 1:
-        score = eval_result.get("score", 5)
-        next_q = sess["questions"]["coding"]["q2_hard"] if score >= 7 else sess["questions"]["coding"]["q2_easy"]
+    record_event(sess, "answer_recorded", question=question, answer=answer, evaluation=eval_result)
+
+    # Pick the next question on a copy of the cursor, then record the move
+    cursor = {key: prog[key] for key in CURSOR_KEYS}
+    result = _next_question(sess, cursor, len(prog["answers"]), eval_result)
+    if any(cursor[key] != prog[key] for key in CURSOR_KEYS):
+        record_event(sess, "round_advanced", **cursor)
+    return result
+
+
+def _next_question(sess: Dict[str, Any], cursor: Dict[str, int], answered: int, eval_result: Dict[str, Any]) -> Dict[str, Any]:
+    """Interview flow: move the cursor (round and question indexes) and return the next question"""
+    if cursor["round"] == 1 and answered == 1:
+        next_q = sess["questions"]["coding"][_second_problem_key(eval_result)]
         return {"evaluation": eval_result, "next_question": next_q, "done": False}
 
-    if prog["round"] == 1 and len(prog["answers"]) >= 2:
-        prog["round"] = 2
-        prog["resume_index"] = 0
+    if cursor["round"] == 1 and answered >= 2:
+        cursor["round"] = 2
+        cursor["resume_index"] = 0
         resume_qs = sess["questions"]["resume"]
         if isinstance(resume_qs, list) and len(resume_qs) > 0:
             return {
@@ -291,8 +879,8 @@ async def submit_answer(
             }
         else:
             # Skip to behavioral if no resume questions
-            prog["round"] = 3
-            prog["behavior_index"] = 0
+            cursor["round"] = 3
+            cursor["behavior_index"] = 0
             behavior_qs = sess["questions"]["behavior"]
             if isinstance(behavior_qs, list) and len(behavior_qs) > 0:
                 return {
@@ -301,18 +889,18 @@ async def submit_answer(
                     "done": False
                 }
 
-    if prog["round"] == 2:
-        prog["resume_index"] += 1
+    if cursor["round"] == 2:
+        cursor["resume_index"] += 1
         resume_qs = sess["questions"]["resume"]
-        if isinstance(resume_qs, list) and prog["resume_index"] < len(resume_qs):
+        if isinstance(resume_qs, list) and cursor["resume_index"] < len(resume_qs):
             return {
                 "evaluation": eval_result,
-                "next_question": resume_qs[prog["resume_index"]],
+                "next_question": resume_qs[cursor["resume_index"]],
                 "done": False
             }
         else:
-            prog["round"] = 3
-            prog["behavior_index"] = 0
+            cursor["round"] = 3
+            cursor["behavior_index"] = 0
             behavior_qs = sess["questions"]["behavior"]
             if isinstance(behavior_qs, list) and len(behavior_qs) > 0:
                 return {
@@ -321,17 +909,17 @@ async def submit_answer(
                     "done": False
                 }
 
-    if prog["round"] == 3:
-        prog["behavior_index"] += 1
+    if cursor["round"] == 3:
+        cursor["behavior_index"] += 1
         behavior_qs = sess["questions"]["behavior"]
-        if isinstance(behavior_qs, list) and prog["behavior_index"] < len(behavior_qs):
+        if isinstance(behavior_qs, list) and cursor["behavior_index"] < len(behavior_qs):
             return {
                 "evaluation": eval_result,
-                "next_question": behavior_qs[prog["behavior_index"]],
+                "next_question": behavior_qs[cursor["behavior_index"]],
                 "done": False
             }
         else:
-            prog["round"] = 4
+            cursor["round"] = 4
             return {"evaluation": eval_result, "next_question": None, "done": True}
 
     return {"evaluation": eval_result, "next_question": None, "done": False}
@@ -349,6 +937,8 @@ async def generate_report(session_id: str):
         logger.error(f"❌ Invalid session ID")
         return {"error": "invalid_session"}
 
+    # Evaluations may complete in another task or worker: read the session afterwards
+    await _complete_evaluations(session_id)
     sess = SESSIONS[session_id]
     answers = sess["progress"]["answers"]
     collaboration_mode = sess.get("collaboration_mode", "sequential")
@@ -373,56 +963,169 @@ async def generate_report(session_id: str):
         2. Top 3 areas for improvement
         3. Top 3 actionable recommendations
         
+        Return JSON with keys 'strengths', 'weaknesses', 'recommendations' (lists of strings).
+        
         All Q&A pairs:
         """
         
+        budget = PromptBudget.for_prompt("collaborative_report").without(summary_prompt)
+        pairs = budget.fit(
+            {f"q{i}": a["question"] for i, a in enumerate(answers, 1)}
+            | {f"a{i}": a["answer"] for i, a in enumerate(answers, 1)}
+        )
         for i, a in enumerate(answers, 1):
-            summary_prompt += f"\n\nQ{i}: {a['question'][:100]}...\n"
-            summary_prompt += f"A{i}: {a['answer'][:100]}...\n"
+            summary_prompt += f"\n\nQ{i}: {pairs[f'q{i}']}\n"
+            summary_prompt += f"A{i}: {pairs[f'a{i}']}\n"
             summary_prompt += f"Score: {a['evaluation'].get('score', 'N/A')}/10\n"
         
-        raw = await evaluator.ask(summary_prompt)
-        
-        # Try parsing JSON
         try:
-            import re, json
-            m = re.search(r"\{.*\}", raw, re.S)
-            parsed = json.loads(m.group(0)) if m else {
-                "strengths": ["Strong technical knowledge"],
-                "weaknesses": ["Could improve communication"],
-                "recommendations": ["Practice more mock interviews"],
-                "raw": raw
-            }
-        except Exception:
+            parsed = await _ask_report(evaluator, summary_prompt)
+        except (AgentCallError, StructuredOutputError) as e:
             parsed = {
                 "strengths": ["Strong technical knowledge"],
                 "weaknesses": ["Could improve communication"],
                 "recommendations": ["Practice more mock interviews"],
-                "raw": raw
+                "raw": getattr(e, "raw", "") or str(e)
             }
     else:
         # Standard report generation
-        summary_prompt = (
-            "Given the following Q&A pairs with evaluations, summarize strengths, weaknesses, and recommendations. "
-            "Return JSON with keys 'strengths', 'weaknesses', 'recommendations'.\n\n"
-        )
-        for a in answers:
-            summary_prompt += f"Q: {a['question']}\nA: {a['answer']}\nEval: {a['evaluation']}\n\n"
-
         evaluator: EvaluatorAgent = sess["agents"]["evaluator"]
-        raw = await evaluator.ask(summary_prompt)
-
         try:
-            import re, json
-            m = re.search(r"\{.*\}", raw, re.S)
-            parsed = json.loads(m.group(0)) if m else {"raw": raw}
-        except Exception:
-            parsed = {"raw": raw}
+            parsed = await _ask_report(evaluator, _build_report_prompt(answers))
+        except StructuredOutputError as e:
+            parsed = {"raw": e.raw}
+        except AgentCallError as e:
+            parsed = {"raw": str(e)}
+    
+    logger.info("✅ Report generated")
+    logger.info("=" * 70)
+
+    return {"report": parsed, "answers": to_plain(answers)}
+
+
+async def generate_report_stream(session_id: str) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Streaming report generation: summary text is yielded as the model
+    generates it, followed by the same result generate_report returns.
+    Mock and collaborative sessions yield only the final report.
+    
+    Yields:
+        ("token", {"text": ...}) events, then ("report", {...}) or
+        ("error", {"error": ...})
+    """
+    logger.info("=" * 70)
+    logger.info("📊 GENERATE REPORT (streaming)")
+    logger.info(f"Session: {session_id} | Mock: {Config.MOCK_MODE}")
+    
+    if session_id not in SESSIONS:
+        logger.error(f"❌ Invalid session ID")
+        yield "error", {"error": "invalid_session"}
+        return
+    
+    sess = SESSIONS[session_id]
+    if Config.MOCK_MODE or sess.get("collaboration_mode", "sequential") == "collaborative":
+        yield "report", await generate_report(session_id)
+        return
+    
+    await _complete_evaluations(session_id)
+    sess = SESSIONS[session_id]
+    answers = sess["progress"]["answers"]
+    evaluator: EvaluatorAgent = sess["agents"]["evaluator"]
+    chunks = []
+    try:
+        stream = evaluator.ask_stream(_build_report_prompt(answers), raise_on_error=True, method="generate_report")
+        async for chunk in stream:
+            chunks.append(chunk)
+            yield "token", {"text": chunk}
+    except AgentCallError as e:
+        # Failed (or interrupted, StreamInterruptedError) call: keep the
+        # error as the raw report, as generate_report does, with no repair call
+        logger.error(f"❌ Report generation failed: {str(e)}")
+        yield "report", {"report": {"raw": str(e)}, "answers": to_plain(answers)}
+        return
     
+    report = await _parse_report(evaluator, "".join(chunks))
     logger.info("✅ Report generated")
     logger.info("=" * 70)
+    yield "report", {"report": report, "answers": to_plain(answers)}
+
+
+def _compact_evaluation(evaluation: Dict[str, Any]) -> str:
+    """One-line evaluation summary (score and feedback) for report prompts"""
+    text = f"{evaluation.get('score', 'N/A')}/10"
+    if evaluation.get("feedback"):
+        text += f" - {evaluation['feedback']}"
+    return text
+
+
+def _fit_qa_pairs(answers: List[Dict[str, Any]], budget: PromptBudget) -> List[Dict[str, str]]:
+    """
+    Fit every Q&A pair into a token budget.
+
+    Each question and answer is its own section, so long answers are trimmed
+    before short ones and every pair keeps its evaluation.
+
+    Args:
+        answers: Session answers with question, answer and evaluation
+        budget: Tokens available for the pairs
+
+    Returns:
+        Pairs with (possibly trimmed) question, answer and evaluation text
+    """
+    evaluations = [_compact_evaluation(a.get("evaluation") or {}) for a in answers]
+    sections, weights = {}, {}
+    for i, a in enumerate(answers):
+        sections[f"q{i}"] = a["question"]
+        sections[f"a{i}"] = a["answer"]
+        weights[f"a{i}"] = 2.0
+    # Every pair keeps its evaluation; together they take at most a quarter of the budget
+    evaluation_tokens = sum(budget.counter.count(e) for e in evaluations)
+    if evaluation_tokens > budget.max_tokens // 4:
+        per_evaluation = budget.max_tokens // 4 // max(len(answers), 1)
+        evaluations = [budget.truncate(e, per_evaluation) for e in evaluations]
+    fitted = budget.without(*evaluations).fit(sections, weights)
+    return [
+        {"question": fitted[f"q{i}"], "answer": fitted[f"a{i}"], "evaluation": evaluations[i]}
+        for i in range(len(answers))
+    ]
+
+
+def _build_report_prompt(answers: List[Dict[str, Any]]) -> str:
+    """Prompt for the standard (sequential) report, fitted to the report token budget"""
+    summary_prompt = (
+        "Given the following Q&A pairs with evaluations, summarize strengths, weaknesses, and recommendations. "
+        "Return JSON with keys 'strengths', 'weaknesses', 'recommendations'.\n\n"
+    )
+    # Leave room for the per-pair labels
+    budget = PromptBudget.for_prompt("report")
+    budget = budget.without(summary_prompt, "Q: \nA: \nEval: \n\n" * len(answers))
+    for pair in _fit_qa_pairs(answers, budget):
+        summary_prompt += f"Q: {pair['question']}\nA: {pair['answer']}\nEval: {pair['evaluation']}\n\n"
+    return summary_prompt
+
+
+async def _ask_report(evaluator: EvaluatorAgent, prompt: str) -> Dict[str, Any]:
+    """Ask for the report as structured output"""
+    report = await evaluator.ask_structured(prompt, InterviewReport, method="generate_report")
+    return report.model_dump()
+
+
+async def _parse_report(evaluator: EvaluatorAgent, raw: str) -> Dict[str, Any]:
+    """Parse a streamed JSON report, with one repair call; keeps the raw text if that fails"""
+    report = parse_structured(raw, InterviewReport)
+    if report is not None:
+        observe_structured_output(evaluator.name, "generate_report", "valid")
+    else:
+        try:
+            report = await evaluator.repair_structured(raw, InterviewReport, method="generate_report")
+        except (AgentCallError, StructuredOutputError):
+            return {"raw": raw}
+    return report.model_dump()
+
 
-    return {"report": parsed, "answers": answers}
+def has_session(session_id: str) -> bool:
+    """Check whether a session exists"""
+    return session_id in SESSIONS
 
 
 logger.info("✅ Enhanced Orchestrator module loaded")
\ No newline at end of file
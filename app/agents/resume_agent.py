@@ -1,6 +1,7 @@
 # app/agents/resume_agent.py
 import logging
 from app.agents.base_agent import BaseAgent
+from app.prompt_budget import PromptBudget
 
 logger = logging.getLogger(__name__)
 
@@ -22,13 +23,18 @@ class ResumeAgent(BaseAgent):
         logger.info("Generating resume-based questions")
         logger.debug(f"Resume: {len(resume_text)} chars, JD: {len(jd_text)} chars")
         
+        context = PromptBudget.for_prompt("resume_questions").fit(
+            {"resume": resume_text, "jd": jd_text},
+            queries={"resume": jd_text, "jd": resume_text}
+        )
         prompt = (
             f"Based on the resume and job description below, produce 3-4 focused interview questions "
             "that probe the candidate's experience and skills. Number them.\n\n"
-            f"Resume:\n{resume_text[:1000]}\n\nJD:\n{jd_text[:1000]}"
+            f"Resume:\n{context['resume']}\n\nJD:\n{context['jd']}"
         )
         
-        text = await self.ask(prompt)
+        # Each candidate gets freshly generated questions
+        text = await self.ask(prompt, use_cache=False, method="generate_questions")
         
         # Parse into list of questions
         questions = [q.strip(" -0123456789.") for q in text.split("\n") if q.strip()]
@@ -0,0 +1,236 @@
+# app/blob_store.py
+"""
+Content-addressed text store
+Resume and JD texts are stored once under their SHA-256 digest and
+reference counted, so sessions (and caches) hold the digest instead of
+their own copy: memory and persisted bytes grow with unique documents
+rather than with requests. With a database, blobs are shared by
+every worker using the same file; sharing the session store's connection
+lets a session and its texts be written in one transaction.
+"""
+import contextlib
+import logging
+import pathlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterator, MutableMapping, Optional
+
+from app.config import Config
+from app.hashing import content_digest
+from app.session_store import SQLiteSessionStore
+
+logger = logging.getLogger(__name__)
+
+
+class BlobStore:
+    """
+    Reference-counted text store keyed by content digest.
+
+    put() stores a text (or adds a reference to the copy already stored)
+    and returns its digest; release() drops a reference and deletes the
+    text with its last one. Texts read from the database are kept in a
+    bounded in-process LRU, so every session in a process shares one copy.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        cache_entries: int = 1000,
+        busy_timeout: float = 0.2,
+        database: Optional[SQLiteSessionStore] = None
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            path: SQLite database file (None keeps blobs in memory only)
+            cache_entries: Texts kept in memory when backed by a database
+            busy_timeout: Seconds to wait for another writer's lock
+            database: Session store whose connection (and transactions) to
+                share instead of opening `path`
+        """
+        self.path = database.path if database is not None else path
+        self.cache_entries = cache_entries
+        self._texts: "OrderedDict[str, str]" = OrderedDict()
+        self._refs: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._database = database
+        self._conn = None
+        self.puts = 0
+        self.deduplicated = 0
+
+        if database is None and path is not None:
+            if path != ":memory:":
+                pathlib.Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False, timeout=busy_timeout)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        if database is not None or self._conn is not None:
+            with self._transaction() as conn:
+                self._conn = conn
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS blobs ("
+                    "digest TEXT PRIMARY KEY, text TEXT NOT NULL, refs INTEGER NOT NULL)"
+                )
+
+        logger.info(f"✅ Blob store created ({self.path or 'memory'})")
+
+    @contextlib.contextmanager
+    def _transaction(self) -> Iterator[Optional[sqlite3.Connection]]:
+        """
+        The store's lock, plus a transaction on its database if it has one
+        (joining any transaction open on a shared session store).
+        """
+        if self._database is not None:
+            # Session store lock first, then ours: the order every caller uses
+            with self._database.transaction() as conn, self._lock:
+                yield conn
+            return
+        with self._lock:
+            if self._conn is None:
+                yield None
+                return
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.rollback()
+                raise
+            self._conn.commit()
+
+    def put(self, text: str) -> str:
+        """
+        Store a text, or add a reference to the stored copy.
+
+        Returns:
+            The text's digest
+        """
+        digest = content_digest(text)
+        with self._transaction() as conn:
+            self.puts += 1
+            if conn is None:
+                if digest in self._refs:
+                    self.deduplicated += 1
+                self._refs[digest] = self._refs.get(digest, 0) + 1
+                self._texts[digest] = self._texts.get(digest, text)
+                return digest
+
+            # Only the first copy of a text is written
+            added = conn.execute(
+                "UPDATE blobs SET refs = refs + 1 WHERE digest = ?", (digest,)
+            ).rowcount
+            if added:
+                self.deduplicated += 1
+            else:
+                conn.execute(
+                    "INSERT INTO blobs (digest, text, refs) VALUES (?, ?, 1)", (digest, text)
+                )
+            self._cache(digest, self._texts.get(digest, text))
+        return digest
+
+    def get(self, digest: str) -> str:
+        """
+        Text stored under a digest.
+
+        Raises:
+            KeyError: If no text is stored under it
+        """
+        with self._lock:
+            text = self._texts.get(digest)
+            if text is not None:
+                if self._conn is not None:
+                    self._texts.move_to_end(digest)
+                return text
+            if self._conn is None:
+                raise KeyError(digest)
+        with self._transaction() as conn:
+            row = conn.execute("SELECT text FROM blobs WHERE digest = ?", (digest,)).fetchone()
+            if row is None:
+                raise KeyError(digest)
+            self._cache(digest, row[0])
+            return row[0]
+
+    def release(self, digest: str):
+        """Drop a reference; the text is deleted with its last one"""
+        with self._transaction() as conn:
+            if conn is None:
+                refs = self._refs.get(digest, 0) - 1
+                if refs > 0:
+                    self._refs[digest] = refs
+                else:
+                    self._refs.pop(digest, None)
+                    self._texts.pop(digest, None)
+                return
+
+            conn.execute("UPDATE blobs SET refs = refs - 1 WHERE digest = ?", (digest,))
+            deleted = conn.execute(
+                "DELETE FROM blobs WHERE digest = ? AND refs <= 0", (digest,)
+            ).rowcount
+            if deleted:
+                self._texts.pop(digest, None)
+
+    def refs(self, digest: str) -> int:
+        """References held on a digest (0 if not stored)"""
+        with self._transaction() as conn:
+            if conn is None:
+                return self._refs.get(digest, 0)
+            row = conn.execute("SELECT refs FROM blobs WHERE digest = ?", (digest,)).fetchone()
+        return row[0] if row else 0
+
+    def __contains__(self, digest: object) -> bool:
+        return self.refs(digest) > 0
+
+    def __len__(self) -> int:
+        with self._transaction() as conn:
+            if conn is None:
+                return len(self._refs)
+            return conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0]
+
+    def get_stats(self) -> dict:
+        """Get blob counts, stored bytes and how many puts reused a stored text"""
+        with self._transaction() as conn:
+            if conn is None:
+                blobs = len(self._refs)
+                refs = sum(self._refs.values())
+                stored = sum(len(self._texts[d].encode("utf-8")) for d in self._refs)
+            else:
+                blobs, refs, stored = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(refs), 0), COALESCE(SUM(LENGTH(CAST(text AS BLOB))), 0) FROM blobs"
+                ).fetchone()
+        return {
+            "backend": "sqlite" if self._conn is not None else "memory",
+            "blobs": blobs,
+            "references": refs,
+            "stored_bytes": stored,
+            "puts": self.puts,
+            "deduplicated": self.deduplicated,
+            "cached_texts": len(self._texts),
+        }
+
+    def _cache(self, digest: str, text: str):
+        self._texts[digest] = text
+        self._texts.move_to_end(digest)
+        while len(self._texts) > self.cache_entries:
+            self._texts.popitem(last=False)
+
+    def close(self):
+        """Close the database connection (a shared one is closed by its session store)"""
+        if self._conn is not None and self._database is None:
+            with self._lock:
+                self._conn.close()
+
+
+def build_blob_store(sessions: Optional[MutableMapping] = None) -> BlobStore:
+    """
+    Blob store next to the sessions: on the connection of their SQLite
+    store (behind the session cache or not), or in memory.
+    """
+    database = getattr(sessions, "cold", sessions)
+    if isinstance(database, SQLiteSessionStore):
+        try:
+            return BlobStore(database=database, cache_entries=Config.BLOB_CACHE_ENTRIES)
+        except Exception as e:
+            logger.error(f"❌ Could not create blob table, keeping blobs in memory: {str(e)}")
+    return BlobStore()
+
+
+logger.info("Blob store module loaded")
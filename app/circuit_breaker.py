@@ -0,0 +1,156 @@
+# app/circuit_breaker.py
+"""
+Per-provider circuit breaker
+closed → open on failures, open → half-open after a cool-down, and
+half-open → closed once probe requests succeed.
+"""
+import logging
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Tracks the health of one provider"""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 3,
+        cooldown_seconds: float = 60.0,
+        half_open_max_probes: int = 1,
+        success_threshold: int = 1,
+        history_limit: int = 50
+    ):
+        """
+        Initialize the breaker.
+
+        Args:
+            name: Provider name
+            failure_threshold: Consecutive failures that open the circuit
+            cooldown_seconds: Time spent open before probing again
+            half_open_max_probes: Concurrent probe requests allowed when half-open
+            success_threshold: Successful probes needed to close again
+            history_limit: Number of state transitions kept
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.half_open_max_probes = half_open_max_probes
+        self.success_threshold = success_threshold
+        self.history_limit = history_limit
+
+        self._state = CLOSED
+        self.consecutive_failures = 0
+        self.probe_successes = 0
+        self.probes_in_flight = 0
+        self.opened_at: Optional[float] = None
+        self.open_count = 0
+        self.transitions: List[Dict] = []
+
+    @property
+    def state(self) -> str:
+        """
+        Current state. Reading it changes nothing: an open circuit turns
+        half-open in allow_request(), once the cool-down has elapsed.
+        """
+        return self._state
+
+    def _cooled_down(self) -> bool:
+        return self.opened_at is not None and time.monotonic() - self.opened_at >= self.cooldown_seconds
+
+    def allow_request(self) -> bool:
+        """
+        Check whether a request may be sent to this provider.
+        In half-open state this reserves one of the probe slots, so every
+        allowed request must be followed by record_success/record_failure.
+        """
+        if self._state == OPEN and self._cooled_down():
+            self._transition(HALF_OPEN, "cool-down elapsed")
+        state = self._state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and self.probes_in_flight < self.half_open_max_probes:
+            self.probes_in_flight += 1
+            logger.info(f"🔍 {self.name}: sending half-open probe request")
+            return True
+        return False
+
+    def record_success(self):
+        """Record a successful request"""
+        self.consecutive_failures = 0
+        if self._state == HALF_OPEN:
+            self.probes_in_flight = max(0, self.probes_in_flight - 1)
+            self.probe_successes += 1
+            if self.probe_successes >= self.success_threshold:
+                self._transition(CLOSED, "probe succeeded")
+
+    def record_failure(self, reason: str = "", trip: bool = False):
+        """
+        Record a failed request.
+
+        Args:
+            reason: Error description for the transition log
+            trip: Open immediately regardless of the failure threshold
+                (used for quota/rate-limit errors)
+        """
+        self.consecutive_failures += 1
+
+        if self._state == HALF_OPEN:
+            self.probes_in_flight = max(0, self.probes_in_flight - 1)
+            self._transition(OPEN, f"probe failed: {reason}")
+        elif self._state == CLOSED and (trip or self.consecutive_failures >= self.failure_threshold):
+            self._transition(OPEN, reason)
+
+    def release_probe(self):
+        """Give back a probe slot without a verdict (e.g. the call was cancelled)"""
+        if self._state == HALF_OPEN:
+            self.probes_in_flight = max(0, self.probes_in_flight - 1)
+
+    def _transition(self, new_state: str, reason: str):
+        old_state = self._state
+        if old_state == new_state:
+            return
+
+        self._state = new_state
+        if new_state == OPEN:
+            self.opened_at = time.monotonic()
+            self.open_count += 1
+        if new_state in (OPEN, CLOSED):
+            self.probes_in_flight = 0
+        if new_state != HALF_OPEN:
+            self.probe_successes = 0
+        if new_state == CLOSED:
+            self.consecutive_failures = 0
+            self.opened_at = None
+
+        self.transitions.append({
+            "from": old_state,
+            "to": new_state,
+            "reason": reason,
+            "at": time.time()
+        })
+        if len(self.transitions) > self.history_limit:
+            del self.transitions[:len(self.transitions) - self.history_limit]
+
+        log = logger.warning if new_state == OPEN else logger.info
+        log(f"⚡ Circuit {self.name}: {old_state} → {new_state} ({reason})")
+
+    def get_status(self) -> dict:
+        """Get breaker state and transition history"""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "open_count": self.open_count,
+            "probes_in_flight": self.probes_in_flight,
+            "cooldown_seconds": self.cooldown_seconds,
+            "transitions": list(self.transitions)
+        }
+
+
+logger.info("Circuit breaker module loaded")
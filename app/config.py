@@ -40,9 +40,11 @@ import os
 import sys
 import logging
 import pathlib
-from typing import Dict, Any, Optional
+import threading
+from typing import Dict, Any, Optional, Tuple
 from dotenv import load_dotenv
 from autogen_ext.models.openai import OpenAIChatCompletionClient
+from app.circuit_breaker import CircuitBreaker, CLOSED
 
 # Load environment variables
 load_dotenv()
@@ -119,6 +121,7 @@ class Config:
     # Model Configuration
     PRIMARY_PROVIDER = "gemini"
     GEMINI_MODEL = "gemini-2.5-flash"
+    GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/openai/"
     
     BACKUP_PROVIDER = "openrouter"
     OPENROUTER_MODEL = "tngtech/deepseek-r1t2-chimera:free"
@@ -129,6 +132,149 @@ class Config:
     MAX_ROUND_ROBIN_TURNS = 3
     TIMEOUT = 300
     
+    # Agent invocation
+    # Stateless agents rebuild the model context on every call instead of
+    # reusing one AssistantAgent whose history grows with every session.
+    AGENT_STATELESS = os.getenv("AGENT_STATELESS", "true").lower() == "true"
+    AGENT_SESSION_MEMORY_TURNS = int(os.getenv("AGENT_SESSION_MEMORY_TURNS", "10"))
+    AGENT_HISTORY_LIMIT = int(os.getenv("AGENT_HISTORY_LIMIT", "100"))
+    
+    # Per-branch timeout (seconds) for concurrent question generation
+    SESSION_BRANCH_TIMEOUT = float(os.getenv("SESSION_BRANCH_TIMEOUT", "90"))
+    
+    # Interview session store. "sqlite" keeps sessions in a WAL-mode
+    # database shared by every uvicorn worker and surviving restarts;
+    # "memory" keeps them in-process (single worker only).
+    SESSION_BACKEND = os.getenv("SESSION_BACKEND", "sqlite").lower()
+    SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", "data/sessions.sqlite3")
+    SESSION_UPDATE_RETRIES = int(os.getenv("SESSION_UPDATE_RETRIES", "5"))
+    # Session database calls run on the event loop, so a write lock held by
+    # another worker is waited for this long at most (then the call fails)
+    SESSION_DB_BUSY_TIMEOUT_MS = int(os.getenv("SESSION_DB_BUSY_TIMEOUT_MS", "200"))
+    # Changes are appended to a per-session event log; the full session is
+    # rewritten as a snapshot only every N events
+    SESSION_SNAPSHOT_INTERVAL = int(os.getenv("SESSION_SNAPSHOT_INTERVAL", "20"))
+    # Hot in-process cache over the SQLite store: reads are served from
+    # memory when the stored version matches, and changes are written back
+    # (coalesced) after a short delay
+    SESSION_CACHE_ENABLED = os.getenv("SESSION_CACHE_ENABLED", "true").lower() == "true"
+    SESSION_WRITE_BEHIND_SECONDS = float(os.getenv("SESSION_WRITE_BEHIND_SECONDS", "0.1"))
+    # Idle sessions expire; in memory (or the hot cache), the least recently
+    # used are evicted past the entry/size limits (0 = no limit). With spilling on, evicted
+    # sessions are written to disk instead of dropped.
+    SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", "7200"))
+    SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", "1000"))
+    SESSION_MAX_BYTES = int(os.getenv("SESSION_MAX_BYTES", str(256 * 1024 * 1024)))
+    SESSION_SPILL_ENABLED = os.getenv("SESSION_SPILL_ENABLED", "false").lower() == "true"
+    SESSION_SPILL_DIR = os.getenv("SESSION_SPILL_DIR", "data/sessions")
+    # Expired sessions are pruned (and their texts released) by a background
+    # task this often
+    SESSION_PRUNE_INTERVAL_SECONDS = float(os.getenv("SESSION_PRUNE_INTERVAL_SECONDS", "300"))
+    # Resume/JD texts are stored once per unique document (in the session
+    # database, or in memory) and sessions keep their digest; this many
+    # texts are cached in each process
+    BLOB_CACHE_ENTRIES = int(os.getenv("BLOB_CACHE_ENTRIES", "1000"))
+    
+    # LLM response cache (in-memory LRU over an on-disk SQLite tier)
+    CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+    CACHE_MEMORY_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_MAX_ENTRIES", "512"))
+    CACHE_DISK_ENABLED = os.getenv("LLM_CACHE_DISK_ENABLED", "true").lower() == "true"
+    CACHE_DISK_PATH = os.getenv("LLM_CACHE_DISK_PATH", "data/llm_cache.sqlite3")
+    CACHE_DISK_MAX_ENTRIES = int(os.getenv("LLM_CACHE_DISK_MAX_ENTRIES", "10000"))
+    
+    # Coalesce identical in-flight LLM requests onto one provider call
+    SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+    
+    # Proactive per-provider rate limits (0 = unlimited, the default). Set
+    # them to your plan's quota (e.g. GEMINI_RPM=10, GEMINI_TPM=250000 on the
+    # Gemini free tier) and calls queue for budget instead of running into 429s.
+    RATE_LIMITS = {
+        "gemini": {
+            "requests_per_minute": float(os.getenv("GEMINI_RPM", "0")),
+            "tokens_per_minute": float(os.getenv("GEMINI_TPM", "0")),
+            "max_concurrency": int(os.getenv("GEMINI_MAX_CONCURRENCY", "0")),
+        },
+        "openrouter": {
+            "requests_per_minute": float(os.getenv("OPENROUTER_RPM", "0")),
+            "tokens_per_minute": float(os.getenv("OPENROUTER_TPM", "0")),
+            "max_concurrency": int(os.getenv("OPENROUTER_MAX_CONCURRENCY", "0")),
+        },
+    }
+    RATE_LIMIT_COMPLETION_TOKENS = int(os.getenv("RATE_LIMIT_COMPLETION_TOKENS", "800"))
+    
+    # Per-provider circuit breaker. Quota errors open the circuit at once;
+    # other errors after CIRCUIT_FAILURE_THRESHOLD in a row. After the
+    # cool-down, probe requests decide whether to route back to the primary.
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "3"))
+    CIRCUIT_COOLDOWN_SECONDS = float(os.getenv("CIRCUIT_COOLDOWN_SECONDS", "60"))
+    CIRCUIT_HALF_OPEN_PROBES = int(os.getenv("CIRCUIT_HALF_OPEN_PROBES", "1"))
+    CIRCUIT_SUCCESS_THRESHOLD = int(os.getenv("CIRCUIT_SUCCESS_THRESHOLD", "1"))
+    
+    # Hedged requests: once a call outlives the agent's HEDGE_PERCENTILE
+    # latency, the same request also goes to the backup provider and the
+    # first answer wins. Costs extra calls, so it is opt-in.
+    HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "false").lower() == "true"
+    HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+    HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+    HEDGE_DEFAULT_DELAY = float(os.getenv("HEDGE_DEFAULT_DELAY", "30"))
+    HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", "2"))
+    HEDGE_WINDOW = int(os.getenv("HEDGE_WINDOW", "200"))
+    
+    # Retry policy for transient errors (rate limits, timeouts, connection
+    # resets, 5xx): exponential backoff with jitter, bounded by attempts and
+    # an overall deadline. The OpenAI SDK's own retries are turned off by
+    # default so the two don't multiply.
+    RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "3"))
+    RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "0.5"))
+    RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "8"))
+    RETRY_JITTER = float(os.getenv("RETRY_JITTER", "0.5"))
+    RETRY_DEADLINE = float(os.getenv("RETRY_DEADLINE", "45"))
+    OPENAI_CLIENT_MAX_RETRIES = int(os.getenv("OPENAI_CLIENT_MAX_RETRIES", "0"))
+    
+    # Use the provider's native structured output (JSON schema response
+    # format) for evaluations, match scores and reports where the model
+    # supports it; otherwise JSON is requested in the prompt and repaired
+    # with one follow-up call if it doesn't validate
+    STRUCTURED_OUTPUT_ENABLED = os.getenv("STRUCTURED_OUTPUT_ENABLED", "true").lower() == "true"
+    
+    # Shared HTTP connection pool per provider, reused by every client,
+    # and warmed up at startup so the first request skips the handshakes
+    HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+    HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "10"))
+    HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "120"))
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+    HTTP_WARMUP_ENABLED = os.getenv("HTTP_WARMUP_ENABLED", "true").lower() == "true"
+    HTTP_WARMUP_CONNECTIONS = int(os.getenv("HTTP_WARMUP_CONNECTIONS", "2"))
+    HTTP_WARMUP_TIMEOUT = float(os.getenv("HTTP_WARMUP_TIMEOUT", "5"))
+    
+    # Token prices (USD per million tokens) for the cost metrics on /metrics
+    MODEL_PRICES = {
+        "gemini": {
+            "prompt_per_million": float(os.getenv("GEMINI_PROMPT_PRICE", "0.30")),
+            "completion_per_million": float(os.getenv("GEMINI_COMPLETION_PRICE", "2.50")),
+        },
+        "openrouter": {
+            "prompt_per_million": float(os.getenv("OPENROUTER_PROMPT_PRICE", "0")),
+            "completion_per_million": float(os.getenv("OPENROUTER_COMPLETION_PRICE", "0")),
+        },
+    }
+
+    # Prompt token budgets per prompt (resume/JD/history sections are
+    # trimmed to fit instead of being sliced at fixed character counts)
+    PROMPT_BUDGETS = {
+        "coding_problem": int(os.getenv("PROMPT_BUDGET_CODING_PROBLEM", "800")),
+        "resume_questions": int(os.getenv("PROMPT_BUDGET_RESUME_QUESTIONS", "1500")),
+        "match_score": int(os.getenv("PROMPT_BUDGET_MATCH_SCORE", "1500")),
+        "report": int(os.getenv("PROMPT_BUDGET_REPORT", "6000")),
+        "group_chat": int(os.getenv("PROMPT_BUDGET_GROUP_CHAT", "400")),
+        "collaborative_report": int(os.getenv("PROMPT_BUDGET_COLLABORATIVE_REPORT", "1500")),
+        "evaluation_batch": int(os.getenv("PROMPT_BUDGET_EVALUATION_BATCH", "6000")),
+    }
+    # Shrink resume/JD sections to the passages most relevant to the other
+    # document (local BM25) rather than cutting them off at the end
+    PROMPT_RELEVANCE_SELECTION = os.getenv("PROMPT_RELEVANCE_SELECTION", "true").lower() == "true"
+
     # Track current provider
     CURRENT_PROVIDER = PRIMARY_PROVIDER
     FAILOVER_COUNT = 0
@@ -140,6 +286,46 @@ class Config:
         3: "Behavioral"
     }
     
+    # Deferred evaluation: answers are recorded at once and evaluated in
+    # batches (several Q&A pairs per call) at round boundaries and before
+    # the report. Experience mode never shows per-answer feedback, so it
+    # defers by default.
+    EXPERIENCE_DEFERRED_EVALUATION = os.getenv("EXPERIENCE_DEFERRED_EVALUATION", "true").lower() == "true"
+    EVALUATION_BATCH_SIZE = int(os.getenv("EVALUATION_BATCH_SIZE", "5"))
+    # Background evaluation: teach mode returns the next question at once and
+    # the feedback is fetched from /evaluation once the evaluator finishes
+    TEACH_BACKGROUND_EVALUATION = os.getenv("TEACH_BACKGROUND_EVALUATION", "true").lower() == "true"
+    # A worker claims pending answers on the session before evaluating them;
+    # other workers wait for its results instead of evaluating them again,
+    # unless the claim is older than this (e.g. the worker died)
+    EVALUATION_CLAIM_SECONDS = float(os.getenv("EVALUATION_CLAIM_SECONDS", "120"))
+    EVALUATION_CLAIM_POLL_SECONDS = float(os.getenv("EVALUATION_CLAIM_POLL_SECONDS", "0.5"))
+    # Generate both adaptive second coding problems (easy and hard) in the
+    # background while the candidate answers the first; the unused one is
+    # cancelled once the first score is known
+    CODING_PREFETCH_ENABLED = os.getenv("CODING_PREFETCH_ENABLED", "true").lower() == "true"
+    # How long an answer waits for the prefetched problem it picked before
+    # falling back to the canned one (the baseline never waited)
+    CODING_PREFETCH_WAIT_SECONDS = float(os.getenv("CODING_PREFETCH_WAIT_SECONDS", "2"))
+    
+    @classmethod
+    def get_base_url(cls, provider: str) -> str:
+        """Get the API base URL for a provider"""
+        return cls.GEMINI_BASE_URL if provider == "gemini" else cls.OPENROUTER_BASE_URL
+    
+    @classmethod
+    def get_api_key(cls, provider: str) -> Optional[str]:
+        """Get the API key for a provider"""
+        return cls.GEMINI_API_KEY if provider == "gemini" else cls.OPENROUTER_API_KEY
+    
+    @classmethod
+    def get_model_name(cls, provider: Optional[str] = None) -> str:
+        """Get the model name used for a provider (defaults to the current one)"""
+        provider = provider or cls.CURRENT_PROVIDER
+        if provider == "openrouter":
+            return cls.OPENROUTER_MODEL
+        return cls.GEMINI_MODEL
+    
     @classmethod
     def validate(cls):
         """Validate configuration"""
@@ -182,10 +368,21 @@ class Config:
 # ============================================
 
 class ModelClientFactory:
-    """Factory to create and manage model clients with failover"""
+    """
+    Factory to create and manage model clients with failover.
+    
+    Every provider switch bumps a generation counter. Callers remember the
+    generation they were routed under and report failures with it, so a
+    burst of concurrent errors from one failure epoch produces exactly one
+    switch; later reports from the same epoch are recognised as stale.
+    """
     
     _current_client = None
+    _clients: Dict[str, Any] = {}
     _client_history = []
+    _breakers: Dict[str, CircuitBreaker] = {}
+    _generation = 0
+    _lock = threading.RLock()
     
     @classmethod
     def create_client(cls, provider: Optional[str] = None):
@@ -221,9 +418,15 @@ class ModelClientFactory:
         
         logger.info(f"✅ Creating Gemini client: {Config.GEMINI_MODEL}")
         
+        # Imported here: app.http_pool reads Config
+        from app.http_pool import HTTPPoolRegistry
+        
         client = OpenAIChatCompletionClient(
             model=Config.GEMINI_MODEL,
-            api_key=Config.GEMINI_API_KEY
+            api_key=Config.GEMINI_API_KEY,
+            base_url=Config.GEMINI_BASE_URL,
+            max_retries=Config.OPENAI_CLIENT_MAX_RETRIES,
+            http_client=HTTPPoolRegistry.get("gemini")
         )
         
         logger.info("✅ Gemini client created successfully")
@@ -238,15 +441,21 @@ class ModelClientFactory:
         
         logger.info(f"✅ Creating OpenRouter client: {Config.OPENROUTER_MODEL}")
         
+        # Imported here: app.http_pool reads Config
+        from app.http_pool import HTTPPoolRegistry
+        
         client = OpenAIChatCompletionClient(
             base_url=Config.OPENROUTER_BASE_URL,
             model=Config.OPENROUTER_MODEL,
             api_key=Config.OPENROUTER_API_KEY,
+            max_retries=Config.OPENAI_CLIENT_MAX_RETRIES,
+            http_client=HTTPPoolRegistry.get("openrouter"),
             model_info={
                 "family": "deepseek",
                 "vision": True,
                 "function_calling": True,
-                "json_output": False
+                "json_output": False,
+                "structured_output": False
             }
         )
         
@@ -254,25 +463,257 @@ class ModelClientFactory:
         return client
     
     @classmethod
-    def get_client(cls):
-        """Get the current active client"""
+    def get_client(cls, provider: Optional[str] = None):
+        """Get the (cached) client for a provider, defaulting to the active one"""
         if Config.MOCK_MODE:
             logger.info("🎭 Mock mode - returning None client")
             return None
         
-        if cls._current_client is None:
-            logger.info("📡 No active client found, creating one...")
-            cls._current_client = cls.create_client()
+        with cls._lock:
+            if provider is None:
+                provider = Config.CURRENT_PROVIDER
+            
+            client = cls._clients.get(provider)
+            if client is None:
+                logger.info(f"📡 No {provider} client found, creating one...")
+                client = cls.create_client(provider)
+                cls._clients[provider] = client
+            
+            if provider == Config.CURRENT_PROVIDER:
+                cls._current_client = client
+            
+            return client
+    
+    @classmethod
+    def get_breaker(cls, provider: str) -> CircuitBreaker:
+        """Get (or create) the circuit breaker for a provider"""
+        breaker = cls._breakers.get(provider)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                provider,
+                failure_threshold=Config.CIRCUIT_FAILURE_THRESHOLD,
+                cooldown_seconds=Config.CIRCUIT_COOLDOWN_SECONDS,
+                half_open_max_probes=Config.CIRCUIT_HALF_OPEN_PROBES,
+                success_threshold=Config.CIRCUIT_SUCCESS_THRESHOLD
+            )
+            cls._breakers[provider] = breaker
+        return breaker
+    
+    @classmethod
+    def has_key(cls, provider: str) -> bool:
+        """Check whether a provider has an API key configured"""
+        if provider == "gemini":
+            return bool(Config.GEMINI_API_KEY)
+        if provider == "openrouter":
+            return bool(Config.OPENROUTER_API_KEY)
+        return False
+    
+    @classmethod
+    def get_generation(cls) -> int:
+        """Current failover generation (bumped on every provider switch)"""
+        return cls._generation
+    
+    @classmethod
+    def acquire_provider(cls) -> str:
+        """Pick the provider for the next request (see acquire_route)"""
+        return cls.acquire_route()[0]
+    
+    @classmethod
+    def acquire_route(cls) -> Tuple[str, int]:
+        """
+        Pick the provider for the next request.
+        
+        The primary is used whenever its circuit allows it; while it is
+        half-open only the probe requests go to it and everything else goes
+        to the backup. Every acquired provider must be reported back through
+        record_success / record_failure / release_provider.
+        
+        Returns:
+            Tuple of (provider name, failover generation)
+        """
+        primary = Config.PRIMARY_PROVIDER
+        backup = Config.BACKUP_PROVIDER
+        
+        with cls._lock:
+            if Config.MOCK_MODE:
+                return Config.CURRENT_PROVIDER, cls._generation
+            
+            if cls.has_key(primary) and cls.get_breaker(primary).allow_request():
+                return primary, cls._generation
+            if cls.has_key(backup) and cls.get_breaker(backup).allow_request():
+                return backup, cls._generation
+            
+            # Every circuit is open - keep using the active provider rather than fail
+            return Config.CURRENT_PROVIDER, cls._generation
+    
+    @classmethod
+    def peek_route(cls) -> str:
+        """
+        Provider acquire_route would pick now, without acquiring it (no
+        probe is used up), e.g. to look up cached responses.
+        """
+        with cls._lock:
+            if Config.MOCK_MODE:
+                return Config.CURRENT_PROVIDER
+            for provider in (Config.PRIMARY_PROVIDER, Config.BACKUP_PROVIDER):
+                if cls.has_key(provider) and cls.get_breaker(provider).state == CLOSED:
+                    return provider
+            return Config.CURRENT_PROVIDER
+    
+    @classmethod
+    def record_success(cls, provider: str, generation: Optional[int] = None):
+        """Report a successful request; closes a half-open circuit"""
+        with cls._lock:
+            breaker = cls.get_breaker(provider)
+            breaker.record_success()
+            
+            if (
+                provider == Config.PRIMARY_PROVIDER
+                and Config.CURRENT_PROVIDER != provider
+                and breaker.state == CLOSED
+            ):
+                cls._switch(Config.CURRENT_PROVIDER, provider, "primary recovered")
+    
+    @classmethod
+    def record_failure(
+        cls,
+        provider: str,
+        error_msg: str = "",
+        trip: bool = False,
+        generation: Optional[int] = None
+    ) -> bool:
+        """
+        Report a failed request.
+        
+        Args:
+            provider: Provider that failed
+            error_msg: Error description
+            trip: Open the circuit immediately (quota / rate-limit errors)
+            generation: Generation the request was routed under; failures
+                from an earlier generation are stale and ignored
+            
+        Returns:
+            True if this report caused a provider switch
+        """
+        with cls._lock:
+            breaker = cls.get_breaker(provider)
+            
+            if generation is not None and generation != cls._generation:
+                logger.info(
+                    f"🔁 Ignoring stale {provider} failure from generation {generation} "
+                    f"(now {cls._generation})"
+                )
+                breaker.release_probe()
+                return False
+            
+            breaker.record_failure(error_msg, trip=trip)
+            
+            if breaker.state != CLOSED and Config.CURRENT_PROVIDER == provider:
+                backup = cls._other(provider)
+                if cls.has_key(backup):
+                    cls._switch(provider, backup, error_msg)
+                    return True
+                logger.critical(f"❌ CRITICAL: {provider} circuit open and no backup configured!")
+            return False
+    
+    @classmethod
+    def get_alternate(cls, provider: str) -> Optional[str]:
+        """Get the other provider if it is configured and its circuit is closed"""
+        with cls._lock:
+            other = cls._other(provider)
+            if Config.MOCK_MODE or not cls.has_key(other):
+                return None
+            if cls.get_breaker(other).state != CLOSED:
+                return None
+            return other
+    
+    @classmethod
+    def supports_structured_output(cls, provider: str) -> bool:
+        """Check whether a provider's model accepts a JSON schema response format"""
+        if not Config.STRUCTURED_OUTPUT_ENABLED:
+            return False
+        client = cls.get_client(provider)
+        model_info = getattr(client, "model_info", None) or {}
+        return bool(model_info.get("structured_output", False))
+    
+    @classmethod
+    def admit_request(cls, provider: str) -> bool:
+        """
+        Ask a provider's circuit breaker to admit one request (e.g. a hedge
+        to the backup). An admitted request must be reported back like one
+        from acquire_route.
+        """
+        with cls._lock:
+            return cls.has_key(provider) and cls.get_breaker(provider).allow_request()
+    
+    @classmethod
+    def release_provider(cls, provider: str):
+        """Report a request that ended without a verdict (e.g. cancelled)"""
+        with cls._lock:
+            cls.get_breaker(provider).release_probe()
+    
+    @classmethod
+    def _other(cls, provider: str) -> str:
+        if provider == Config.PRIMARY_PROVIDER:
+            return Config.BACKUP_PROVIDER
+        return Config.PRIMARY_PROVIDER
+    
+    @classmethod
+    def _switch(cls, current: str, target: str, reason: str = ""):
+        """Make target the active provider and log the switch"""
+        logger.info(f"🔄 Switching from {current} to {target}...")
+        
+        # Create the target client before publishing the switch, so callers
+        # never observe a provider without a client
+        client = cls.get_client(target)
+        
+        Config.CURRENT_PROVIDER = target
+        if target != Config.PRIMARY_PROVIDER:
+            Config.FAILOVER_COUNT += 1
+        cls._current_client = client
+        cls._generation += 1
+        
+        # Log the switch
+        switch_info = {
+            "from": current,
+            "to": target,
+            "reason": reason,
+            "failover_number": Config.FAILOVER_COUNT,
+            "generation": cls._generation
+        }
+        cls._client_history.append(switch_info)
+        
+        logger.info("✅" + "=" * 60)
+        logger.info(f"✅ Now using: {target}")
+        logger.info(f"✅ Failover count: {Config.FAILOVER_COUNT}")
+        logger.info("✅" + "=" * 60)
         
         return cls._current_client
     
     @classmethod
-    def switch_to_backup(cls, error_msg: str = ""):
-        """Switch from primary to backup provider (failover)"""
+    def switch_to_backup(cls, error_msg: str = "", generation: Optional[int] = None):
+        """
+        Switch from the active provider to the other one (failover).
+        
+        Args:
+            error_msg: Reason for the switch
+            generation: Generation the failing request was routed under; if a
+                switch already happened since then, the current client is
+                returned instead of switching again
+        """
         if Config.MOCK_MODE:
             logger.info("🎭 Mock mode - simulating failover")
             return None
         
+        with cls._lock:
+            if generation is not None and generation != cls._generation:
+                logger.info(f"🔁 Failover already performed (generation {cls._generation}) - reusing client")
+                return cls.get_client()
+            return cls._switch_to_backup_locked(error_msg)
+    
+    @classmethod
+    def _switch_to_backup_locked(cls, error_msg: str):
+        """Perform the failover (caller holds the lock)"""
         current = Config.CURRENT_PROVIDER
         
         logger.warning("⚠️" + "=" * 60)
@@ -282,10 +723,7 @@ class ModelClientFactory:
         logger.warning("⚠️" + "=" * 60)
         
         # Determine backup provider
-        if current == "gemini":
-            backup = "openrouter"
-        else:
-            backup = "gemini"
+        backup = cls._other(current)
         
         # Check if backup is available
         if backup == "gemini" and not Config.GEMINI_API_KEY:
@@ -296,33 +734,12 @@ class ModelClientFactory:
             logger.critical("❌ CRITICAL: Cannot failover to OpenRouter - No API key!")
             raise ValueError("Failover failed: OpenRouter API key not configured")
         
-        # Perform the switch
-        logger.info(f"🔄 Switching from {current} to {backup}...")
+        # Open the failing provider's circuit so traffic only returns to it
+        # through half-open probes after the cool-down
+        cls.get_breaker(current).record_failure(error_msg, trip=True)
         
-        Config.CURRENT_PROVIDER = backup
-        Config.FAILOVER_COUNT += 1
-        
-        # Create new client
         try:
-            cls._current_client = cls.create_client(backup)
-            
-            # Log the switch
-            switch_info = {
-                "from": current,
-                "to": backup,
-                "reason": error_msg,
-                "failover_number": Config.FAILOVER_COUNT
-            }
-            cls._client_history.append(switch_info)
-            
-            logger.info("✅" + "=" * 60)
-            logger.info(f"✅ FAILOVER SUCCESSFUL!")
-            logger.info(f"✅ Now using: {backup}")
-            logger.info(f"✅ Failover count: {Config.FAILOVER_COUNT}")
-            logger.info("✅" + "=" * 60)
-            
-            return cls._current_client
-        
+            return cls._switch(current, backup, error_msg)
         except Exception as e:
             logger.critical(f"❌ FAILOVER FAILED: {str(e)}")
             raise
@@ -332,11 +749,16 @@ class ModelClientFactory:
         """Get current status of model clients"""
         return {
             "mock_mode": Config.MOCK_MODE,
+            "primary_provider": Config.PRIMARY_PROVIDER,
             "current_provider": Config.CURRENT_PROVIDER,
             "failover_count": Config.FAILOVER_COUNT,
             "has_gemini_key": bool(Config.GEMINI_API_KEY),
             "has_openrouter_key": bool(Config.OPENROUTER_API_KEY),
-            "switch_history": cls._client_history
+            "switch_history": cls._client_history,
+            "generation": cls._generation,
+            "circuit_breakers": {
+                name: breaker.get_status() for name, breaker in cls._breakers.items()
+            }
         }
 
 
@@ -0,0 +1,18 @@
+# app/hashing.py
+"""
+Content hashing
+Digests of document text, shared by the blob store (as blob keys) and
+by caches keyed on content, without pulling in either.
+"""
+import hashlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def content_digest(text: str) -> str:
+    """SHA-256 hex digest of a text: its key in the blob store and in caches"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+logger.info("Hashing module loaded")
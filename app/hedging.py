@@ -0,0 +1,142 @@
+# app/hedging.py
+"""
+Hedged requests
+When a call runs past the agent's latency percentile, the same request is
+sent to the backup provider and whichever answers first wins.
+"""
+import asyncio
+import logging
+import math
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyTracker:
+    """Sliding window of call latencies (seconds)"""
+
+    def __init__(self, window: int = 200):
+        self.samples: deque = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, pct: float, min_samples: int = 1) -> Optional[float]:
+        """
+        Get a latency percentile.
+
+        Args:
+            pct: Percentile (0-100)
+            min_samples: Samples required before answering
+
+        Returns:
+            Latency in seconds, or None if there are too few samples
+        """
+        if len(self.samples) < max(min_samples, 1):
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, math.ceil(pct / 100.0 * len(ordered)) - 1))
+        return ordered[index]
+
+
+class HedgeStats:
+    """Per-agent hedging counters"""
+
+    def __init__(self):
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _for(self, agent: str) -> Dict[str, int]:
+        return self._stats.setdefault(agent, {
+            "calls": 0,
+            "hedged": 0,
+            "backup_wins": 0,
+            "primary_wins": 0
+        })
+
+    def record(self, agent: str, hedged: bool, winner: Optional[str] = None):
+        stats = self._for(agent)
+        stats["calls"] += 1
+        if hedged:
+            stats["hedged"] += 1
+            if winner == "backup":
+                stats["backup_wins"] += 1
+            elif winner == "primary":
+                stats["primary_wins"] += 1
+
+    def get_stats(self) -> dict:
+        """Get counters with hedge rate and backup win rate per agent"""
+        result = {}
+        for agent, stats in self._stats.items():
+            result[agent] = dict(
+                stats,
+                hedge_rate=f"{(stats['hedged'] / max(stats['calls'], 1)) * 100:.1f}%",
+                backup_win_rate=f"{(stats['backup_wins'] / max(stats['hedged'], 1)) * 100:.1f}%"
+            )
+        return result
+
+    def reset(self):
+        self._stats = {}
+
+
+async def run_hedged(
+    primary: Callable[[], Awaitable[Any]],
+    backup: Callable[[], Awaitable[Any]],
+    delay: float,
+    allow_backup: Optional[Callable[[], bool]] = None
+) -> Tuple[Any, str, bool]:
+    """
+    Run primary(); if it has not finished after `delay` seconds, also run
+    backup() and return whichever succeeds first. The loser is cancelled.
+
+    Args:
+        primary: Factory for the primary coroutine
+        backup: Factory for the hedge coroutine
+        delay: Seconds to wait before hedging
+        allow_backup: Checked when the delay runs out (e.g. the backup's
+            circuit breaker); if it returns False, only the primary runs
+
+    Returns:
+        Tuple of (result, winner ("primary"/"backup"), hedged)
+
+    Raises:
+        The primary's exception if every attempt failed
+    """
+    primary_task = asyncio.ensure_future(primary())
+    tasks = {primary_task: "primary"}
+
+    try:
+        done, _ = await asyncio.wait({primary_task}, timeout=delay)
+        if done:
+            return primary_task.result(), "primary", False
+
+        if allow_backup is not None and not allow_backup():
+            logger.info(f"🏁 Primary still running after {delay:.2f}s - backup not available, not hedging")
+            return await primary_task, "primary", False
+
+        logger.info(f"🏁 Primary still running after {delay:.2f}s - sending hedge request")
+        backup_task = asyncio.ensure_future(backup())
+        tasks[backup_task] = "backup"
+
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.cancelled():
+                    logger.warning(f"⚠️ Hedged {tasks[task]} attempt was cancelled")
+                elif task.exception() is None:
+                    logger.info(f"🏁 Hedged call won by {tasks[task]}")
+                    return task.result(), tasks[task], True
+                else:
+                    logger.warning(f"⚠️ Hedged {tasks[task]} attempt failed: {task.exception()}")
+
+        # Both failed - surface the primary's error
+        return primary_task.result(), "primary", True
+
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+logger.info("Hedging module loaded")
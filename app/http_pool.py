@@ -0,0 +1,155 @@
+# app/http_pool.py
+"""
+Shared HTTP connection pools for model clients
+One pooled async HTTP client per provider, reused by every agent and team,
+with a warm-up step that opens connections before the first request.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+import openai
+
+# The HTTP library the OpenAI SDK is built on: httpx2 in current
+# releases, httpx before
+try:
+    import httpx2 as httpx
+except ImportError:
+    import httpx
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class HTTPPoolRegistry:
+    """Holds one pooled HTTP client per provider"""
+
+    _clients: Dict[str, Any] = {}
+    _warmups: Dict[str, Dict] = {}
+
+    @classmethod
+    def get(cls, provider: str):
+        """
+        Get (or create) the pooled HTTP client for a provider.
+
+        Args:
+            provider: Provider name
+
+        Returns:
+            An async HTTP client to pass as ``http_client`` to the OpenAI SDK
+        """
+        client = cls._clients.get(provider)
+        if client is None or client.is_closed:
+            client = openai.DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=Config.HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=Config.HTTP_MAX_KEEPALIVE,
+                    keepalive_expiry=Config.HTTP_KEEPALIVE_EXPIRY
+                ),
+                timeout=openai.Timeout(Config.TIMEOUT, connect=Config.HTTP_CONNECT_TIMEOUT)
+            )
+            cls._clients[provider] = client
+            logger.info(
+                f"🔌 HTTP pool for {provider}: max {Config.HTTP_MAX_CONNECTIONS} connections, "
+                f"{Config.HTTP_MAX_KEEPALIVE} keep-alive"
+            )
+        return client
+
+    @classmethod
+    async def warm_up(
+        cls,
+        base_urls: Dict[str, str],
+        api_keys: Optional[Dict[str, str]] = None,
+        connections: Optional[int] = None,
+        timeout: Optional[float] = None
+    ) -> Dict[str, Dict]:
+        """
+        Open connections ahead of traffic by sending cheap GET /models
+        requests (the response itself is ignored).
+
+        Args:
+            base_urls: Provider name → API base URL
+            api_keys: Provider name → API key (sent as a bearer token)
+            connections: Concurrent requests per provider
+                (defaults to Config.HTTP_WARMUP_CONNECTIONS)
+            timeout: Seconds to wait per provider
+                (defaults to Config.HTTP_WARMUP_TIMEOUT)
+
+        Returns:
+            Warm-up result per provider
+        """
+        connections = connections or Config.HTTP_WARMUP_CONNECTIONS
+        timeout = timeout or Config.HTTP_WARMUP_TIMEOUT
+        api_keys = api_keys or {}
+
+        async def warm(provider: str, base_url: str) -> Dict:
+            client = cls.get(provider)
+            url = base_url.rstrip("/") + "/models"
+            headers = {"Authorization": f"Bearer {api_keys[provider]}"} if api_keys.get(provider) else {}
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            try:
+                responses = await asyncio.wait_for(
+                    asyncio.gather(*(client.get(url, headers=headers) for _ in range(connections))),
+                    timeout=timeout
+                )
+                result = {
+                    "ok": True,
+                    "status_code": responses[0].status_code,
+                    "seconds": round(loop.time() - start, 3)
+                }
+                logger.info(f"🔥 Warmed up {provider} ({connections} connections in {result['seconds']}s)")
+            except Exception as e:
+                result = {"ok": False, "error": str(e) or type(e).__name__}
+                logger.warning(f"⚠️ Warm-up for {provider} failed: {result['error']}")
+            cls._warmups[provider] = result
+            return result
+
+        providers = list(base_urls)
+        results = await asyncio.gather(*(warm(p, base_urls[p]) for p in providers))
+        return dict(zip(providers, results))
+
+    @classmethod
+    def get_stats(cls) -> dict:
+        """Get open/idle/active connections and queued requests per pool"""
+        return {
+            provider: dict(_pool_stats(client), warm_up=cls._warmups.get(provider))
+            for provider, client in cls._clients.items()
+        }
+
+    @classmethod
+    async def close(cls):
+        """Close every pool"""
+        for provider, client in list(cls._clients.items()):
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.error(f"❌ Failed to close {provider} HTTP pool: {str(e)}")
+        cls._clients = {}
+        cls._warmups = {}
+
+
+def _pool_stats(client) -> dict:
+    """Read connection counts from the client's transport pool"""
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    if pool is None:
+        return {"available": False}
+
+    try:
+        connections: List = list(pool.connections)
+        requests: List = list(getattr(pool, "_requests", []))
+        idle = sum(1 for c in connections if c.is_idle())
+        return {
+            "open": len(connections),
+            "idle": idle,
+            "active": len(connections) - idle,
+            "waiting": sum(1 for r in requests if r.is_queued()),
+            "max_connections": Config.HTTP_MAX_CONNECTIONS,
+            "closed": client.is_closed
+        }
+    except Exception as e:
+        return {"available": False, "error": str(e)}
+
+
+logger.info("HTTP pool module loaded")
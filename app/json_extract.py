@@ -0,0 +1,155 @@
+# app/json_extract.py
+"""
+Incremental JSON object extraction
+Finds the first balanced JSON object in model output, as chunks arrive,
+skipping brace-containing asides that aren't valid (or don't match the
+expected schema) instead of grabbing everything between the first '{'
+and the last '}'.
+"""
+import json
+import logging
+from typing import Any, Optional, Type
+
+from pydantic import BaseModel, ValidationError
+
+logger = logging.getLogger(__name__)
+
+
+class JSONObjectExtractor:
+    """
+    Scans streamed text for the first balanced {...} that parses (and
+    validates against a schema, if given).
+
+    Usage:
+        extractor = JSONObjectExtractor(EvaluationResult)
+        for chunk in stream:
+            if extractor.feed(chunk) is not None:
+                break
+        result = extractor.finish()
+    """
+
+    def __init__(self, schema: Optional[Type[BaseModel]] = None):
+        """
+        Initialize the extractor.
+
+        Args:
+            schema: Pydantic model candidates must match; without one any
+                JSON object is accepted and returned as a dict
+        """
+        self.schema = schema
+        self.text = ""
+        self.result: Any = None
+        self._start: Optional[int] = None
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> Any:
+        """
+        Add text and scan it.
+
+        Args:
+            chunk: Next piece of the response
+
+        Returns:
+            The parsed object once one is complete, otherwise None
+        """
+        self.text += chunk
+        return self._scan()
+
+    def finish(self) -> Any:
+        """
+        Finish scanning once the response is complete. A '{' that never
+        closed (e.g. in prose) is skipped and scanning resumes after it.
+
+        Returns:
+            The parsed object, or None if the text has none
+        """
+        self._scan()
+        while self.result is None and self._start is not None:
+            self._restart(self._start + 1)
+            self._scan()
+        return self.result
+
+    def _restart(self, index: int):
+        """Start a new candidate at the next '{' at or after index"""
+        start = self.text.find("{", index)
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        if start < 0:
+            self._start = None
+            self._pos = len(self.text)
+        else:
+            self._start = start
+            self._pos = start + 1
+            self._depth = 1
+
+    def _scan(self) -> Any:
+        if self.result is not None:
+            return self.result
+
+        while True:
+            if self._start is None:
+                self._restart(self._pos)
+                if self._start is None:
+                    return None
+
+            text = self.text
+            while self._pos < len(text):
+                ch = text[self._pos]
+                self._pos += 1
+                if self._in_string:
+                    if self._escape:
+                        self._escape = False
+                    elif ch == "\\":
+                        self._escape = True
+                    elif ch == '"':
+                        self._in_string = False
+                elif ch == '"':
+                    self._in_string = True
+                elif ch == "{":
+                    self._depth += 1
+                elif ch == "}":
+                    self._depth -= 1
+                    if self._depth == 0:
+                        break
+            else:
+                # Candidate still open: wait for more text
+                return None
+
+            value = self._accept(text[self._start:self._pos])
+            if value is not None:
+                self.result = value
+                return value
+            # Not it: look for an object starting inside this one
+            self._restart(self._start + 1)
+
+    def _accept(self, candidate: str) -> Any:
+        try:
+            if self.schema is not None:
+                return self.schema.model_validate_json(candidate)
+            value = json.loads(candidate)
+            return value if isinstance(value, dict) else None
+        except (ValidationError, ValueError):
+            return None
+
+
+def extract_json(text: str, schema: Optional[Type[BaseModel]] = None) -> Any:
+    """
+    Find the first JSON object in a complete response.
+
+    Args:
+        text: Model response
+        schema: Pydantic model the object must match (optional)
+
+    Returns:
+        The validated model (or dict without a schema), or None
+    """
+    extractor = JSONObjectExtractor(schema)
+    extractor.feed(text or "")
+    return extractor.finish()
+
+
+logger.info("JSON extraction module loaded")
@@ -0,0 +1,337 @@
+# app/llm_cache.py
+"""
+LLM response cache
+Two-tier (in-memory LRU + on-disk SQLite) cache for BaseAgent.ask responses
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import pathlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class CacheTier:
+    """
+    Interface for a cache tier. Implementations store string values under
+    string keys with an absolute expiry timestamp.
+    """
+
+    name = "tier"
+    # Blocking tiers are called from a worker thread
+    blocking = False
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key: str) -> Optional[Tuple[str, float]]:
+        """(value, expires_at) of a live entry, or None"""
+        raise NotImplementedError
+
+    def set(self, key: str, value: str, expires_at: float):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class MemoryLRUTier(CacheTier):
+    """In-process LRU tier with per-entry expiry"""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get_entry(self, key: str) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value, expires_at
+
+    def set(self, key: str, value: str, expires_at: float):
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteTier(CacheTier):
+    """On-disk tier that survives restarts, evicting least recently used rows"""
+
+    name = "sqlite"
+    blocking = True
+
+    def __init__(self, path: str, max_entries: int = 10000):
+        self.path = path
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            pathlib.Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_llm_cache_access ON llm_cache (last_access)"
+            )
+            # Drop anything that expired while we were down
+            self._conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),))
+            self._conn.commit()
+
+        logger.info(f"💾 SQLite cache tier ready: {path}")
+
+    def get_entry(self, key: str) -> Optional[Tuple[str, float]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at <= now:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return value, expires_at
+
+    def set(self, key: str, value: str, expires_at: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, time.time())
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN ("
+                    "SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,)
+                )
+                self.evictions += overflow
+            self._conn.commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+
+class ResponseCache:
+    """
+    Multi-tier response cache. Lookups go through the tiers in order and a
+    hit in a lower tier is promoted into the tiers above it.
+    """
+
+    def __init__(self, tiers: List[CacheTier], ttl_seconds: float = 86400):
+        """
+        Initialize the cache.
+
+        Args:
+            tiers: Cache tiers, fastest first
+            ttl_seconds: Time-to-live for new entries
+        """
+        self.tiers = tiers
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.tier_hits: Dict[str, int] = {tier.name: 0 for tier in tiers}
+        logger.info(f"✅ Response cache created: {[t.name for t in tiers]} (TTL {ttl_seconds}s)")
+
+    @staticmethod
+    def make_key(
+        system_message: str,
+        prompt: str,
+        provider: str,
+        model: str,
+        temperature: float,
+        context: Optional[List[Dict]] = None,
+        output_schema: Optional[str] = None
+    ) -> str:
+        """
+        Build a cache key for a model call.
+
+        Returns:
+            SHA-256 hex digest of the request parameters
+        """
+        parts = [system_message, prompt, provider, model, temperature, context or []]
+        if output_schema:
+            # Structured-output calls are distinct requests
+            parts.append(output_schema)
+        payload = json.dumps(
+            parts,
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def _call(self, tier: CacheTier, method: str, *args) -> Any:
+        func = getattr(tier, method)
+        if tier.blocking:
+            return await asyncio.to_thread(func, *args)
+        return func(*args)
+
+    async def get(self, key: str) -> Optional[str]:
+        """Look up a key, promoting lower-tier hits"""
+        for index, tier in enumerate(self.tiers):
+            try:
+                entry = await self._call(tier, "get_entry", key)
+            except Exception as e:
+                logger.error(f"❌ Cache tier {tier.name} get failed: {str(e)}")
+                continue
+
+            if entry is not None:
+                value, expires_at = entry
+                self.hits += 1
+                self.tier_hits[tier.name] += 1
+                logger.debug(f"🎯 Cache hit ({tier.name}): {key[:12]}")
+
+                # Promoted copies keep the entry's expiry: reads don't extend it
+                for upper in self.tiers[:index]:
+                    await self._call(upper, "set", key, value, expires_at)
+                return value
+
+        self.misses += 1
+        logger.debug(f"💨 Cache miss: {key[:12]}")
+        return None
+
+    async def set(self, key: str, value: str, ttl_seconds: Optional[float] = None):
+        """Store a value in every tier"""
+        expires_at = time.time() + (ttl_seconds or self.ttl_seconds)
+        for tier in self.tiers:
+            try:
+                await self._call(tier, "set", key, value, expires_at)
+            except Exception as e:
+                logger.error(f"❌ Cache tier {tier.name} set failed: {str(e)}")
+
+    async def delete(self, key: str):
+        """Remove a key from every tier"""
+        for tier in self.tiers:
+            await self._call(tier, "delete", key)
+
+    def clear(self):
+        """Empty every tier and reset counters"""
+        for tier in self.tiers:
+            tier.clear()
+        self.hits = 0
+        self.misses = 0
+        self.tier_hits = {tier.name: 0 for tier in self.tiers}
+
+    def get_stats(self) -> dict:
+        """Get hit/miss counters and tier sizes"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": f"{(self.hits / max(total, 1)) * 100:.1f}%",
+            "tier_hits": dict(self.tier_hits),
+            "tiers": {
+                tier.name: {
+                    "entries": len(tier),
+                    "evictions": getattr(tier, "evictions", 0)
+                }
+                for tier in self.tiers
+            },
+            "ttl_seconds": self.ttl_seconds
+        }
+
+
+# ============================================
+# SHARED CACHE
+# ============================================
+
+_response_cache: Optional[ResponseCache] = None
+_cache_initialized = False
+
+
+def build_response_cache() -> Optional[ResponseCache]:
+    """Build the response cache described by Config (None if disabled)"""
+    if not Config.CACHE_ENABLED:
+        logger.info("🚫 LLM response cache disabled")
+        return None
+
+    tiers: List[CacheTier] = [MemoryLRUTier(max_entries=Config.CACHE_MEMORY_MAX_ENTRIES)]
+    if Config.CACHE_DISK_ENABLED:
+        try:
+            tiers.append(SQLiteTier(Config.CACHE_DISK_PATH, max_entries=Config.CACHE_DISK_MAX_ENTRIES))
+        except Exception as e:
+            logger.error(f"❌ Could not open disk cache, using memory only: {str(e)}")
+
+    return ResponseCache(tiers, ttl_seconds=Config.CACHE_TTL_SECONDS)
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Get the shared response cache, building it on first use"""
+    global _response_cache, _cache_initialized
+    if not _cache_initialized:
+        _response_cache = build_response_cache()
+        _cache_initialized = True
+    return _response_cache
+
+
+def set_response_cache(cache: Optional[ResponseCache]):
+    """Replace the shared response cache (None disables caching)"""
+    global _response_cache, _cache_initialized
+    _response_cache = cache
+    _cache_initialized = True
+
+
+logger.info("LLM cache module loaded")
@@ -1,13 +1,27 @@
 # app/main.py
+import asyncio
+import json
 import logging
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Optional
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from typing import Any, AsyncIterator, Optional, Tuple
 
 from app.config import Config, ModelClientFactory
-from app.models import StartRequest, SubmitAnswerReq, MatchRequest
-from app.agents.orchestrator import create_session, submit_answer, generate_report
+from app.models import StartRequest, SubmitAnswerReq, MatchRequest, MatchScoreResult
+from app.agents.orchestrator import (
+    create_session, submit_answer, generate_report,
+    submit_answer_stream, generate_report_stream, has_session,
+    get_evaluation, evaluation_stream, SESSIONS, BLOBS
+)
 from app.agents.evaluator_agent import EvaluatorAgent
+from app.llm_cache import get_response_cache
+from app.agents.base_agent import request_coalescer, hedge_stats
+from app.rate_limiter import RateLimiterRegistry
+from app.http_pool import HTTPPoolRegistry
+from app.metrics import registry as metrics_registry
+from app.prompt_budget import PromptBudget, TokenCounter
+from app.structured_output import StructuredOutputError
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +49,39 @@ logger.info("🚀 FastAPI application initialized with AutoGen enhancements")
 logger.info("=" * 70)
 
 
+# ============================================
+# SERVER-SENT EVENTS
+# ============================================
+
+def _sse(event: str, data: Any) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _sse_response(events: AsyncIterator[Tuple[str, Any]], failure: str) -> StreamingResponse:
+    """
+    Wrap an orchestrator event stream as a text/event-stream response.
+    Errors after the stream has started are sent as an "error" event.
+    
+    Args:
+        events: Async iterator of (event, data) tuples
+        failure: Message prefix for unexpected errors
+    """
+    async def body():
+        try:
+            async for event, data in events:
+                yield _sse(event, data)
+        except Exception as e:
+            logger.error(f"❌ {failure}: {str(e)}", exc_info=True)
+            yield _sse("error", {"error": f"{failure}: {str(e)}"})
+    
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 # ============================================
 # STARTUP & SHUTDOWN EVENTS
 # ============================================
@@ -48,6 +95,46 @@ async def startup_event():
     logger.info(f"Current Provider: {Config.CURRENT_PROVIDER}")
     logger.info(f"Mock Mode: {Config.MOCK_MODE}")
     logger.info("=" * 70)
+    
+    if not Config.MOCK_MODE:
+        # Tokenizers load (and may download) in the background, not on the first request
+        TokenCounter.preload({Config.get_model_name(p) for p in (Config.PRIMARY_PROVIDER, Config.BACKUP_PROVIDER)})
+    
+    if not Config.MOCK_MODE and Config.HTTP_WARMUP_ENABLED:
+        await warm_up_providers()
+    
+    app.state.session_pruner = asyncio.create_task(prune_sessions_periodically())
+
+
+async def prune_sessions_periodically(interval: Optional[float] = None):
+    """Expire idle sessions (releasing their texts) until cancelled"""
+    interval = interval or Config.SESSION_PRUNE_INTERVAL_SECONDS
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            removed = SESSIONS.prune()
+            if removed:
+                logger.info(f"🧹 Pruned {removed} expired sessions")
+        except Exception as e:
+            logger.error(f"❌ Session pruning failed: {str(e)}")
+
+
+async def warm_up_providers():
+    """Create the model clients and open pooled connections before traffic"""
+    providers = [
+        p for p in (Config.PRIMARY_PROVIDER, Config.BACKUP_PROVIDER)
+        if ModelClientFactory.has_key(p)
+    ]
+    for provider in providers:
+        try:
+            ModelClientFactory.get_client(provider)
+        except Exception as e:
+            logger.error(f"❌ Could not create {provider} client during warm-up: {str(e)}")
+    
+    await HTTPPoolRegistry.warm_up(
+        {p: Config.get_base_url(p) for p in providers},
+        api_keys={p: Config.get_api_key(p) for p in providers}
+    )
 
 
 @app.on_event("shutdown")
@@ -57,6 +144,14 @@ async def shutdown_event():
     logger.info("🛑 QuestAI Backend Shutting Down")
     logger.info(f"Failover Count: {Config.FAILOVER_COUNT}")
     logger.info("=" * 70)
+    
+    pruner = getattr(app.state, "session_pruner", None)
+    if pruner is not None:
+        pruner.cancel()
+    
+    # Write back session changes still buffered by the session cache
+    SESSIONS.flush()
+    await HTTPPoolRegistry.close()
 
 
 # ============================================
@@ -101,11 +196,32 @@ def get_status():
     logger.info("GET /status - Status check")
     
     status = ModelClientFactory.get_status()
+    
+    cache = get_response_cache()
+    status["llm_cache"] = cache.get_stats() if cache else {"enabled": False}
+    status["single_flight"] = request_coalescer.get_stats()
+    status["rate_limits"] = RateLimiterRegistry.get_stats()
+    status["hedging"] = {"enabled": Config.HEDGE_ENABLED, "agents": hedge_stats.get_stats()}
+    status["http_pools"] = HTTPPoolRegistry.get_stats()
+    status["sessions"] = SESSIONS.get_stats()
+    status["blobs"] = BLOBS.get_stats()
+    
     logger.debug(f"Status: {status}")
     
     return status
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Per-agent latency, token and cost metrics in Prometheus text format"""
+    logger.debug("GET /metrics")
+    
+    return PlainTextResponse(
+        metrics_registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 @app.post("/start_interview")
 async def api_start_interview(req: StartRequest):
     """
@@ -127,7 +243,8 @@ async def api_start_interview(req: StartRequest):
             req.jd_text,
             mode=req.mode,
             user_name=req.user_name,
-            collaboration_mode=collaboration_mode
+            collaboration_mode=collaboration_mode,
+            evaluation_mode=req.evaluation_mode
         )
         
         logger.info(f"✅ Interview started - Session: {result['session_id']}")
@@ -211,6 +328,65 @@ async def api_submit_answer(payload: SubmitAnswerReq):
         raise HTTPException(status_code=500, detail=f"Failed to submit answer: {str(e)}")
 
 
+@app.post("/submit_answer/stream")
+async def api_submit_answer_stream(payload: SubmitAnswerReq):
+    """
+    Submit an answer and stream the evaluation as server-sent events:
+    "token" events carry feedback text as it is generated, and a final
+    "result" event carries the parsed evaluation and next question.
+    """
+    logger.info("=" * 70)
+    logger.info("POST /submit_answer/stream")
+    logger.info("=" * 70)
+    
+    payload.log_request()
+    
+    if not has_session(payload.session_id):
+        logger.error("❌ Error: invalid_session")
+        raise HTTPException(status_code=404, detail="invalid_session")
+    
+    return _sse_response(
+        submit_answer_stream(
+            payload.session_id,
+            payload.question,
+            payload.answer,
+            payload.question_meta
+        ),
+        failure="Failed to submit answer"
+    )
+
+
+@app.get("/evaluation")
+async def api_evaluation(session_id: str, answer_index: int):
+    """
+    Poll the evaluation of an answer submitted with background evaluation
+    ("status" is "pending" until the evaluator finishes).
+    """
+    logger.info(f"GET /evaluation - Session: {session_id} | Answer: {answer_index}")
+    
+    res = get_evaluation(session_id, answer_index)
+    if "error" in res:
+        logger.error(f"❌ Error: {res['error']}")
+        raise HTTPException(status_code=404, detail=res["error"])
+    return res
+
+
+@app.get("/evaluation/stream")
+async def api_evaluation_stream(session_id: str, answer_index: int):
+    """
+    Wait for the evaluation of an answer as server-sent events:
+    a "pending" event while it is running, then an "evaluation" event.
+    """
+    logger.info(f"GET /evaluation/stream - Session: {session_id} | Answer: {answer_index}")
+    
+    res = get_evaluation(session_id, answer_index)
+    if "error" in res:
+        logger.error(f"❌ Error: {res['error']}")
+        raise HTTPException(status_code=404, detail=res["error"])
+    
+    return _sse_response(evaluation_stream(session_id, answer_index), failure="Failed to get evaluation")
+
+
 @app.get("/report")
 async def api_report(session_id: str):
     """Generate final interview report for a given session."""
@@ -241,6 +417,24 @@ async def api_report(session_id: str):
         raise HTTPException(status_code=500, detail=f"Failed to generate report: {str(e)}")
 
 
+@app.get("/report/stream")
+async def api_report_stream(session_id: str):
+    """
+    Stream the final interview report as server-sent events:
+    "token" events while the summary is generated, then a "report" event.
+    """
+    logger.info("=" * 70)
+    logger.info("GET /report/stream")
+    logger.info("=" * 70)
+    logger.info(f"Session: {session_id}")
+    
+    if not has_session(session_id):
+        logger.error("❌ Error: invalid_session")
+        raise HTTPException(status_code=404, detail="invalid_session")
+    
+    return _sse_response(generate_report_stream(session_id), failure="Failed to generate report")
+
+
 @app.post("/match_score")
 async def match_score(req: MatchRequest):
     """Check resume–job match percentage + strengths + gaps."""
@@ -251,15 +445,19 @@ async def match_score(req: MatchRequest):
     req.log_request()
     
     evaluator = EvaluatorAgent(mode="analysis")
+    context = PromptBudget.for_prompt("match_score").fit(
+        {"resume": req.resume_text, "jd": req.jd_text},
+        queries={"resume": req.jd_text, "jd": req.resume_text}
+    )
 
     prompt = f"""
     Compare the following resume and job description.
 
     Resume:
-    {req.resume_text[:1000]}
+    {context['resume']}
 
     Job Description:
-    {req.jd_text[:1000]}
+    {context['jd']}
 
     Task:
     1. Give a match percentage (0-100%) that represents how well the resume fits the job.
@@ -275,17 +473,12 @@ async def match_score(req: MatchRequest):
     """
 
     try:
-        raw = await evaluator.ask(prompt)
-        logger.debug(f"Raw match response: {raw[:200]}...")
-
-        import re, json
         try:
-            m = re.search(r"\{.*\}", raw, re.S)
-            parsed = json.loads(m.group(0)) if m else {"raw": raw}
+            parsed = (await evaluator.ask_structured(prompt, MatchScoreResult, method="match_score")).model_dump()
             logger.info("✅ Match score calculated")
-        except Exception:
+        except StructuredOutputError as e:
             logger.warning("Failed to parse match response")
-            parsed = {"match_percent": 0, "strengths": [], "gaps": [], "raw": raw}
+            parsed = {"match_percent": 0, "strengths": [], "gaps": [], "raw": e.raw}
 
         logger.info("=" * 70)
         return parsed
@@ -0,0 +1,291 @@
+# app/metrics.py
+"""
+Agent metrics in Prometheus text format
+Latency, token and estimated-cost histograms labelled by agent, method,
+provider and cache outcome, rendered for the /metrics endpoint.
+"""
+import logging
+import math
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+COST_BUCKETS = (0.00001, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        return self._values.get(key, 0.0)
+
+    def render(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}")
+        return lines
+
+    def reset(self):
+        with self._lock:
+            self._values = {}
+
+
+class Gauge(Counter):
+    """Value that can go up and down, with labels"""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str):
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        with self._lock:
+            self._values[key] = float(value)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # key -> [bucket counts..., sum, count]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str):
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = [0.0] * (len(self.buckets) + 2)
+                self._series[key] = series
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, **labels: str) -> int:
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        series = self._series.get(key)
+        return int(series[-1]) if series else 0
+
+    def sum(self, **labels: str) -> float:
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        series = self._series.get(key)
+        return series[-2] if series else 0.0
+
+    def render(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for i, bound in enumerate(self.buckets):
+                    labels = _format_labels(self.label_names, key, ("le", _format_value(bound)))
+                    lines.append(f"{self.name}_bucket{labels} {_format_value(series[i])}")
+                labels = _format_labels(self.label_names, key)
+                lines.append(f"{self.name}_sum{labels} {_format_value(series[-2])}")
+                lines.append(f"{self.name}_count{labels} {_format_value(series[-1])}")
+        return lines
+
+    def reset(self):
+        with self._lock:
+            self._series = {}
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics: List = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        for metric in self._metrics:
+            metric.reset()
+
+
+# ============================================
+# AGENT METRICS
+# ============================================
+
+registry = MetricsRegistry()
+
+REQUEST_LABELS = ("agent", "method", "provider", "cache")
+CALL_LABELS = ("agent", "method", "provider")
+
+agent_request_seconds = registry.register(Histogram(
+    "questai_agent_request_duration_seconds",
+    "Time to answer an agent request, including retries and cache lookups",
+    REQUEST_LABELS,
+    LATENCY_BUCKETS
+))
+agent_requests_total = registry.register(Counter(
+    "questai_agent_requests_total",
+    "Agent requests by outcome",
+    REQUEST_LABELS + ("outcome",)
+))
+agent_prompt_tokens = registry.register(Histogram(
+    "questai_agent_prompt_tokens",
+    "Prompt tokens per provider call",
+    CALL_LABELS,
+    TOKEN_BUCKETS
+))
+agent_completion_tokens = registry.register(Histogram(
+    "questai_agent_completion_tokens",
+    "Completion tokens per provider call",
+    CALL_LABELS,
+    TOKEN_BUCKETS
+))
+agent_cost_usd = registry.register(Histogram(
+    "questai_agent_cost_usd",
+    "Estimated cost per provider call in US dollars",
+    CALL_LABELS,
+    COST_BUCKETS
+))
+
+structured_outputs_total = registry.register(Counter(
+    "questai_structured_outputs_total",
+    "Structured (JSON) responses by outcome: valid, repaired or failed",
+    ("agent", "method", "outcome")
+))
+
+speculative_tasks_total = registry.register(Counter(
+    "questai_speculative_tasks_total",
+    "Speculative (prefetched) work by outcome: used, cancelled (still running) or discarded (finished unused)",
+    ("task", "outcome")
+))
+
+sessions_live = registry.register(Gauge(
+    "questai_sessions_live",
+    "Interview sessions held in memory"
+))
+sessions_memory_bytes = registry.register(Gauge(
+    "questai_sessions_memory_bytes",
+    "Estimated memory used by in-memory interview sessions"
+))
+session_evictions_total = registry.register(Counter(
+    "questai_session_evictions_total",
+    "Sessions removed from memory by reason (expired, entries, bytes) and action (dropped, spilled)",
+    ("reason", "action")
+))
+
+session_cache_requests_total = registry.register(Counter(
+    "questai_session_cache_requests_total",
+    "Session reads by hot-cache result: hit, miss or stale (changed by another worker)",
+    ("result",)
+))
+session_cache_writes_total = registry.register(Counter(
+    "questai_session_cache_writes_total",
+    "Session changes by write-behind outcome: written, coalesced into a pending write, replayed after a conflict, or failed (retried)",
+    ("outcome",)
+))
+
+
+def estimate_cost(provider: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """
+    Estimate the cost of a call from Config.MODEL_PRICES.
+
+    Args:
+        provider: Provider name
+        prompt_tokens: Prompt tokens used
+        completion_tokens: Completion tokens used
+
+    Returns:
+        Cost in US dollars (0 for unknown providers)
+    """
+    prices = Config.MODEL_PRICES.get(provider, {})
+    return (
+        prompt_tokens * prices.get("prompt_per_million", 0.0)
+        + completion_tokens * prices.get("completion_per_million", 0.0)
+    ) / 1_000_000
+
+
+def observe_request(agent: str, method: str, provider: Optional[str], cache: str, outcome: str, seconds: float):
+    """Record one agent request (cache: hit/miss/bypass, outcome: success/error)"""
+    labels = {"agent": agent, "method": method, "provider": provider or "none", "cache": cache}
+    agent_request_seconds.observe(seconds, **labels)
+    agent_requests_total.inc(outcome=outcome, **labels)
+
+
+def observe_usage(agent: str, method: str, provider: str, prompt_tokens: int, completion_tokens: int):
+    """Record the token usage and estimated cost of one provider call"""
+    labels = {"agent": agent, "method": method, "provider": provider}
+    agent_prompt_tokens.observe(prompt_tokens, **labels)
+    agent_completion_tokens.observe(completion_tokens, **labels)
+    agent_cost_usd.observe(estimate_cost(provider, prompt_tokens, completion_tokens), **labels)
+
+
+def observe_structured_output(agent: str, method: str, outcome: str):
+    """Record whether a structured response parsed (outcome: valid/repaired/failed)"""
+    structured_outputs_total.inc(agent=agent, method=method, outcome=outcome)
+
+
+def observe_speculative(task: str, outcome: str):
+    """Record what happened to one piece of speculative work (outcome: used/cancelled/discarded)"""
+    speculative_tasks_total.inc(task=task, outcome=outcome)
+
+
+logger.info("Metrics module loaded")
@@ -1,7 +1,8 @@
 # app/models.py
 import logging
-from typing import Optional
-from pydantic import BaseModel, Field
+import math
+from typing import Any, List, Optional
+from pydantic import BaseModel, Field, field_validator
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +22,11 @@ class StartRequest(BaseModel):
         default="sequential",
         description="Collaboration mode: 'sequential' or 'collaborative'"
     )
+    evaluation_mode: Optional[str] = Field(
+        default=None,
+        description="'immediate', 'deferred' (batched) or 'background'; "
+                    "defaults to deferred in experience mode and background in teach mode"
+    )
     
     def log_request(self):
         """Log the request details"""
@@ -53,4 +59,56 @@ class MatchRequest(BaseModel):
         logger.debug(f"Resume: {len(self.resume_text)} chars, JD: {len(self.jd_text)} chars")
 
 
+# ============================================
+# STRUCTURED MODEL OUTPUT
+# ============================================
+
+def _round_half_up(value: Any) -> Any:
+    """Fractional scores (7.5, "7.5") round to the nearest integer; anything else is left to validation"""
+    if isinstance(value, str):
+        try:
+            value = float(value)
+        except ValueError:
+            return value
+    if isinstance(value, float) and math.isfinite(value):
+        return math.floor(value + 0.5)
+    return value
+
+
+class EvaluationResult(BaseModel):
+    """Evaluation of one answer, as returned by EvaluatorAgent"""
+    score: int = Field(..., ge=0, le=10, description="Score from 0 to 10")
+    feedback: str = Field(..., description="Short feedback paragraph")
+    recommendations: List[str] = Field(default_factory=list, description="Up to 3 concrete recommendations")
+
+    # Models sometimes give half points; round them rather than pay for a repair call
+    _round_score = field_validator("score", mode="before")(_round_half_up)
+
+
+class BatchEvaluationItem(EvaluationResult):
+    """Evaluation of one answer in a batch"""
+    index: int = Field(..., ge=1, description="Number of the Q&A pair being evaluated")
+
+
+class BatchEvaluationResult(BaseModel):
+    """Evaluations of several answers from one call"""
+    evaluations: List[BatchEvaluationItem] = Field(..., description="One evaluation per Q&A pair")
+
+
+class MatchScoreResult(BaseModel):
+    """Resume–job match, as returned by /match_score"""
+    match_percent: int = Field(..., ge=0, le=100, description="How well the resume fits the job (0-100)")
+    strengths: List[str] = Field(default_factory=list, description="Key strengths for the role")
+    gaps: List[str] = Field(default_factory=list, description="Gaps the candidate should improve")
+
+    _round_match_percent = field_validator("match_percent", mode="before")(_round_half_up)
+
+
+class InterviewReport(BaseModel):
+    """End-of-interview summary (every section required, so an unrelated object gets repaired)"""
+    strengths: List[str] = Field(..., description="Top strengths shown in the interview")
+    weaknesses: List[str] = Field(..., description="Top areas for improvement")
+    recommendations: List[str] = Field(..., description="Top actionable recommendations")
+
+
 logger.info("✅ Models module loaded with enhanced features")
\ No newline at end of file
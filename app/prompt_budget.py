@@ -0,0 +1,230 @@
+# app/prompt_budget.py
+"""
+Token-aware prompt budgeting
+Counts tokens per model and splits a token budget across prompt sections,
+trimming the sections that don't fit (or keeping their passages most
+relevant to another section) instead of slicing fixed character counts.
+"""
+import logging
+import re
+import threading
+from typing import Dict, Iterable, Optional
+
+from app.config import Config
+from app.relevance import select_relevant
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+TRUNCATION_MARKER = " …[truncated]"
+
+
+class TokenCounter:
+    """
+    Counts tokens for a model. Uses tiktoken when installed (falling back to
+    cl100k_base for models it doesn't know, such as Gemini), otherwise a
+    word/character heuristic.
+
+    Loading an encoding can download it, so it never happens on the
+    request path: it is loaded in a background thread (started by
+    preload() at startup, or by the first counter for the model) and the
+    heuristic is used until it is ready or if it fails to load.
+    """
+
+    _encodings: Dict[str, object] = {}
+    _loading: set = set()
+    _loading_lock = threading.Lock()
+
+    def __init__(self, model: Optional[str] = None):
+        self.model = model or Config.get_model_name()
+        self.encoding = self._encoding_for(self.model)
+
+    @classmethod
+    def preload(cls, models: Iterable[str]):
+        """Start loading the encodings of these models in the background"""
+        for model in models:
+            cls._encoding_for(model)
+
+    @classmethod
+    def _encoding_for(cls, model: str):
+        if tiktoken is None:
+            return None
+        encoding = cls._encodings.get(model)
+        if encoding is None and model not in cls._encodings:
+            with cls._loading_lock:
+                if model not in cls._loading:
+                    cls._loading.add(model)
+                    threading.Thread(
+                        target=cls._load, args=(model,), name=f"tiktoken-{model}", daemon=True
+                    ).start()
+        return encoding
+
+    @classmethod
+    def _load(cls, model: str):
+        try:
+            try:
+                encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            # e.g. the encoding file can't be downloaded
+            logger.warning(f"⚠️ tiktoken unavailable for {model}, using heuristic: {str(e)}")
+            encoding = None
+        cls._encodings[model] = encoding
+        if encoding is not None:
+            logger.info(f"🔤 tiktoken encoding loaded for {model}")
+
+    def count(self, text: str) -> int:
+        """Count the tokens in a string"""
+        if not text:
+            return 0
+        if self.encoding is not None:
+            return len(self.encoding.encode(text))
+        # ~4 characters per token, but never fewer than ~1.3 tokens per word
+        return max(len(text) // 4, int(len(text.split()) * 1.3)) + 1
+
+    def truncate(self, text: str, max_tokens: int, marker: str = TRUNCATION_MARKER) -> str:
+        """
+        Trim text to at most max_tokens tokens (including the marker),
+        cutting at a word boundary where possible.
+
+        Args:
+            text: Text to trim
+            max_tokens: Token limit
+            marker: Appended when text was cut
+
+        Returns:
+            The original text if it fits, otherwise its trimmed prefix
+        """
+        if max_tokens <= 0:
+            return ""
+        if self.count(text) <= max_tokens:
+            return text
+
+        room = max(max_tokens - self.count(marker), 1)
+        if self.encoding is not None:
+            head = self.encoding.decode(self.encoding.encode(text)[:room])
+        else:
+            # Shrink a character prefix until the heuristic agrees
+            head = text[:room * 4]
+            while head and self.count(head) > room:
+                head = head[:int(len(head) * 0.9)]
+
+        # Don't end mid-word
+        cut = re.match(r"(?s)(.*\S)\s", head)
+        if cut and len(cut.group(1)) > len(head) // 2:
+            head = cut.group(1)
+        return head.rstrip() + marker
+
+
+class PromptBudget:
+    """
+    Splits a token budget across named prompt sections.
+
+    Sections that fit their weighted share keep their full text, and the
+    budget they leave unused is shared among the rest, which are trimmed
+    to their final allocation.
+    """
+
+    def __init__(self, max_tokens: int, model: Optional[str] = None):
+        """
+        Initialize the budget.
+
+        Args:
+            max_tokens: Tokens available for all sections together
+            model: Model whose tokenizer to use (defaults to the active one)
+        """
+        self.max_tokens = max_tokens
+        self.counter = TokenCounter(model)
+
+    @classmethod
+    def for_prompt(cls, name: str, model: Optional[str] = None) -> "PromptBudget":
+        """Build the budget configured in Config.PROMPT_BUDGETS for a prompt"""
+        return cls(Config.PROMPT_BUDGETS[name], model)
+
+    def without(self, *texts: str) -> "PromptBudget":
+        """Budget left after fixed prompt text (instructions, templates) is counted"""
+        used = sum(self.counter.count(text) for text in texts)
+        return PromptBudget(max(self.max_tokens - used, 0), self.counter.model)
+
+    def allocate(self, sections: Dict[str, str], weights: Optional[Dict[str, float]] = None) -> Dict[str, int]:
+        """
+        Work out each section's token allocation.
+
+        Args:
+            sections: Section name → text
+            weights: Section name → relative share (default 1.0 each)
+
+        Returns:
+            Section name → tokens allowed
+        """
+        weights = weights or {}
+        counts = {name: self.counter.count(text) for name, text in sections.items()}
+        allocation: Dict[str, int] = {}
+        remaining = [name for name in sections]
+        left = self.max_tokens
+
+        while remaining:
+            total_weight = sum(weights.get(name, 1.0) for name in remaining) or 1.0
+            fits = [
+                name for name in remaining
+                if counts[name] <= left * weights.get(name, 1.0) / total_weight
+            ]
+            if not fits:
+                for name in remaining:
+                    allocation[name] = int(left * weights.get(name, 1.0) / total_weight)
+                break
+            for name in fits:
+                allocation[name] = counts[name]
+                left -= counts[name]
+                remaining.remove(name)
+
+        return allocation
+
+    def fit(
+        self,
+        sections: Dict[str, str],
+        weights: Optional[Dict[str, float]] = None,
+        queries: Optional[Dict[str, str]] = None
+    ) -> Dict[str, str]:
+        """
+        Fit sections into the budget.
+
+        Args:
+            sections: Section name → text
+            weights: Section name → relative share (default 1.0 each)
+            queries: Section name → text it should stay relevant to. An
+                oversized section with a query keeps its most relevant
+                passages instead of its beginning.
+
+        Returns:
+            Section name → text, trimmed where needed
+        """
+        allocation = self.allocate(sections, weights)
+        queries = queries if Config.PROMPT_RELEVANCE_SELECTION else None
+        fitted = {}
+        trimmed = []
+        for name, text in sections.items():
+            fitted[name] = self.counter.truncate(text, allocation[name])
+            if fitted[name] == text:
+                continue
+            if queries and queries.get(name):
+                fitted[name] = select_relevant(
+                    text, queries[name], allocation[name], self.counter
+                ) or fitted[name]
+            trimmed.append(name)
+
+        if trimmed:
+            logger.debug(f"✂️ Prompt budget {self.max_tokens}: trimmed {', '.join(trimmed)}")
+        return fitted
+
+    def truncate(self, text: str, max_tokens: Optional[int] = None) -> str:
+        """Trim one piece of text to max_tokens (defaults to the whole budget)"""
+        return self.counter.truncate(text, self.max_tokens if max_tokens is None else max_tokens)
+
+
+logger.info(f"Prompt budget module loaded (tokenizer: {'tiktoken' if tiktoken else 'heuristic'})")
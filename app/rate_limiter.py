@@ -0,0 +1,229 @@
+# app/rate_limiter.py
+"""
+Proactive per-provider rate limiting
+Token buckets (requests/min, tokens/min) plus a concurrency cap, so calls
+queue up instead of running into provider 429s.
+"""
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at rate_per_minute"""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        """
+        Initialize the bucket.
+
+        Args:
+            rate_per_minute: Refill rate; 0 or less means unlimited
+            capacity: Burst size (defaults to one minute's worth)
+        """
+        self.rate_per_minute = rate_per_minute
+        self.capacity = capacity or rate_per_minute
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate_per_minute <= 0
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate_per_minute / 60.0)
+
+    def try_take(self, amount: float) -> float:
+        """
+        Take tokens if available.
+
+        Args:
+            amount: Tokens needed (clamped to the bucket capacity)
+
+        Returns:
+            0 if the tokens were taken, otherwise seconds until they will be
+        """
+        if self.unlimited:
+            return 0.0
+
+        amount = min(amount, self.capacity)
+        self._refill()
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return 0.0
+        return (amount - self.tokens) * 60.0 / self.rate_per_minute
+
+
+class ProviderLimiter:
+    """
+    Rate limiter and concurrency governor for one provider.
+    Waiters are served in arrival order.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        max_concurrency: int = 0
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            provider: Provider name
+            requests_per_minute: Request budget (0 = unlimited)
+            tokens_per_minute: Token budget (0 = unlimited)
+            max_concurrency: Max in-flight calls (0 = unlimited)
+        """
+        self.provider = provider
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max_concurrency
+
+        self._loop = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._queue_lock: Optional[asyncio.Lock] = None
+
+        self.waiting = 0
+        self.in_flight = 0
+        self.acquired = 0
+        self.delayed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.last_wait = 0.0
+
+    def _ensure_primitives(self):
+        # asyncio primitives are bound to the loop they are first used on
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency) if self.max_concurrency > 0 else None
+            self._queue_lock = asyncio.Lock()
+
+    @asynccontextmanager
+    async def acquire(self, estimated_tokens: int = 0):
+        """
+        Wait for a concurrency slot and rate budget, then hold the slot.
+
+        Args:
+            estimated_tokens: Prompt + expected completion tokens
+        """
+        self._ensure_primitives()
+        start = time.monotonic()
+        self.waiting += 1
+
+        try:
+            if self._semaphore is not None:
+                await self._semaphore.acquire()
+            try:
+                async with self._queue_lock:
+                    while True:
+                        wait = self._take_all(estimated_tokens)
+                        if wait <= 0:
+                            break
+                        await asyncio.sleep(wait)
+            except BaseException:
+                if self._semaphore is not None:
+                    self._semaphore.release()
+                raise
+        finally:
+            self.waiting -= 1
+
+        waited = time.monotonic() - start
+        self._record_wait(waited)
+        self.in_flight += 1
+
+        try:
+            yield waited
+        finally:
+            self.in_flight -= 1
+            if self._semaphore is not None:
+                self._semaphore.release()
+
+    def _take_all(self, estimated_tokens: int) -> float:
+        """Take one request and the tokens atomically, or report the wait"""
+        wait_requests = self.requests.try_take(1)
+        if wait_requests > 0:
+            return wait_requests
+
+        wait_tokens = self.tokens.try_take(estimated_tokens)
+        if wait_tokens > 0:
+            # Give the request token back so both are taken together
+            if not self.requests.unlimited:
+                self.requests.tokens = min(self.requests.capacity, self.requests.tokens + 1)
+            return wait_tokens
+        return 0.0
+
+    def _record_wait(self, waited: float):
+        self.acquired += 1
+        self.total_wait += waited
+        self.last_wait = waited
+        self.max_wait = max(self.max_wait, waited)
+        if waited > 0.05:
+            self.delayed += 1
+        if waited > 1:
+            logger.info(f"🚦 {self.provider}: request queued for {waited:.2f}s by rate limiter")
+
+    def get_stats(self) -> dict:
+        """Get queue depth and wait-time statistics"""
+        return {
+            "provider": self.provider,
+            "queue_depth": self.waiting,
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency or None,
+            "requests_per_minute": self.requests.rate_per_minute or None,
+            "tokens_per_minute": self.tokens.rate_per_minute or None,
+            "acquired": self.acquired,
+            "delayed": self.delayed,
+            "avg_wait_seconds": round(self.total_wait / max(self.acquired, 1), 3),
+            "max_wait_seconds": round(self.max_wait, 3),
+            "last_wait_seconds": round(self.last_wait, 3)
+        }
+
+
+class RateLimiterRegistry:
+    """Holds one ProviderLimiter per provider, configured from Config.RATE_LIMITS"""
+
+    _limiters: Dict[str, ProviderLimiter] = {}
+
+    @classmethod
+    def get(cls, provider: str) -> ProviderLimiter:
+        """Get (or create) the limiter for a provider"""
+        limiter = cls._limiters.get(provider)
+        if limiter is None:
+            settings = Config.RATE_LIMITS.get(provider, {})
+            limiter = ProviderLimiter(provider, **settings)
+            cls._limiters[provider] = limiter
+            logger.info(f"🚦 Rate limiter for {provider}: {settings or 'unlimited'}")
+        return limiter
+
+    @classmethod
+    def get_stats(cls) -> dict:
+        """Get stats for every limiter created so far"""
+        return {name: limiter.get_stats() for name, limiter in cls._limiters.items()}
+
+    @classmethod
+    def reset(cls):
+        """Drop all limiters (they are rebuilt from Config on next use)"""
+        cls._limiters = {}
+
+
+def estimate_tokens(*texts: str) -> int:
+    """
+    Rough token estimate for rate budgeting (~4 characters per token),
+    plus the expected completion size.
+    """
+    chars = sum(len(t) for t in texts if t)
+    return chars // 4 + Config.RATE_LIMIT_COMPLETION_TOKENS
+
+
+logger.info("Rate limiter module loaded")
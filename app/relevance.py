@@ -0,0 +1,151 @@
+# app/relevance.py
+"""
+Relevance-based passage selection
+A small local BM25 index over resume/JD passages, used to keep the parts of
+a document that matter to the other one when a prompt section must shrink.
+"""
+import logging
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import List, Optional
+
+from app.hashing import content_digest
+
+logger = logging.getLogger(__name__)
+
+# Keeps terms like c++, c#, node.js and ci/cd pieces intact
+TERM_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+SENTENCE_END = re.compile(r"(?<=[.!?;])\s+(?=[A-Z0-9•\-*])")
+BULLETS = "•-*–·>"
+
+STOPWORDS = frozenset(
+    "a an and are as at be been but by for from has have in into is it its of on or our "
+    "that the their this to was we were will with you your they he she i me my who what "
+    "which when where how all any can must should would also etc using used use work "
+    "working role team job".split()
+)
+
+# (text digest, query digest, budget, model) -> selection. The same resume/JD
+# pair is trimmed for several prompts, endpoints and retries.
+SELECTION_CACHE_SIZE = 256
+_selections: "OrderedDict[tuple, Optional[str]]" = OrderedDict()
+_selections_lock = threading.Lock()
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase terms without stopwords"""
+    return [t for t in TERM_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def split_passages(text: str) -> List[str]:
+    """Split a document into lines, and long lines into sentences"""
+    passages = []
+    for line in text.splitlines():
+        line = line.strip().lstrip(BULLETS).strip()
+        if not line:
+            continue
+        passages.extend(p.strip() for p in SENTENCE_END.split(line) if p.strip())
+    return passages
+
+
+class BM25Index:
+    """Okapi BM25 over a list of passages"""
+
+    def __init__(self, passages: List[str], k1: float = 1.5, b: float = 0.75):
+        """
+        Build the index.
+
+        Args:
+            passages: Passages to rank
+            k1: Term-frequency saturation
+            b: Length normalisation
+        """
+        self.passages = passages
+        self.k1 = k1
+        self.b = b
+        self.term_counts = [Counter(tokenize(p)) for p in passages]
+        self.lengths = [sum(c.values()) for c in self.term_counts]
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if passages else 0.0
+
+        document_frequency = Counter()
+        for counts in self.term_counts:
+            document_frequency.update(counts.keys())
+        n = len(passages)
+        self.idf = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for term, df in document_frequency.items()
+        }
+
+    def scores(self, query: str) -> List[float]:
+        """BM25 score of every passage for a query"""
+        terms = set(tokenize(query))
+        results = []
+        for counts, length in zip(self.term_counts, self.lengths):
+            score = 0.0
+            norm = self.k1 * (1 - self.b + self.b * length / (self.avg_length or 1))
+            for term in terms & counts.keys():
+                tf = counts[term]
+                score += self.idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            results.append(score)
+        return results
+
+    def rank(self, query: str) -> List[int]:
+        """Passage indexes, most relevant first (ties keep document order)"""
+        scores = self.scores(query)
+        return sorted(range(len(scores)), key=lambda i: (-scores[i], i))
+
+
+def select_relevant(text: str, query: str, max_tokens: int, counter) -> Optional[str]:
+    """
+    Keep the passages of text most relevant to query within a token budget.
+
+    Passages are chosen by BM25 score and returned in their original order.
+    Results are cached under the content digests of text and query.
+
+    Args:
+        text: Document to compress (e.g. the resume)
+        query: Document it should be relevant to (e.g. the JD)
+        max_tokens: Token budget for the result
+        counter: TokenCounter used to measure passages
+
+    Returns:
+        The selected passages joined by newlines, or None if none fit
+    """
+    key = (content_digest(text), content_digest(query), max_tokens, getattr(counter, "model", None))
+    with _selections_lock:
+        if key in _selections:
+            _selections.move_to_end(key)
+            return _selections[key]
+
+    selected = _select_relevant(text, query, max_tokens, counter)
+    with _selections_lock:
+        _selections[key] = selected
+        while len(_selections) > SELECTION_CACHE_SIZE:
+            _selections.popitem(last=False)
+    return selected
+
+
+def _select_relevant(text: str, query: str, max_tokens: int, counter) -> Optional[str]:
+    passages = split_passages(text)
+    if not passages or max_tokens <= 0:
+        return None
+
+    index = BM25Index(passages)
+    chosen = []
+    used = 0
+    for i in index.rank(query):
+        # +1 for the joining newline
+        cost = counter.count(passages[i]) + 1
+        if used + cost <= max_tokens:
+            chosen.append(i)
+            used += cost
+
+    if not chosen:
+        return None
+    logger.debug(f"🔎 Kept {len(chosen)}/{len(passages)} passages ({used} tokens)")
+    return "\n".join(passages[i] for i in sorted(chosen))
+
+
+logger.info("Relevance module loaded")
@@ -0,0 +1,209 @@
+# app/retry_policy.py
+"""
+Retry policy and error classification for model calls
+Typed classification of OpenAI-client errors drives exponential backoff
+with jitter under an overall deadline.
+"""
+import asyncio
+import logging
+import random
+from typing import Optional
+
+from app.config import Config
+
+try:
+    import openai
+except ImportError:  # pragma: no cover - openai ships with autogen-ext[openai]
+    openai = None
+
+from pydantic import ValidationError
+
+logger = logging.getLogger(__name__)
+
+# Error kinds
+RATE_LIMIT = "rate_limit"
+TIMEOUT = "timeout"
+CONNECTION = "connection"
+SERVER = "server"
+AUTH = "auth"
+BAD_REQUEST = "bad_request"
+INVALID_OUTPUT = "invalid_output"
+UNKNOWN = "unknown"
+
+# Kinds worth retrying (rate limits also trigger failover)
+TRANSIENT_KINDS = {RATE_LIMIT, TIMEOUT, CONNECTION, SERVER}
+
+QUOTA_KEYWORDS = [
+    "quota",
+    "rate limit",
+    "too many requests",
+    "429",
+    "resource exhausted",
+    "limit exceeded",
+    "insufficient_quota",
+]
+
+_MESSAGE_KEYWORDS = [
+    (TIMEOUT, ["timed out", "timeout", "deadline exceeded"]),
+    (CONNECTION, ["connection reset", "connection error", "connection refused",
+                  "connection aborted", "server disconnected", "remote protocol error"]),
+    (SERVER, ["internal server error", "bad gateway", "service unavailable",
+              "gateway timeout", "overloaded", "500", "502", "503", "504"]),
+    (AUTH, ["invalid api key", "unauthorized", "permission denied", "401", "403"]),
+]
+
+
+def classify_status(status_code: int) -> str:
+    """Map an HTTP status code to an error kind"""
+    if status_code == 429:
+        return RATE_LIMIT
+    if status_code == 408:
+        return TIMEOUT
+    if status_code >= 500:
+        return SERVER
+    if status_code in (401, 403):
+        return AUTH
+    if 400 <= status_code < 500:
+        return BAD_REQUEST
+    return UNKNOWN
+
+
+def classify_message(message: str) -> str:
+    """Classify an error from its text (fallback for untyped errors)"""
+    lowered = message.lower()
+    if any(keyword in lowered for keyword in QUOTA_KEYWORDS):
+        return RATE_LIMIT
+    for kind, keywords in _MESSAGE_KEYWORDS:
+        if any(keyword in lowered for keyword in keywords):
+            return kind
+    return UNKNOWN
+
+
+def _classify_one(exc: BaseException) -> str:
+    if isinstance(exc, ValidationError):
+        # Structured output that didn't match its schema
+        return INVALID_OUTPUT
+    if openai is not None:
+        if isinstance(exc, openai.RateLimitError):
+            return RATE_LIMIT
+        if isinstance(exc, openai.APITimeoutError):
+            return TIMEOUT
+        if isinstance(exc, openai.APIConnectionError):
+            return CONNECTION
+        if isinstance(exc, openai.APIStatusError):
+            return classify_status(exc.status_code)
+
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError)):
+        return TIMEOUT
+    if isinstance(exc, ConnectionError):
+        return CONNECTION
+
+    status_code = getattr(exc, "status_code", None)
+    if status_code is None:
+        response = getattr(exc, "response", None)
+        status_code = getattr(response, "status_code", None)
+    if isinstance(status_code, int):
+        return classify_status(status_code)
+
+    return UNKNOWN
+
+
+def classify_error(exc: BaseException) -> str:
+    """
+    Classify an exception from a model call.
+
+    Typed OpenAI-client exceptions and status codes are checked first,
+    following the __cause__/__context__ chain in case the error was wrapped;
+    the error text is the last resort.
+
+    Args:
+        exc: The exception
+
+    Returns:
+        One of the error kind constants
+    """
+    seen = set()
+    current: Optional[BaseException] = exc
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        kind = _classify_one(current)
+        if kind != UNKNOWN:
+            return kind
+        current = current.__cause__ or current.__context__
+
+    return classify_message(str(exc))
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Read a Retry-After header from a provider error, if any"""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        value = headers.get("retry-after")
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """Exponential backoff with jitter, bounded by attempts and a deadline"""
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        jitter: float = 0.5,
+        deadline: float = 45.0
+    ):
+        """
+        Initialize the policy.
+
+        Args:
+            max_attempts: Total attempts including the first
+            base_delay: Delay before the first retry (seconds)
+            max_delay: Cap for a single delay (seconds)
+            jitter: Fraction of each delay that is randomised (0-1)
+            deadline: Give up once this much time has been spent (seconds)
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.deadline = deadline
+
+    @classmethod
+    def from_config(cls) -> "RetryPolicy":
+        """Build the policy described by Config"""
+        return cls(
+            max_attempts=Config.RETRY_MAX_ATTEMPTS,
+            base_delay=Config.RETRY_BASE_DELAY,
+            max_delay=Config.RETRY_MAX_DELAY,
+            jitter=Config.RETRY_JITTER,
+            deadline=Config.RETRY_DEADLINE
+        )
+
+    def is_retryable(self, kind: str) -> bool:
+        return kind in TRANSIENT_KINDS
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Delay before the next attempt.
+
+        Args:
+            attempt: Number of attempts made so far (1 after the first failure)
+            retry_after: Provider-suggested delay, honoured up to max_delay
+
+        Returns:
+            Seconds to sleep
+        """
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        delay = delay * (1 - self.jitter) + random.uniform(0, delay * self.jitter)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+
+logger.info("Retry policy module loaded")
@@ -0,0 +1,126 @@
+# app/session_events.py
+"""
+Session events
+Session changes are recorded as small append-only events (answer
+recorded, evaluation attached, round advanced, ...) instead of rewriting
+the whole session. Applying a session's events in order rebuilds it, so
+stores persist only the new events per turn plus an occasional snapshot.
+"""
+import copy
+import logging
+from typing import Any, Dict, Iterable, List
+
+from app.session_model import Answer, Evaluation, Session
+
+logger = logging.getLogger(__name__)
+
+# Events recorded on a session but not yet persisted (transient Session field)
+OUTBOX_KEY = "outbox"
+
+# Progress fields moved together by "round_advanced"
+CURSOR_KEYS = ("round", "resume_index", "behavior_index")
+
+
+def _session_created(sess: Dict[str, Any], data: Dict[str, Any]):
+    sess.update(Session.from_plain(copy.deepcopy(data)))
+
+
+def _answer_recorded(sess: Dict[str, Any], data: Dict[str, Any]):
+    sess["progress"]["answers"].append(Answer(
+        question=data["question"],
+        answer=data["answer"],
+        evaluation=Evaluation.from_plain(data["evaluation"])
+    ))
+
+
+def _evaluation_attached(sess: Dict[str, Any], data: Dict[str, Any]):
+    sess["progress"]["answers"][data["index"]]["evaluation"] = Evaluation.from_plain(data["evaluation"])
+
+
+def _evaluation_claimed(sess: Dict[str, Any], data: Dict[str, Any]):
+    answers = sess["progress"]["answers"]
+    for index in data["indices"]:
+        evaluation = answers[index]["evaluation"]
+        if evaluation.get("status") == "pending":
+            evaluation["claimed_by"] = data["owner"]
+            evaluation["claimed_at"] = data["at"]
+
+
+def _round_advanced(sess: Dict[str, Any], data: Dict[str, Any]):
+    for key in CURSOR_KEYS:
+        sess["progress"][key] = data[key]
+
+
+def _question_replaced(sess: Dict[str, Any], data: Dict[str, Any]):
+    sess["questions"][data["round"]][data["key"]] = data["text"]
+
+
+# Event type -> function applying it to a session
+REDUCERS = {
+    "session_created": _session_created,
+    "answer_recorded": _answer_recorded,
+    "evaluation_attached": _evaluation_attached,
+    "evaluation_claimed": _evaluation_claimed,
+    "round_advanced": _round_advanced,
+    "question_replaced": _question_replaced,
+}
+
+
+def apply_event(sess: Dict[str, Any], event: Dict[str, Any]):
+    """
+    Apply one event to a session in place.
+
+    Args:
+        sess: Session to change
+        event: {"type": ..., "data": {...}}
+
+    Raises:
+        ValueError: For unknown event types
+    """
+    reducer = REDUCERS.get(event["type"])
+    if reducer is None:
+        raise ValueError(f"Unknown session event: {event['type']}")
+    reducer(sess, event["data"])
+
+
+def record_event(sess: Dict[str, Any], event_type: str, **data: Any) -> Dict[str, Any]:
+    """
+    Apply an event to a session and queue it for the session store.
+
+    Args:
+        sess: Session to change
+        event_type: One of REDUCERS
+        **data: Event payload
+
+    Returns:
+        The event
+    """
+    event = {"type": event_type, "data": data}
+    apply_event(sess, event)
+    sess.setdefault(OUTBOX_KEY, []).append(event)
+    return event
+
+
+def take_outbox(sess: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Remove and return a session's unpersisted events"""
+    return sess.pop(OUTBOX_KEY, None) or []
+
+
+def replay_events(events: Iterable[Dict[str, Any]], sess: Dict[str, Any] = None) -> Dict[str, Any]:
+    """
+    Rebuild a session from its events.
+
+    Args:
+        events: Events in order
+        sess: Snapshot to start from (an empty Session if omitted)
+
+    Returns:
+        The rebuilt session
+    """
+    sess = sess if sess is not None else Session()
+    for event in events:
+        apply_event(sess, event)
+    return sess
+
+
+logger.info("Session events module loaded")
@@ -0,0 +1,177 @@
+# app/session_model.py
+"""
+Interview session model
+Sessions, their question sets, progress, answers and evaluations as
+slotted records instead of nested dicts. Records keep dict-style access
+(sess["progress"]["answers"]) so orchestrator code reads the same, and
+are stored as compact JSON.
+"""
+import json
+import logging
+from typing import Any, Dict, MutableMapping, Union
+
+logger = logging.getLogger(__name__)
+
+_UNSET = object()
+
+
+class Record(MutableMapping):
+    """
+    Slotted record with dict-style access to its fields.
+
+    Unset fields read as missing keys, so sess.get("mode", default) and
+    `"mode" in sess` behave as they did with dicts. Assigning a field the
+    record doesn't have raises KeyError.
+    """
+
+    __slots__ = ()
+
+    # Field -> record class, for nested records (and lists of them)
+    _records: Dict[str, type] = {}
+    _record_lists: Dict[str, type] = {}
+    # Fields holding live objects, never serialised
+    _transient: tuple = ()
+    # Fields that are serialised (set per subclass)
+    _persisted: tuple = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._persisted = tuple(key for key in cls.__slots__ if key not in cls._transient)
+
+    def __init__(self, **fields: Any):
+        for key, value in fields.items():
+            self[key] = value
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key: str, value: Any):
+        if key not in self.__slots__:
+            raise KeyError(f"{type(self).__name__} has no field {key!r}")
+        setattr(self, key, value)
+
+    def __delitem__(self, key: str):
+        if key not in self.__slots__ or not hasattr(self, key):
+            raise KeyError(key)
+        delattr(self, key)
+
+    def __iter__(self):
+        return (key for key in self.__slots__ if hasattr(self, key))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+
+    @classmethod
+    def from_plain(cls, data: Union["Record", Dict[str, Any]]) -> "Record":
+        """Build a record (nested records included) from a dict"""
+        if isinstance(data, cls):
+            return data
+        record = cls.__new__(cls)
+        for key, value in data.items():
+            if key in cls._records and value is not None:
+                value = cls._records[key].from_plain(value)
+            elif key in cls._record_lists:
+                value = [cls._record_lists[key].from_plain(item) for item in value]
+            record[key] = value
+        return record
+
+    def persisted_fields(self) -> Dict[str, Any]:
+        """Fields that are set, without transient ones (nested records as they are)"""
+        fields = {}
+        for key in self._persisted:
+            value = getattr(self, key, _UNSET)
+            if value is not _UNSET:
+                fields[key] = value
+        return fields
+
+
+class Evaluation(Record):
+    """
+    Evaluation of one answer ({"status": "pending"} until it is evaluated,
+    with the process evaluating it once claimed)
+    """
+    __slots__ = ("score", "feedback", "recommendations", "status", "error", "claimed_by", "claimed_at")
+
+
+class Answer(Record):
+    """One answered question"""
+    __slots__ = ("question", "answer", "evaluation")
+    _records = {"evaluation": Evaluation}
+
+
+class Progress(Record):
+    """Where the candidate is in the interview, and their answers so far"""
+    __slots__ = ("round", "resume_index", "behavior_index", "answers")
+    _record_lists = {"answers": Answer}
+
+
+class QuestionSet(Record):
+    """Questions generated for a session, by round"""
+    __slots__ = ("coding", "resume", "behavior")
+
+
+class Session(Record):
+    """An interview session"""
+    __slots__ = (
+        "mode", "collaboration_mode", "evaluation_mode", "user_name", "resume", "jd",
+        "questions", "progress", "degraded", "version",
+        # Live agents and unsaved events (app.session_events.OUTBOX_KEY)
+        "agents", "outbox",
+        # Blob store digests of the resume and JD (replacing resume/jd text)
+        "resume_hash", "jd_hash",
+    )
+    _records = {"questions": QuestionSet, "progress": Progress}
+    _transient = ("agents", "outbox")
+
+
+def to_plain(value: Any) -> Any:
+    """Records (at any depth) as plain dicts, e.g. for JSON responses"""
+    if isinstance(value, (Record, dict)):
+        return {key: to_plain(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [to_plain(item) for item in value]
+    return value
+
+
+def _record_fields(value: Any) -> Dict[str, Any]:
+    """json.dumps hook for nested records"""
+    if not isinstance(value, Record):
+        raise TypeError(f"{type(value).__name__} is not JSON serialisable")
+    return value.persisted_fields()
+
+
+def pack(data: Union[Session, Dict[str, Any]]) -> bytes:
+    """Serialise a session (without its transient fields) as compact UTF-8 JSON"""
+    if isinstance(data, Record):
+        fields = data.persisted_fields()
+    else:
+        fields = {key: value for key, value in data.items() if key not in Session._transient}
+    return json.dumps(
+        fields, ensure_ascii=False, separators=(",", ":"), default=_record_fields
+    ).encode("utf-8")
+
+
+def unpack(data: Union[bytes, str]) -> Union[Session, Dict[str, Any]]:
+    """
+    Deserialise a session written by pack (or stored as JSON before
+    sessions were records).
+
+    Returns:
+        A Session, or a plain dict if it doesn't fit the Session model
+    """
+    fields = json.loads(data)
+    try:
+        return Session.from_plain(fields)
+    except (KeyError, TypeError, AttributeError):
+        return fields
+
+
+logger.info("Session model module loaded")
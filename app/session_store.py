@@ -0,0 +1,1056 @@
+# app/session_store.py
+"""
+Interview session stores
+Bounded in-memory store (idle TTL, LRU eviction, optional spill to disk),
+a durable SQLite store shared by worker processes, and a hot in-process
+cache over it. All are dict-like and versioned: changes go through
+update_session().
+"""
+import asyncio
+import contextlib
+import json
+import logging
+import pathlib
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, MutableMapping, Optional, TypeVar, Union
+
+from app.config import Config
+from app.session_events import OUTBOX_KEY, replay_events, take_outbox
+from app.session_model import Record, pack, to_plain, unpack
+from app.metrics import (
+    session_cache_requests_total,
+    session_cache_writes_total,
+    session_evictions_total,
+    sessions_live,
+    sessions_memory_bytes,
+)
+
+logger = logging.getLogger(__name__)
+
+# Session keys that are never serialised: live objects (agents), which the
+# restore hook rebuilds when a session is loaded back, and unsaved events
+TRANSIENT_KEYS = ("agents", OUTBOX_KEY)
+
+# Spilled session files
+SPILL_SUFFIX = ".session"
+
+R = TypeVar("R")
+
+
+class SessionConflictError(Exception):
+    """Raised when a session changed since it was read"""
+
+    def __init__(self, session_id: str):
+        super().__init__(f"Session {session_id} was modified concurrently")
+        self.session_id = session_id
+
+
+def estimate_size(obj: Any, _seen: Optional[set] = None) -> int:
+    """
+    Approximate memory used by a session.
+
+    Plain containers and scalars are measured recursively; other objects
+    (live agents) are counted shallowly.
+
+    Args:
+        obj: Session or part of one
+
+    Returns:
+        Estimated size in bytes
+    """
+    seen = _seen if _seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, Record):
+        size += sum(estimate_size(v, seen) for v in obj.values())
+    elif isinstance(obj, dict):
+        size += sum(estimate_size(k, seen) + estimate_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, seen) for item in obj)
+    return size
+
+
+def persistent_fields(sess: Dict[str, Any]) -> Dict[str, Any]:
+    """A session's keys without its transient ones, as plain dicts"""
+    return to_plain({k: v for k, v in sess.items() if k not in TRANSIENT_KEYS})
+
+
+def dump_session(sess: Dict[str, Any]) -> bytes:
+    """Serialise a session without its transient keys"""
+    return pack(sess)
+
+
+def load_session(data: Union[bytes, str]) -> Dict[str, Any]:
+    """Deserialise a session written by dump_session"""
+    return unpack(data)
+
+
+class SessionStore(MutableMapping):
+    """
+    Dict-like session store with idle TTL, LRU eviction and optional
+    spill-to-disk.
+
+    Sessions are mutated in place by the orchestrator, so sizes are
+    re-estimated for sessions read since the last limit check.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 7200,
+        max_entries: int = 1000,
+        max_bytes: int = 0,
+        spill_dir: Optional[str] = None,
+        restore: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+        on_evict: Optional[Callable[[str, str], None]] = None,
+        release: Optional[Callable[[Dict[str, Any]], None]] = None
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            ttl_seconds: Idle time after which a session expires (0 = never)
+            max_entries: Sessions kept in memory (0 = no limit)
+            max_bytes: Estimated bytes kept in memory (0 = no limit)
+            spill_dir: Directory evicted sessions are written to (None drops them)
+            restore: Rebuilds transient keys of a session loaded from disk
+            on_evict: Called with (session_id, reason) when a session is gone
+                for good (expired, dropped or deleted; not when spilled)
+            release: Called with a session that is gone for good (dropped,
+                expired or deleted), e.g. to release its blob references
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.spill_dir = pathlib.Path(spill_dir) if spill_dir else None
+        self.restore = restore
+        self.on_evict = on_evict
+        self.release = release
+
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._last_access: Dict[str, float] = {}
+        self._sizes: Dict[str, int] = {}
+        self._dirty: set = set()
+        self._lock = threading.RLock()
+        self.evictions = 0
+
+        if self.spill_dir is not None:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+
+        logger.info(
+            f"✅ Session store created (TTL {ttl_seconds}s, max {max_entries} sessions, "
+            f"max {max_bytes} bytes, spill: {spill_dir or 'off'})"
+        )
+
+    # ------------------------------------------------------------------
+    # Mapping interface
+    # ------------------------------------------------------------------
+
+    def __getitem__(self, session_id: str) -> Dict[str, Any]:
+        with self._lock:
+            sess = self._entries.get(session_id)
+            if sess is not None and self._is_expired(session_id):
+                self._evict(session_id, "expired")
+                sess = None
+            if sess is None:
+                sess = self._load_spilled(session_id)
+                if sess is None:
+                    raise KeyError(session_id)
+                self._entries[session_id] = sess
+                self._sizes[session_id] = estimate_size(sess)
+
+            self._touch(session_id)
+            self._enforce_limits(keep=session_id)
+            return sess
+
+    def __setitem__(self, session_id: str, sess: Dict[str, Any]):
+        with self._lock:
+            # New sessions are rare next to reads: a good time to expire idle ones
+            self._expire()
+            self._entries[session_id] = sess
+            self._sizes[session_id] = estimate_size(sess)
+            self._remove_spilled(session_id)
+            self._touch(session_id)
+            self._enforce_limits(keep=session_id)
+
+    def __delitem__(self, session_id: str):
+        with self._lock:
+            sess = self._entries.pop(session_id, None)
+            in_memory = sess is not None
+            if in_memory:
+                self._release(sess)
+            spilled = self._drop_spilled(self._spill_path(session_id)) if self.spill_dir else False
+            self._last_access.pop(session_id, None)
+            self._sizes.pop(session_id, None)
+            self._dirty.discard(session_id)
+            self._update_gauges()
+            if not (in_memory or spilled):
+                raise KeyError(session_id)
+        self._notify_evicted(session_id, "deleted")
+
+    def __contains__(self, session_id: object) -> bool:
+        try:
+            self[session_id]
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._entries))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def save(self, session_id: str, sess: Dict[str, Any]):
+        """Record a change to a session (sessions are shared in memory, so only the version moves)"""
+        with self._lock:
+            if self._entries.get(session_id) is not sess:
+                raise SessionConflictError(session_id)
+            sess["version"] = sess.get("version", 0) + 1
+            # Already applied to the shared session; nothing to persist
+            take_outbox(sess)
+            self._dirty.add(session_id)
+
+    def update_session(self, session_id: str, mutate: Callable[[Dict[str, Any]], R]) -> R:
+        """
+        Apply a change to a session.
+
+        Args:
+            session_id: Session ID
+            mutate: Changes the session in place; its return value is passed through
+
+        Returns:
+            Whatever mutate returned
+        """
+        with self._lock:
+            sess = self[session_id]
+            result = mutate(sess)
+            self.save(session_id, sess)
+            return result
+
+    def flush(self):
+        """Nothing is buffered in memory-only stores"""
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Hold the store's lock for a group of changes (there is no database to commit)"""
+        with self._lock:
+            yield None
+
+    # ------------------------------------------------------------------
+    # Limits
+    # ------------------------------------------------------------------
+
+    def prune(self) -> int:
+        """
+        Expire idle sessions (in memory and spilled) and apply the limits.
+
+        Returns:
+            Number of sessions removed from memory or disk
+        """
+        with self._lock:
+            removed = self._expire() + self._prune_spilled()
+            self._enforce_limits()
+            return removed
+
+    @property
+    def memory_bytes(self) -> int:
+        """Estimated bytes held by in-memory sessions"""
+        return sum(self._sizes.values())
+
+    def get_stats(self) -> dict:
+        """Get entry counts, estimated size and limits"""
+        with self._lock:
+            self._refresh_sizes()
+            return {
+                "backend": "memory",
+                "sessions": len(self._entries),
+                "spilled": len(list(self.spill_dir.glob(f"*{SPILL_SUFFIX}"))) if self.spill_dir else 0,
+                "memory_bytes": self.memory_bytes,
+                "evictions": self.evictions,
+                "ttl_seconds": self.ttl_seconds,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _expire(self) -> int:
+        expired = [s for s in self._entries if self._is_expired(s)]
+        for session_id in expired:
+            self._evict(session_id, "expired")
+        return len(expired)
+
+    def _touch(self, session_id: str):
+        self._entries.move_to_end(session_id)
+        self._last_access[session_id] = time.time()
+        # The caller may mutate the session before the next limit check
+        self._dirty.add(session_id)
+
+    def _is_expired(self, session_id: str) -> bool:
+        if not self.ttl_seconds:
+            return False
+        return time.time() - self._last_access.get(session_id, 0.0) > self.ttl_seconds
+
+    def _refresh_sizes(self):
+        for session_id in self._dirty:
+            if session_id in self._entries:
+                self._sizes[session_id] = estimate_size(self._entries[session_id])
+        self._dirty.clear()
+
+    def _enforce_limits(self, keep: Optional[str] = None):
+        """Evict least recently used sessions (never `keep`) until within limits"""
+        self._refresh_sizes()
+        if keep is not None:
+            self._dirty.add(keep)
+
+        candidates = [s for s in self._entries if s != keep]
+        while candidates and self.max_entries and len(self._entries) > self.max_entries:
+            self._evict(candidates.pop(0), "entries")
+        while candidates and self.max_bytes and self.memory_bytes > self.max_bytes:
+            self._evict(candidates.pop(0), "bytes")
+        self._update_gauges()
+
+    def _evict(self, session_id: str, reason: str):
+        sess = self._entries.pop(session_id)
+        self._sizes.pop(session_id, None)
+        self._dirty.discard(session_id)
+
+        action = "dropped"
+        if reason != "expired" and self.spill_dir is not None:
+            try:
+                self._spill(session_id, sess)
+                action = "spilled"
+            except Exception as e:
+                logger.error(f"❌ Could not spill session {session_id}: {str(e)}")
+        self._last_access.pop(session_id, None)
+        if action == "dropped":
+            self._release(sess)
+
+        self.evictions += 1
+        session_evictions_total.inc(reason=reason, action=action)
+        logger.info(f"🗑️ Session {session_id} evicted ({reason}, {action})")
+        # A spilled session is still alive (on disk)
+        if action == "dropped":
+            self._notify_evicted(session_id, reason)
+
+    def _notify_evicted(self, session_id: str, reason: str):
+        if self.on_evict is None:
+            return
+        try:
+            self.on_evict(session_id, reason)
+        except Exception as e:
+            logger.error(f"❌ Session eviction hook failed for {session_id}: {str(e)}")
+
+    def _release(self, sess: Dict[str, Any]):
+        if self.release is None:
+            return
+        try:
+            self.release(sess)
+        except Exception as e:
+            logger.error(f"❌ Session release hook failed: {str(e)}")
+
+    def _update_gauges(self):
+        sessions_live.set(len(self._entries))
+        sessions_memory_bytes.set(self.memory_bytes)
+
+    # ------------------------------------------------------------------
+    # Spill files
+    # ------------------------------------------------------------------
+
+    def _spill_path(self, session_id: str) -> pathlib.Path:
+        # Session IDs are UUIDs; keep anything else from escaping the directory
+        safe = "".join(c for c in session_id if c.isalnum() or c in "-_")
+        return self.spill_dir / f"{safe}{SPILL_SUFFIX}"
+
+    def _spill(self, session_id: str, sess: Dict[str, Any]):
+        path = self._spill_path(session_id)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(dump_session(sess))
+        tmp.replace(path)
+
+    def _load_spilled(self, session_id: str) -> Optional[Dict[str, Any]]:
+        if self.spill_dir is None:
+            return None
+        path = self._spill_path(session_id)
+        if not path.exists():
+            return None
+        if self.ttl_seconds and time.time() - path.stat().st_mtime > self.ttl_seconds:
+            self._drop_spilled(path)
+            return None
+
+        try:
+            sess = load_session(path.read_bytes())
+        except Exception as e:
+            logger.error(f"❌ Could not load spilled session {session_id}: {str(e)}")
+            return None
+        path.unlink(missing_ok=True)
+        if self.restore is not None:
+            sess = self.restore(sess)
+        logger.info(f"📂 Session {session_id} loaded from disk")
+        return sess
+
+    def _remove_spilled(self, session_id: str) -> bool:
+        if self.spill_dir is None:
+            return False
+        path = self._spill_path(session_id)
+        if path.exists():
+            path.unlink(missing_ok=True)
+            return True
+        return False
+
+    def _prune_spilled(self) -> int:
+        if self.spill_dir is None or not self.ttl_seconds:
+            return 0
+        removed = 0
+        cutoff = time.time() - self.ttl_seconds
+        for path in self.spill_dir.glob(f"*{SPILL_SUFFIX}"):
+            if path.stat().st_mtime < cutoff:
+                self._drop_spilled(path)
+                removed += 1
+        return removed
+
+    def _drop_spilled(self, path: pathlib.Path) -> bool:
+        """Delete a spill file for good, releasing the session it held"""
+        if not path.exists():
+            return False
+        if self.release is not None:
+            try:
+                self._release(load_session(path.read_bytes()))
+            except Exception as e:
+                logger.error(f"❌ Could not read spilled session {path.name}: {str(e)}")
+        path.unlink(missing_ok=True)
+        return True
+
+
+class SQLiteSessionStore(MutableMapping):
+    """
+    Durable session store in SQLite (WAL mode), shared by every worker
+    process using the same file.
+
+    Each read returns a fresh copy; changes are written back with
+    update_session(), which checks the version read against the stored one.
+    A save appends the session's new events rather than rewriting it; the
+    snapshot in `sessions` is refreshed every `snapshot_interval` events,
+    and reads replay the events recorded after it.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: float = 7200,
+        restore: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+        max_retries: int = 5,
+        snapshot_interval: int = 20,
+        release: Optional[Callable[[Dict[str, Any]], None]] = None,
+        on_evict: Optional[Callable[[str, str], None]] = None,
+        busy_timeout: float = 0.2
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            path: SQLite database file
+            ttl_seconds: Time since the last write after which a session expires (0 = never)
+            restore: Rebuilds transient keys (agents) of every session read
+            max_retries: Attempts update_session() makes when other writers keep winning
+            snapshot_interval: Events appended before the snapshot is rewritten
+            release: Called with each session deleted or expired (not restored)
+            on_evict: Called with (session_id, reason) for each session pruned
+                ("expired") or deleted ("deleted")
+            busy_timeout: Seconds to wait for another writer's lock
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.restore = restore
+        self.max_retries = max_retries
+        self.snapshot_interval = max(1, snapshot_interval)
+        self.release = release
+        self.on_evict = on_evict
+        self.conflicts = 0
+        self._lock = threading.RLock()
+        # Open transaction() blocks; writes commit only outside them
+        self._depth = 0
+
+        if path != ":memory:":
+            pathlib.Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=busy_timeout)
+        with self._lock:
+            # WAL lets readers in other workers proceed while one writes
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "id TEXT PRIMARY KEY, data TEXT NOT NULL, "
+                "version INTEGER NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_sessions_updated ON sessions (updated_at)"
+            )
+            # Databases written before the event log get the new columns
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(sessions)")}
+            for column in ("snapshot_seq", "last_seq"):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE sessions ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS session_events ("
+                "session_id TEXT NOT NULL, seq INTEGER NOT NULL, type TEXT NOT NULL, "
+                "data TEXT NOT NULL, created_at REAL NOT NULL, PRIMARY KEY (session_id, seq))"
+            )
+            self._conn.commit()
+
+        logger.info(f"💾 SQLite session store ready: {path} (TTL {ttl_seconds}s)")
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Group writes into one transaction on this store's connection: the
+        writes made in the block (by this store, or by a BlobStore sharing
+        it) commit together when the outermost block exits, or roll back
+        on an error.
+
+        Yields:
+            The store's connection
+        """
+        with self._lock:
+            self._depth += 1
+            try:
+                yield self._conn
+            except BaseException:
+                self._depth -= 1
+                if not self._depth:
+                    self._conn.rollback()
+                raise
+            self._depth -= 1
+            if not self._depth:
+                self._conn.commit()
+
+    def _commit(self):
+        if not self._depth:
+            self._conn.commit()
+
+    def _cutoff(self) -> float:
+        return time.time() - self.ttl_seconds if self.ttl_seconds else 0.0
+
+    def __getitem__(self, session_id: str) -> Dict[str, Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, version, snapshot_seq FROM sessions WHERE id = ? AND updated_at > ?",
+                (session_id, self._cutoff())
+            ).fetchone()
+            if row is None:
+                raise KeyError(session_id)
+            events = self._read_events(session_id, after=row[2])
+
+        sess = replay_events(events, load_session(row[0]))
+        sess["version"] = row[1]
+        if self.restore is not None:
+            sess = self.restore(sess)
+        return sess
+
+    def __setitem__(self, session_id: str, sess: Dict[str, Any]):
+        take_outbox(sess)
+        data = dump_session(sess)
+        created = json.dumps(persistent_fields(sess), ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            replaced = self._conn.execute(
+                "SELECT data FROM sessions WHERE id = ?", (session_id,)
+            ).fetchall()
+            # A (re)created session starts a new log with the whole session as event 1
+            self._conn.execute("DELETE FROM session_events WHERE session_id = ?", (session_id,))
+            self._conn.execute(
+                "INSERT INTO sessions (id, data, version, updated_at, snapshot_seq, last_seq) "
+                "VALUES (?, ?, 1, ?, 1, 1) "
+                "ON CONFLICT(id) DO UPDATE SET data = excluded.data, "
+                "version = sessions.version + 1, updated_at = excluded.updated_at, "
+                "snapshot_seq = 1, last_seq = 1",
+                (session_id, data, now)
+            )
+            self._conn.execute(
+                "INSERT INTO session_events (session_id, seq, type, data, created_at) "
+                "VALUES (?, 1, 'session_created', ?, ?)",
+                (session_id, created, now)
+            )
+            version = self._conn.execute(
+                "SELECT version FROM sessions WHERE id = ?", (session_id,)
+            ).fetchone()[0]
+            self._commit()
+        sess["version"] = version
+        self._release(replaced)
+
+    def __delitem__(self, session_id: str):
+        with self._lock:
+            deleted = self._conn.execute(
+                "SELECT data FROM sessions WHERE id = ?", (session_id,)
+            ).fetchall()
+            self._conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+            self._conn.execute("DELETE FROM session_events WHERE session_id = ?", (session_id,))
+            self._commit()
+        if not deleted:
+            raise KeyError(session_id)
+        self._release(deleted)
+        self._notify_evicted(session_id, "deleted")
+
+    def __contains__(self, session_id: object) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM sessions WHERE id = ? AND updated_at > ?",
+                (session_id, self._cutoff())
+            ).fetchone() is not None
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM sessions WHERE updated_at > ?", (self._cutoff(),)
+            ).fetchall()
+        return iter([row[0] for row in rows])
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM sessions WHERE updated_at > ?", (self._cutoff(),)
+            ).fetchone()[0]
+
+    def version_of(self, session_id: str) -> Optional[int]:
+        """Stored version of a session without loading it (None if missing or expired)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version FROM sessions WHERE id = ? AND updated_at > ?",
+                (session_id, self._cutoff())
+            ).fetchone()
+        return row[0] if row else None
+
+    def save(self, session_id: str, sess: Dict[str, Any]):
+        """
+        Write a changed session back: its new events, plus a snapshot when
+        enough events have built up since the last one (or when the change
+        recorded no events).
+
+        Raises:
+            SessionConflictError: If the session was written since it was read
+        """
+        expected = sess.get("version", 0)
+        events = sess.get(OUTBOX_KEY) or []
+        now = time.time()
+        with self._lock:
+            try:
+                self._save(session_id, sess, expected, events, now)
+            except BaseException:
+                # Don't leave the connection mid-transaction (an enclosing
+                # transaction() block rolls back itself)
+                if not self._depth:
+                    self._conn.rollback()
+                raise
+        take_outbox(sess)
+        sess["version"] = expected + 1
+
+    def _save(self, session_id: str, sess: Dict[str, Any], expected: int, events: List[Dict[str, Any]], now: float):
+        updated = self._conn.execute(
+            "UPDATE sessions SET version = version + 1, updated_at = ?, last_seq = last_seq + ? "
+            "WHERE id = ? AND version = ?",
+            (now, len(events), session_id, expected)
+        ).rowcount
+        if not updated:
+            self.conflicts += 1
+            raise SessionConflictError(session_id)
+
+        last_seq, snapshot_seq = self._conn.execute(
+            "SELECT last_seq, snapshot_seq FROM sessions WHERE id = ?", (session_id,)
+        ).fetchone()
+        first_seq = last_seq - len(events) + 1
+        self._conn.executemany(
+            "INSERT INTO session_events (session_id, seq, type, data, created_at) VALUES (?, ?, ?, ?, ?)",
+            [
+                (session_id, seq, event["type"], json.dumps(event["data"], ensure_ascii=False), now)
+                for seq, event in enumerate(events, first_seq)
+            ]
+        )
+        if not events or last_seq - snapshot_seq >= self.snapshot_interval:
+            self._conn.execute(
+                "UPDATE sessions SET data = ?, snapshot_seq = ? WHERE id = ?",
+                (dump_session(sess), last_seq, session_id)
+            )
+        self._commit()
+
+    def events(self, session_id: str) -> List[Dict[str, Any]]:
+        """
+        Full event log of a session, oldest first.
+
+        Raises:
+            KeyError: If the session has no events
+        """
+        with self._lock:
+            events = self._read_events(session_id)
+        if not events:
+            raise KeyError(session_id)
+        return events
+
+    def rebuild(self, session_id: str) -> Dict[str, Any]:
+        """
+        Rebuild a session from its whole event log, ignoring snapshots
+        (e.g. to check a snapshot or regenerate a report).
+
+        Raises:
+            KeyError: If the session has no events
+        """
+        return replay_events(self.events(session_id))
+
+    def _read_events(self, session_id: str, after: int = 0) -> List[Dict[str, Any]]:
+        rows = self._conn.execute(
+            "SELECT type, data FROM session_events WHERE session_id = ? AND seq > ? ORDER BY seq",
+            (session_id, after)
+        ).fetchall()
+        return [{"type": row[0], "data": json.loads(row[1])} for row in rows]
+
+    def update_session(self, session_id: str, mutate: Callable[[Dict[str, Any]], R]) -> R:
+        """
+        Apply a change to the latest copy of a session, retrying on a fresh
+        copy if another writer saved in between.
+
+        Args:
+            session_id: Session ID
+            mutate: Changes the session in place; its return value is passed through
+
+        Returns:
+            Whatever mutate returned
+        """
+        for attempt in range(1, self.max_retries + 1):
+            sess = self[session_id]
+            result = mutate(sess)
+            try:
+                self.save(session_id, sess)
+                return result
+            except SessionConflictError:
+                logger.warning(f"⚠️ Session {session_id} changed concurrently - retrying ({attempt}/{self.max_retries})")
+        raise SessionConflictError(session_id)
+
+    def prune(self) -> int:
+        """
+        Delete expired sessions.
+
+        Returns:
+            Number of sessions deleted
+        """
+        if not self.ttl_seconds:
+            return 0
+        cutoff = self._cutoff()
+        with self._lock:
+            expired = self._conn.execute(
+                "SELECT data, id FROM sessions WHERE updated_at <= ?", (cutoff,)
+            ).fetchall() if self.release is not None or self.on_evict is not None else []
+            removed = self._conn.execute(
+                "DELETE FROM sessions WHERE updated_at <= ?", (cutoff,)
+            ).rowcount
+            if removed:
+                self._conn.execute(
+                    "DELETE FROM session_events WHERE session_id NOT IN (SELECT id FROM sessions)"
+                )
+            self._commit()
+        if removed:
+            session_evictions_total.inc(removed, reason="expired", action="dropped")
+        self._release(expired)
+        for _, session_id in expired:
+            self._notify_evicted(session_id, "expired")
+        sessions_live.set(len(self))
+        return removed
+
+    def _notify_evicted(self, session_id: str, reason: str):
+        if self.on_evict is None:
+            return
+        try:
+            self.on_evict(session_id, reason)
+        except Exception as e:
+            logger.error(f"❌ Session eviction hook failed for {session_id}: {str(e)}")
+
+    def _release(self, rows: List[tuple]):
+        """Pass removed sessions (snapshot rows) to the release hook"""
+        if self.release is None:
+            return
+        for row in rows:
+            try:
+                self.release(load_session(row[0]))
+            except Exception as e:
+                logger.error(f"❌ Session release hook failed: {str(e)}")
+
+    def get_stats(self) -> dict:
+        """Get session count, conflicts and settings"""
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "sessions": len(self),
+            "conflicts": self.conflicts,
+            "ttl_seconds": self.ttl_seconds,
+            "snapshot_interval": self.snapshot_interval,
+        }
+
+    def flush(self):
+        """Writes are immediate"""
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CachedSessionStore(MutableMapping):
+    """
+    Hot in-process cache over a shared SQLiteSessionStore.
+
+    Reads check the stored version (one indexed lookup) and return the
+    cached session, live agents included, when it is current; otherwise
+    the session is reloaded. Changes are applied to the cached copy at
+    once and written back after `write_delay` seconds, so several changes
+    in one request cost one write. If another worker saved in between,
+    the buffered changes are replayed on its version.
+    """
+
+    def __init__(self, cold: SQLiteSessionStore, hot: SessionStore, write_delay: float = 0.1):
+        """
+        Initialize the cache.
+
+        Args:
+            cold: Shared durable store
+            hot: In-process store used as the cache (its limits bound the cache)
+            write_delay: Seconds changes are buffered before being written (0 = on the next loop turn)
+        """
+        self.cold = cold
+        self.hot = hot
+        self.write_delay = write_delay
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        # session_id -> (session, changes not yet written, first change time)
+        self._pending: Dict[str, tuple] = {}
+        # session_id -> failed writes in a row (for the retry backoff)
+        self._failures: Dict[str, int] = {}
+        self._lock = threading.RLock()
+
+        logger.info(f"✅ Session cache created over {cold.path} (write-behind {write_delay}s)")
+
+    def __getitem__(self, session_id: str) -> Dict[str, Any]:
+        with self._lock:
+            pending = self._pending.get(session_id)
+            if pending is not None:
+                # Buffered changes make the cached copy the newest we know of
+                self._count("hit")
+                return pending[0]
+
+            cached = self.hot.get(session_id)
+            version = self.cold.version_of(session_id)
+            if version is None:
+                self.hot.pop(session_id, None)
+                raise KeyError(session_id)
+            if cached is not None and cached.get("version") == version:
+                self._count("hit")
+                return cached
+
+            self._count("stale" if cached is not None else "miss")
+            sess = self.cold[session_id]
+            self.hot[session_id] = sess
+            return sess
+
+    def __setitem__(self, session_id: str, sess: Dict[str, Any]):
+        with self._lock:
+            self._pending.pop(session_id, None)
+            # New sessions are written through so other workers see them at once
+            self.cold[session_id] = sess
+            self.hot[session_id] = sess
+
+    def __delitem__(self, session_id: str):
+        with self._lock:
+            self._pending.pop(session_id, None)
+            self._failures.pop(session_id, None)
+            self.hot.pop(session_id, None)
+            del self.cold[session_id]
+
+    def __contains__(self, session_id: object) -> bool:
+        return session_id in self._pending or session_id in self.cold
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.cold)
+
+    def __len__(self) -> int:
+        return len(self.cold)
+
+    def save(self, session_id: str, sess: Dict[str, Any]):
+        """Write a changed session through to the shared store"""
+        with self._lock:
+            self._pending.pop(session_id, None)
+            self.cold.save(session_id, sess)
+            self.hot[session_id] = sess
+
+    def update_session(self, session_id: str, mutate: Callable[[Dict[str, Any]], R]) -> R:
+        """
+        Apply a change to the cached session and queue it for writing.
+
+        Args:
+            session_id: Session ID
+            mutate: Changes the session in place; its return value is passed
+                through. It may be replayed on a newer copy, so it must only
+                depend on its argument.
+
+        Returns:
+            Whatever mutate returned
+        """
+        with self._lock:
+            sess = self[session_id]
+            result = mutate(sess)
+
+            pending = self._pending.get(session_id)
+            if pending is None:
+                self._pending[session_id] = (sess, [mutate], time.time())
+                self._schedule_write(session_id)
+            else:
+                pending[1].append(mutate)
+                session_cache_writes_total.inc(outcome="coalesced")
+                # The timer may belong to a loop that has since closed
+                if time.time() - pending[2] > max(self.write_delay, 0.01) * 10:
+                    self._write(session_id)
+            return result
+
+    def flush(self):
+        """Write every buffered change now (e.g. on shutdown)"""
+        with self._lock:
+            for session_id in list(self._pending):
+                self._write(session_id)
+
+    def transaction(self) -> ContextManager[sqlite3.Connection]:
+        """A transaction on the shared store (see SQLiteSessionStore.transaction)"""
+        return self.cold.transaction()
+
+    def prune(self) -> int:
+        """Expire idle sessions in both tiers"""
+        self.hot.prune()
+        return self.cold.prune()
+
+    def get_stats(self) -> dict:
+        """Get hit/miss counters and both tiers' stats"""
+        total = self.hits + self.misses + self.stale
+        return {
+            "backend": "sqlite+memory",
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "hit_rate": f"{(self.hits / max(total, 1)) * 100:.1f}%",
+            "pending_writes": len(self._pending),
+            "write_delay": self.write_delay,
+            "hot": self.hot.get_stats(),
+            "cold": self.cold.get_stats(),
+        }
+
+    def _count(self, result: str):
+        if result == "hit":
+            self.hits += 1
+        elif result == "miss":
+            self.misses += 1
+        else:
+            self.stale += 1
+        session_cache_requests_total.inc(result=result)
+
+    def _schedule_write(self, session_id: str, delay: Optional[float] = None):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            if delay is None:
+                self._write(session_id)
+            # A failed write with no loop to retry it stays pending for flush()
+            return
+        loop.call_later(self.write_delay if delay is None else delay, self._write, session_id)
+
+    def _write(self, session_id: str):
+        with self._lock:
+            pending = self._pending.pop(session_id, None)
+            if pending is None:
+                return
+            try:
+                self._write_pending(session_id, pending)
+            except Exception as e:
+                # e.g. "database is locked" past the busy timeout: keep the
+                # changes and try again later
+                failures = self._failures.get(session_id, 0) + 1
+                self._failures[session_id] = failures
+                delay = min(max(self.write_delay, 0.05) * 2 ** failures, 30.0)
+                self._pending[session_id] = pending
+                session_cache_writes_total.inc(outcome="failed")
+                logger.error(f"❌ Could not write session {session_id} (attempt {failures}), retrying in {delay:.2f}s: {str(e)}")
+                self._schedule_write(session_id, delay)
+                return
+            self._failures.pop(session_id, None)
+
+    def _write_pending(self, session_id: str, pending: tuple):
+        sess, changes, _ = pending
+        try:
+            self.cold.save(session_id, sess)
+            session_cache_writes_total.inc(outcome="written")
+            return
+        except SessionConflictError:
+            pass
+
+        # Another worker saved first: apply our changes to its version
+        def replay(fresh: Dict[str, Any]) -> Dict[str, Any]:
+            for change in changes:
+                change(fresh)
+            return fresh
+
+        try:
+            fresh = self.cold.update_session(session_id, replay)
+        except (KeyError, SessionConflictError) as e:
+            logger.error(f"❌ Could not write session {session_id}: {str(e)}")
+            self.hot.pop(session_id, None)
+            return
+        self.hot[session_id] = fresh
+        session_cache_writes_total.inc(outcome="replayed")
+        logger.warning(f"⚠️ Session {session_id} changed on another worker - replayed {len(changes)} change(s)")
+
+
+def build_session_store(
+    restore: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+    on_evict: Optional[Callable[[str, str], None]] = None,
+    release: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> MutableMapping:
+    """Build the session store described by Config (Config.SESSION_BACKEND)"""
+    if Config.SESSION_BACKEND == "sqlite":
+        try:
+            cold = SQLiteSessionStore(
+                Config.SESSION_DB_PATH,
+                ttl_seconds=Config.SESSION_TTL_SECONDS,
+                restore=restore,
+                max_retries=Config.SESSION_UPDATE_RETRIES,
+                snapshot_interval=Config.SESSION_SNAPSHOT_INTERVAL,
+                release=release,
+                on_evict=on_evict,
+                busy_timeout=Config.SESSION_DB_BUSY_TIMEOUT_MS / 1000
+            )
+        except Exception as e:
+            logger.error(f"❌ Could not open session database, keeping sessions in memory: {str(e)}")
+        else:
+            if not Config.SESSION_CACHE_ENABLED:
+                return cold
+            # Cached sessions are still in the database when they leave the
+            # hot tier, so only the database releases them and stops their
+            # background work (on expiry or deletion)
+            hot = SessionStore(
+                ttl_seconds=Config.SESSION_TTL_SECONDS,
+                max_entries=Config.SESSION_MAX_ENTRIES,
+                max_bytes=Config.SESSION_MAX_BYTES
+            )
+            return CachedSessionStore(cold, hot, write_delay=Config.SESSION_WRITE_BEHIND_SECONDS)
+    
+    return SessionStore(
+        ttl_seconds=Config.SESSION_TTL_SECONDS,
+        max_entries=Config.SESSION_MAX_ENTRIES,
+        max_bytes=Config.SESSION_MAX_BYTES,
+        spill_dir=Config.SESSION_SPILL_DIR if Config.SESSION_SPILL_ENABLED else None,
+        restore=restore,
+        on_evict=on_evict,
+        release=release
+    )
+
+
+logger.info("Session store module loaded")
@@ -0,0 +1,84 @@
+# app/single_flight.py
+"""
+Single-flight request coalescing
+Concurrent callers with the same key share one in-flight coroutine
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical work. The first caller for a key starts
+    the work as a task; callers arriving while it runs await the same task.
+    The task is shielded, so a cancelled awaiter never cancels the shared
+    call for everyone else.
+    """
+
+    def __init__(self, name: str = "single_flight"):
+        """
+        Initialize the coalescer.
+
+        Args:
+            name: Name used in logs and stats
+        """
+        self.name = name
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run factory() once per key among concurrent callers.
+
+        Args:
+            key: Identity of the work
+            factory: Zero-argument callable returning the coroutine to run
+
+        Returns:
+            The shared result (exceptions propagate to every awaiter)
+        """
+        loop = asyncio.get_running_loop()
+        task = self._in_flight.get(key)
+
+        if task is not None and not task.done() and task.get_loop() is loop:
+            self.coalesced += 1
+            logger.info(f"🔗 {self.name}: joined in-flight request {key[:12]} (saved calls: {self.coalesced})")
+            return await asyncio.shield(task)
+
+        task = loop.create_task(factory())
+        self._in_flight[key] = task
+        self.leaders += 1
+
+        def _forget(done: asyncio.Task, key: str = key):
+            if self._in_flight.get(key) is done:
+                del self._in_flight[key]
+            # Retrieve the exception, so a task whose awaiters were all
+            # cancelled doesn't log "exception was never retrieved"
+            if not done.cancelled() and done.exception() is not None:
+                logger.debug(f"{self.name}: request {key[:12]} failed: {done.exception()}")
+
+        task.add_done_callback(_forget)
+        return await asyncio.shield(task)
+
+    def get_stats(self) -> dict:
+        """Get coalescing counters"""
+        total = self.leaders + self.coalesced
+        return {
+            "name": self.name,
+            "provider_calls": self.leaders,
+            "coalesced_calls": self.coalesced,
+            "calls_saved_rate": f"{(self.coalesced / max(total, 1)) * 100:.1f}%",
+            "in_flight": len(self._in_flight)
+        }
+
+    def reset_stats(self):
+        """Reset counters (in-flight work is untouched)"""
+        self.leaders = 0
+        self.coalesced = 0
+
+
+logger.info("Single-flight module loaded")
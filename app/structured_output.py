@@ -0,0 +1,82 @@
+# app/structured_output.py
+"""
+Structured (schema-validated) model output
+Parses model responses into pydantic schemas and builds the repair prompt
+used when a response doesn't validate.
+"""
+import json
+import logging
+from typing import Optional, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+from app.json_extract import extract_json
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T", bound=BaseModel)
+
+
+class StructuredOutputError(Exception):
+    """Raised when a response still doesn't match its schema after repair"""
+
+    def __init__(self, message: str, raw: str = ""):
+        super().__init__(message)
+        self.raw = raw
+
+
+def parse_structured(raw: str, schema: Type[T]) -> Optional[T]:
+    """
+    Parse a model response into a schema.
+
+    Accepts bare JSON (what native structured output returns), JSON in a
+    markdown fence, or JSON surrounded by prose: the first balanced object
+    that matches the schema wins.
+
+    Args:
+        raw: Model response
+        schema: Pydantic model the response should match
+
+    Returns:
+        The validated model, or None if the response doesn't match
+    """
+    return extract_json(raw, schema)
+
+
+def validation_error(raw: str, schema: Type[BaseModel]) -> str:
+    """Short description of why a response doesn't match a schema"""
+    candidate = extract_json(raw)
+    if candidate is None:
+        return "response contains no JSON object"
+    try:
+        schema.model_validate(candidate)
+    except ValidationError as e:
+        return "; ".join(
+            f"{'.'.join(str(p) for p in err['loc']) or 'response'}: {err['msg']}"
+            for err in e.errors()[:5]
+        )
+    return "response did not match the schema"
+
+
+def repair_prompt(raw: str, schema: Type[BaseModel]) -> str:
+    """
+    Prompt asking the model to turn an invalid response into valid JSON.
+
+    Args:
+        raw: The response that failed validation
+        schema: Pydantic model the response should match
+
+    Returns:
+        Repair prompt
+    """
+    return (
+        "Your previous response could not be parsed.\n"
+        f"Problem: {validation_error(raw, schema)}\n\n"
+        f"Previous response:\n{raw}\n\n"
+        "Rewrite it as ONE JSON object matching this JSON schema, keeping the same content. "
+        "Return ONLY the JSON, no prose or markdown.\n"
+        f"{json.dumps(schema.model_json_schema())}"
+    )
+
+
+logger.info("Structured output module loaded")
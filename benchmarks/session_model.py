@@ -0,0 +1,101 @@
+"""
+Benchmark: nested-dict sessions vs slotted Session records (no API calls)
+
+Builds N sessions (default 10,000) both ways and reports memory per
+session, and serialise/deserialise time of plain json on the dicts
+against pack()/unpack() on the records.
+
+Usage:
+    python benchmarks/session_model.py [N]
+"""
+import os
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+os.environ.setdefault("MOCK_MODE", "true")
+
+import json
+import time
+import tracemalloc
+from app.session_model import Answer, Evaluation, Progress, QuestionSet, Session, pack, to_plain, unpack
+
+ANSWERS_PER_SESSION = 8
+
+
+def make_session(i: int) -> Session:
+    answers = [
+        Answer(
+            question=f"Question {n} of session {i}",
+            answer=f"Answer {n} of session {i}: " + "use a hash map " * 5,
+            evaluation=Evaluation(
+                score=(i + n) % 11,
+                feedback=f"Feedback {n} for session {i}",
+                recommendations=["Consider edge cases", "Discuss trade-offs"]
+            )
+        )
+        for n in range(ANSWERS_PER_SESSION)
+    ]
+    return Session(
+        mode="teach",
+        collaboration_mode="sequential",
+        evaluation_mode="background",
+        user_name=f"Candidate {i}",
+        resume=f"Resume {i} " + "Python, FastAPI, SQL. " * 20,
+        jd=f"Job description {i} " + "Backend engineer. " * 20,
+        questions=QuestionSet(
+            coding={"q1": f"Problem {i}", "q2_easy": "Reverse a list", "q2_hard": "LRU cache", "followups": []},
+            resume=[f"Resume question {n}" for n in range(3)],
+            behavior=[f"Behavior question {n}" for n in range(3)]
+        ),
+        progress=Progress(round=3, resume_index=2, behavior_index=1, answers=answers),
+        degraded=[],
+        version=ANSWERS_PER_SESSION + 1,
+    )
+
+
+def measure_memory(build, count: int) -> float:
+    """Bytes allocated per session by build(i)"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = [build(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del sessions
+    return (after - before) / count
+
+
+def timed(label: str, fn, items):
+    start = time.perf_counter()
+    results = [fn(item) for item in items]
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {elapsed * 1000:9.1f} ms  ({elapsed / len(items) * 1e6:6.1f} µs/session)")
+    return results
+
+
+def run(count: int):
+    print("=" * 70)
+    print(f"📏 SESSION MODEL BENCHMARK - {count:,} sessions, {ANSWERS_PER_SESSION} answers each")
+    print("=" * 70)
+
+    dict_bytes = measure_memory(lambda i: to_plain(make_session(i)), count)
+    record_bytes = measure_memory(make_session, count)
+    print("\nMemory per session")
+    print(f"  {'nested dicts':<28} {dict_bytes:9.0f} bytes")
+    print(f"  {'slotted records':<28} {record_bytes:9.0f} bytes  ({(1 - record_bytes / dict_bytes) * 100:.0f}% less)")
+
+    records = [make_session(i) for i in range(count)]
+    dicts = [to_plain(sess) for sess in records]
+
+    print("\nSerialise")
+    as_json = timed("json.dumps(dict)", lambda d: json.dumps(d, ensure_ascii=False), dicts)
+    packed = timed("pack(Session)", pack, records)
+    print("\nDeserialise")
+    timed("json.loads(dict)", json.loads, as_json)
+    timed("unpack(Session)", unpack, packed)
+
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
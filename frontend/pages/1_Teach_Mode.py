@@ -262,6 +262,43 @@ def is_coding_question(question_text: str) -> bool:
     return False
 
 
+def format_evaluation(evaluation: dict, title: str = "📊 Evaluation:") -> str:
+    """Format an evaluation as a chat message"""
+    eval_text = f"**{title}**\n\n"
+    eval_text += f"**Score:** {evaluation.get('score', 'N/A')}/10\n\n"
+    eval_text += f"**Feedback:** {evaluation.get('feedback', 'No feedback')}\n\n"
+    
+    if evaluation.get('recommendations'):
+        eval_text += "**💡 Recommendations:**\n"
+        for rec in evaluation['recommendations']:
+            eval_text += f"- {rec}\n"
+    return eval_text
+
+
+def collect_pending_feedback():
+    """Add feedback for answers that were evaluated in the background since the last run"""
+    still_pending = []
+    for answer_index in st.session_state.pending_feedback:
+        try:
+            res = requests.get(f"{BACKEND_URL}/evaluation", params={
+                "session_id": st.session_state.session_id,
+                "answer_index": answer_index
+            }, timeout=10).json()
+        except Exception as e:
+            logger.error(f"Error fetching evaluation #{answer_index}: {str(e)}")
+            still_pending.append(answer_index)
+            continue
+        
+        if res.get("status") == "complete":
+            logger.info(f"Background evaluation received - answer #{answer_index}")
+            st.session_state.chat_history.append(
+                ("assistant", format_evaluation(res["evaluation"], "📊 Feedback on your previous answer:"))
+            )
+        elif res.get("status") == "pending":
+            still_pending.append(answer_index)
+    st.session_state.pending_feedback = still_pending
+
+
 # --- Session state ---
 if "chat_history" not in st.session_state:
     st.session_state.chat_history = []
@@ -275,6 +312,9 @@ if "current_question" not in st.session_state:
     st.session_state.current_question = None
     logger.info("Initialized current_question")
 
+if "pending_feedback" not in st.session_state:
+    st.session_state.pending_feedback = []
+
 # FIXED: Initialize code editor state
 if "code_input" not in st.session_state:
     st.session_state.code_input = ""
@@ -339,6 +379,7 @@ if not st.session_state.session_id:
                                 st.session_state.session_id = data["session_id"]
                                 st.session_state.current_question = data["first_question"]
                                 st.session_state.chat_history = [("assistant", data["first_question"])]
+                                st.session_state.pending_feedback = []
                                 
                                 logger.info(f"✅ Interview started - Session: {data['session_id']}")
                                 st.success("✅ Interview started!")
@@ -360,6 +401,10 @@ if not st.session_state.session_id:
     else:
         st.info("👆 Please upload both your resume and the job description to begin")
 
+# Feedback from background evaluations
+if st.session_state.session_id and st.session_state.pending_feedback:
+    collect_pending_feedback()
+
 # Display chat messages
 if st.session_state.chat_history:
     st.markdown("### 💬 Interview Conversation")
@@ -454,19 +499,13 @@ if st.session_state.session_id and st.session_state.current_question:
                             next_q = res.get("next_question")
                             is_done = res.get("done", False)
                             
-                            logger.info(f"Evaluation received - Score: {evaluation.get('score', 'N/A')}")
-                            
-                            # Show evaluation
-                            eval_text = f"**📊 Evaluation:**\n\n"
-                            eval_text += f"**Score:** {evaluation.get('score', 'N/A')}/10\n\n"
-                            eval_text += f"**Feedback:** {evaluation.get('feedback', 'No feedback')}\n\n"
-                            
-                            if evaluation.get('recommendations'):
-                                eval_text += "**💡 Recommendations:**\n"
-                                for rec in evaluation['recommendations']:
-                                    eval_text += f"- {rec}\n"
-                            
-                            st.session_state.chat_history.append(("assistant", eval_text))
+                            # Show evaluation (or fetch it later if it runs in the background)
+                            if evaluation.get("status") == "pending":
+                                logger.info(f"Evaluation pending - answer #{res.get('answer_index')}")
+                                st.session_state.pending_feedback.append(res["answer_index"])
+                            else:
+                                logger.info(f"Evaluation received - Score: {evaluation.get('score', 'N/A')}")
+                                st.session_state.chat_history.append(("assistant", format_evaluation(evaluation)))
                             
                             # Clear code editor
                             st.session_state.code_input = ""
@@ -557,19 +596,13 @@ if st.session_state.session_id and st.session_state.current_question:
                     next_q = res.get("next_question")
                     is_done = res.get("done", False)
                     
-                    logger.info(f"Evaluation received - Score: {evaluation.get('score', 'N/A')}")
-                    
-                    # Show evaluation feedback
-                    eval_text = f"**📊 Evaluation:**\n\n"
-                    eval_text += f"**Score:** {evaluation.get('score', 'N/A')}/10\n\n"
-                    eval_text += f"**Feedback:** {evaluation.get('feedback', 'No feedback')}\n\n"
-                    
-                    if evaluation.get('recommendations'):
-                        eval_text += "**💡 Recommendations:**\n"
-                        for rec in evaluation['recommendations']:
-                            eval_text += f"- {rec}\n"
-                    
-                    st.session_state.chat_history.append(("assistant", eval_text))
+                    # Show evaluation (or fetch it later if it runs in the background)
+                    if evaluation.get("status") == "pending":
+                        logger.info(f"Evaluation pending - answer #{res.get('answer_index')}")
+                        st.session_state.pending_feedback.append(res["answer_index"])
+                    else:
+                        logger.info(f"Evaluation received - Score: {evaluation.get('score', 'N/A')}")
+                        st.session_state.chat_history.append(("assistant", format_evaluation(evaluation)))
                     
                     # Check if interview is complete
                     if is_done:
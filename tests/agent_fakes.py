@@ -0,0 +1,80 @@
+"""
+Shared fakes for tests that exercise agents without calling a provider
+"""
+import asyncio
+from contextlib import contextmanager
+from autogen_ext.models.replay import ReplayChatCompletionClient
+from app.config import Config, ModelClientFactory
+from app.rate_limiter import RateLimiterRegistry
+
+
+class RecordingClient(ReplayChatCompletionClient):
+    """Replay client that counts calls, remembers message counts and can be slow"""
+
+    def __init__(self, responses, delay=0.0):
+        super().__init__(responses)
+        self.delay = delay
+        self.calls = 0
+        self.message_counts = []
+
+    async def create(self, messages, **kwargs):
+        self.calls += 1
+        self.message_counts.append(len(messages))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return await super().create(messages, **kwargs)
+
+
+@contextmanager
+def fake_client(responses=None, delay=0.0, client=None):
+    """Serve a RecordingClient (or the given client) from ModelClientFactory, with no rate limits"""
+    client = client or RecordingClient(responses, delay=delay)
+    original = ModelClientFactory.__dict__["get_client"]
+    original_limits = Config.RATE_LIMITS
+    ModelClientFactory.get_client = classmethod(lambda cls, *a, **k: client)
+    Config.RATE_LIMITS = {}
+    RateLimiterRegistry.reset()
+    try:
+        yield client
+    finally:
+        ModelClientFactory.get_client = original
+        Config.RATE_LIMITS = original_limits
+        RateLimiterRegistry.reset()
+
+
+@contextmanager
+def two_providers(cooldown=0.05, clients=None):
+    """Real (non-mock) routing with both keys set and dummy clients"""
+    saved = {
+        name: getattr(Config, name)
+        for name in ("MOCK_MODE", "GEMINI_API_KEY", "OPENROUTER_API_KEY", "CURRENT_PROVIDER",
+                     "FAILOVER_COUNT", "CIRCUIT_COOLDOWN_SECONDS", "RATE_LIMITS")
+    }
+    saved_create = ModelClientFactory.__dict__["create_client"]
+    clients = clients or {}
+    Config.MOCK_MODE = False
+    Config.GEMINI_API_KEY = "test"
+    Config.OPENROUTER_API_KEY = "test"
+    Config.CURRENT_PROVIDER = Config.PRIMARY_PROVIDER
+    Config.FAILOVER_COUNT = 0
+    Config.CIRCUIT_COOLDOWN_SECONDS = cooldown
+    Config.RATE_LIMITS = {}
+    RateLimiterRegistry.reset()
+    ModelClientFactory.create_client = classmethod(
+        lambda cls, provider=None: clients.get(provider, f"client:{provider}")
+    )
+    ModelClientFactory._clients = {}
+    ModelClientFactory._breakers = {}
+    ModelClientFactory._client_history = []
+    ModelClientFactory._generation = 0
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(Config, name, value)
+        ModelClientFactory.create_client = saved_create
+        ModelClientFactory._clients = {}
+        ModelClientFactory._breakers = {}
+        ModelClientFactory._client_history = []
+        ModelClientFactory._generation = 0
+        RateLimiterRegistry.reset()
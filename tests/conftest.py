@@ -0,0 +1,17 @@
+"""
+pytest setup: keep the test run's databases out of data/
+
+Session, blob and LLM cache databases go to a temporary directory that is
+removed when the run ends (set before any app module reads Config).
+"""
+import atexit
+import os
+import shutil
+import tempfile
+
+_data_dir = tempfile.mkdtemp(prefix="questai-tests-")
+atexit.register(shutil.rmtree, _data_dir, ignore_errors=True)
+
+os.environ["SESSION_DB_PATH"] = os.path.join(_data_dir, "sessions.sqlite3")
+os.environ["SESSION_SPILL_DIR"] = os.path.join(_data_dir, "sessions")
+os.environ["LLM_CACHE_DISK_PATH"] = os.path.join(_data_dir, "llm_cache.sqlite3")
@@ -0,0 +1,108 @@
+"""
+Test background evaluation: next question first, feedback polled later (no API calls)
+"""
+import os
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+os.environ.setdefault("MOCK_MODE", "true")
+
+import asyncio
+from fastapi.testclient import TestClient
+from app.main import app
+from app.config import Config
+from app.agents import orchestrator
+from app.agents.evaluator_agent import EvaluatorAgent
+from app.llm_cache import set_response_cache
+from agent_fakes import fake_client
+
+EVALUATION = '{"score": 8, "feedback": "Clear trade-offs", "recommendations": []}'
+
+
+def make_session(session_id, round_=2):
+    orchestrator.SESSIONS[session_id] = {
+        "mode": "teach",
+        "collaboration_mode": "sequential",
+        "evaluation_mode": "background",
+        "agents": {"evaluator": EvaluatorAgent(mode="teach")},
+        "questions": {
+            "coding": {"q2_easy": "Easy follow-up", "q2_hard": "Hard follow-up"},
+            "resume": ["Explain REST", "Explain caching"],
+            "behavior": ["Tell me about a conflict"]
+        },
+        "progress": {"round": round_, "answers": [], "resume_index": 0, "behavior_index": 0},
+    }
+
+
+def test_next_question_before_evaluation():
+    print("\n🧪 TEST: submit_answer returns the next question before the evaluation runs")
+    print("=" * 60)
+    set_response_cache(None)
+    saved_mode = Config.MOCK_MODE
+
+    async def run():
+        result = await orchestrator.submit_answer("background-test", "Explain REST", "Stateless resources")
+        polled = orchestrator.get_evaluation("background-test", result["answer_index"])
+        events = [e async for e in orchestrator.evaluation_stream("background-test", result["answer_index"])]
+        return result, polled, events
+
+    with fake_client([EVALUATION]):
+        Config.MOCK_MODE = False
+        try:
+            make_session("background-test")
+            result, polled, events = asyncio.run(run())
+        finally:
+            Config.MOCK_MODE = saved_mode
+            orchestrator.SESSIONS.pop("background-test", None)
+
+    print(f"✅ Next question: {result['next_question']} | events: {[e for e, _ in events]}")
+    assert result["next_question"] == "Explain caching"
+    assert result["evaluation"] == {"status": "pending"}
+    assert polled["status"] == "pending"
+    assert [e for e, _ in events] == ["pending", "evaluation"]
+    assert events[-1][1]["status"] == "complete"
+    assert events[-1][1]["evaluation"]["score"] == 8
+    print("=" * 60)
+
+
+def test_adaptive_step_evaluated_inline():
+    print("\n🧪 TEST: The first coding answer is still evaluated before answering")
+    print("=" * 60)
+    set_response_cache(None)
+    saved_mode = Config.MOCK_MODE
+    with fake_client([EVALUATION]):
+        Config.MOCK_MODE = False
+        try:
+            make_session("background-adaptive", round_=1)
+            result = asyncio.run(orchestrator.submit_answer("background-adaptive", "Reverse a list", "Two pointers"))
+        finally:
+            Config.MOCK_MODE = saved_mode
+            orchestrator.SESSIONS.pop("background-adaptive", None)
+    print(f"✅ Score {result['evaluation']['score']} -> {result['next_question']}")
+    assert result["next_question"] == "Hard follow-up"
+    assert "answer_index" not in result
+    print("=" * 60)
+
+
+def test_evaluation_endpoint_errors():
+    print("\n🧪 TEST: /evaluation returns 404 for unknown sessions and answers")
+    print("=" * 60)
+    client = TestClient(app)
+    assert client.get("/evaluation", params={"session_id": "missing", "answer_index": 0}).status_code == 404
+    make_session("background-endpoint")
+    try:
+        response = client.get("/evaluation", params={"session_id": "background-endpoint", "answer_index": 3})
+    finally:
+        orchestrator.SESSIONS.pop("background-endpoint", None)
+    print(f"✅ {response.status_code}: {response.json()}")
+    assert response.status_code == 404
+    assert response.json()["detail"] == "invalid_answer_index"
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_next_question_before_evaluation()
+    test_adaptive_step_evaluated_inline()
+    test_evaluation_endpoint_errors()
+    print("\n✅ ALL BACKGROUND EVALUATION TESTS COMPLETE")
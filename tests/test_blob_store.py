@@ -0,0 +1,151 @@
+"""
+Test content-addressed interning of resume/JD text (no API calls)
+"""
+import os
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+os.environ.setdefault("MOCK_MODE", "true")
+
+import tempfile
+import time
+from app.blob_store import BlobStore
+from app.hashing import content_digest
+from app.session_model import Session
+from app.session_store import SessionStore, SQLiteSessionStore
+from app import relevance
+from app.prompt_budget import TokenCounter
+
+JD = "Backend engineer. Python, FastAPI and PostgreSQL. Kafka a plus."
+
+
+def test_memory_store_deduplicates_and_counts_references():
+    print("\n🧪 TEST: One copy per unique text, deleted with its last reference")
+    print("=" * 60)
+    blobs = BlobStore()
+    first, second = blobs.put(JD), blobs.put(JD)
+    resume = blobs.put("Resume of candidate A")
+    print(f"✅ Stats: {blobs.get_stats()}")
+    assert first == second == content_digest(JD)
+    assert len(blobs) == 2 and blobs.refs(first) == 2
+    assert blobs.get_stats()["deduplicated"] == 1
+
+    blobs.release(first)
+    assert blobs.get(first) == JD
+    blobs.release(first)
+    assert first not in blobs and resume in blobs
+    try:
+        blobs.get(first)
+        assert False, "released blob should be gone"
+    except KeyError:
+        pass
+    print("=" * 60)
+
+
+def test_sqlite_store_shared_by_workers():
+    print("\n🧪 TEST: Blobs in SQLite are shared and counted across processes")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "sessions.sqlite3")
+        worker_a, worker_b = BlobStore(path), BlobStore(path)
+        digest = worker_a.put(JD)
+        assert worker_b.put(JD) == digest
+        assert worker_b.get(digest) == JD
+        assert worker_a.refs(digest) == 2
+        assert worker_a.get_stats()["stored_bytes"] == len(JD)
+
+        worker_a.release(digest)
+        worker_b.release(digest)
+        assert len(worker_a) == 0
+        worker_a.close()
+        worker_b.close()
+    print("=" * 60)
+
+
+def test_session_and_texts_written_in_one_transaction():
+    print("\n🧪 TEST: A session and its texts commit (or roll back) together")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "sessions.sqlite3")
+        sessions = SQLiteSessionStore(path)
+        blobs = BlobStore(database=sessions)
+        other_worker = BlobStore(path)
+
+        with sessions.transaction():
+            sessions["a"] = Session(mode="teach", jd_hash=blobs.put(JD))
+            # Not committed yet: invisible to other connections
+            assert other_worker.refs(content_digest(JD)) == 0
+        assert other_worker.refs(content_digest(JD)) == 1
+
+        try:
+            with sessions.transaction():
+                blobs.put("Resume of candidate B")
+                raise RuntimeError("session insert failed")
+        except RuntimeError:
+            pass
+        print(f"✅ Stats after rollback: {other_worker.get_stats()}")
+        assert other_worker.refs(content_digest("Resume of candidate B")) == 0
+        assert len(other_worker) == 1
+        other_worker.close()
+        sessions.close()
+    print("=" * 60)
+
+
+def test_sessions_release_their_texts():
+    print("\n🧪 TEST: Dropped and expired sessions release their blob references")
+    print("=" * 60)
+    blobs = BlobStore()
+
+    def release(sess):
+        blobs.release(sess["jd_hash"])
+
+    memory = SessionStore(ttl_seconds=0, max_entries=1, release=release)
+    memory["a"] = Session(mode="teach", jd_hash=blobs.put(JD))
+    memory["b"] = Session(mode="teach", jd_hash=blobs.put(JD))
+    # 'a' was dropped (no spill directory) and released its reference
+    assert blobs.refs(content_digest(JD)) == 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteSessionStore(str(Path(tmp) / "sessions.sqlite3"), ttl_seconds=0.05, release=release)
+        store["c"] = Session(mode="teach", jd_hash=blobs.put(JD))
+        assert blobs.refs(content_digest(JD)) == 2
+        time.sleep(0.1)
+        assert store.prune() == 1
+        print(f"✅ References left: {blobs.refs(content_digest(JD))}")
+        assert blobs.refs(content_digest(JD)) == 1
+        store.close()
+    print("=" * 60)
+
+
+def test_relevance_selection_cached_by_digest():
+    print("\n🧪 TEST: Relevance selections are cached under content digests")
+    print("=" * 60)
+    resume = "\n".join(f"Built service {i} with Django and Celery." for i in range(30)) + "\nRan Kafka pipelines."
+    counter = TokenCounter()
+    calls = []
+    original = relevance._select_relevant
+
+    def counting(*args):
+        calls.append(args)
+        return original(*args)
+
+    relevance._select_relevant = counting
+    try:
+        first = relevance.select_relevant(resume, JD, 30, counter)
+        second = relevance.select_relevant(str(resume), JD, 30, counter)
+    finally:
+        relevance._select_relevant = original
+    print(f"✅ Selected: {first!r}")
+    assert first == second
+    assert len(calls) == 1
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_memory_store_deduplicates_and_counts_references()
+    test_sqlite_store_shared_by_workers()
+    test_session_and_texts_written_in_one_transaction()
+    test_sessions_release_their_texts()
+    test_relevance_selection_cached_by_digest()
+    print("\n✅ ALL BLOB STORE TESTS COMPLETE")
@@ -0,0 +1,129 @@
+"""
+Test per-provider circuit breakers and routing back to the primary (no API calls)
+"""
+import os
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+os.environ.setdefault("MOCK_MODE", "true")
+
+import asyncio
+import time
+from app.circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+from app.config import Config, ModelClientFactory
+from app.agents.base_agent import BaseAgent
+from app.llm_cache import set_response_cache
+from agent_fakes import RecordingClient, two_providers
+
+
+class QuotaExhaustedClient(RecordingClient):
+    """Client that always fails with a 429 after a short delay"""
+
+    async def create(self, messages, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        raise RuntimeError("Error code: 429 - quota exceeded")
+
+
+def test_breaker_state_machine():
+    print("\n🧪 TEST: closed → open → half-open → closed")
+    print("=" * 60)
+    breaker = CircuitBreaker("gemini", failure_threshold=2, cooldown_seconds=0.05)
+    breaker.record_failure("timeout")
+    assert breaker.state == CLOSED
+    breaker.record_failure("timeout")
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+
+    time.sleep(0.06)
+    assert breaker.state == OPEN            # reading the state doesn't move it
+    assert breaker.allow_request()          # the single probe
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow_request()      # no second probe
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+    print(f"✅ Transitions: {[(t['from'], t['to']) for t in breaker.transitions]}")
+    assert [t["to"] for t in breaker.transitions] == [OPEN, HALF_OPEN, CLOSED]
+    print("=" * 60)
+
+
+def test_failed_probe_reopens():
+    print("\n🧪 TEST: A failed probe re-opens the circuit")
+    print("=" * 60)
+    breaker = CircuitBreaker("gemini", cooldown_seconds=0.01)
+    breaker.record_failure("429", trip=True)
+    time.sleep(0.02)
+    assert breaker.allow_request()
+    breaker.record_failure("429 again")
+    assert breaker.state == OPEN
+    assert breaker.open_count == 2
+    print("=" * 60)
+
+
+def test_factory_routes_back_to_primary():
+    print("\n🧪 TEST: Factory fails over and recovers to the primary")
+    print("=" * 60)
+    with two_providers():
+        primary, backup = Config.PRIMARY_PROVIDER, Config.BACKUP_PROVIDER
+
+        provider = ModelClientFactory.acquire_provider()
+        assert provider == primary
+        ModelClientFactory.record_failure(provider, "429 quota", trip=True)
+        assert Config.CURRENT_PROVIDER == backup
+        assert ModelClientFactory.acquire_provider() == backup
+
+        time.sleep(0.06)
+        probe = ModelClientFactory.acquire_provider()
+        assert probe == primary
+        # Other traffic keeps using the backup while the probe is out
+        assert ModelClientFactory.acquire_provider() == backup
+
+        ModelClientFactory.record_success(probe)
+        status = ModelClientFactory.get_status()
+        print(f"✅ Switches: {[(s['from'], s['to']) for s in status['switch_history']]}")
+        assert Config.CURRENT_PROVIDER == primary
+        assert status["circuit_breakers"][primary]["state"] == CLOSED
+        assert [s["to"] for s in status["switch_history"]] == [backup, primary]
+
+        # A late 429 from a request routed before the failover is stale
+        assert not ModelClientFactory.record_failure(primary, "late 429", trip=True, generation=0)
+        ModelClientFactory.switch_to_backup("late 429", generation=0)
+        assert Config.CURRENT_PROVIDER == primary
+        assert ModelClientFactory.get_breaker(primary).state == CLOSED
+    print("=" * 60)
+
+
+def test_concurrent_quota_errors_switch_once():
+    print("\n🧪 TEST: A burst of 429s produces exactly one failover")
+    print("=" * 60)
+    primary = QuotaExhaustedClient([], delay=0.05)
+    backup = RecordingClient([f"answer {i}" for i in range(20)])
+    set_response_cache(None)
+
+    async def run():
+        agent = BaseAgent("BurstAgent", "You are a test agent.", stateless=True)
+        return await asyncio.gather(*(agent.ask(f"question {i}") for i in range(20)))
+
+    with two_providers(cooldown=60, clients={"gemini": primary, "openrouter": backup}):
+        responses = asyncio.run(run())
+        status = ModelClientFactory.get_status()
+
+    print(f"✅ Switches: {status['switch_history']}")
+    print(f"✅ Primary calls: {primary.calls}, backup calls: {backup.calls}")
+    assert len(status["switch_history"]) == 1
+    assert status["failover_count"] == 1
+    assert status["generation"] == 1
+    assert not any(r.startswith("ERROR") for r in responses)
+    # Every failed call retried on the one backup client
+    assert backup.calls == 20
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_breaker_state_machine()
+    test_failed_probe_reopens()
+    test_factory_routes_back_to_primary()
+    test_concurrent_quota_errors_switch_once()
+    print("\n✅ ALL CIRCUIT BREAKER TESTS COMPLETE")
@@ -0,0 +1,214 @@
+"""
+Test deferred (batched) evaluation of interview answers (no API calls)
+"""
+import os
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+os.environ.setdefault("MOCK_MODE", "true")
+
+import asyncio
+import json
+import tempfile
+import time
+from app.config import Config
+from app.agents import orchestrator
+from app.agents.evaluator_agent import EvaluatorAgent
+from app.llm_cache import set_response_cache
+from app.session_store import SQLiteSessionStore
+from agent_fakes import fake_client
+
+EVALUATION = '{"score": 5, "feedback": "Single", "recommendations": []}'
+REPORT = '{"strengths": ["Clear"], "weaknesses": ["Depth"], "recommendations": ["Practice"]}'
+
+
+def batch_response(*indices):
+    return json.dumps({"evaluations": [
+        {"index": i, "score": i, "feedback": f"Answer {i}", "recommendations": []} for i in indices
+    ]})
+
+
+def test_batch_single_call():
+    print("\n🧪 TEST: Several answers are evaluated with one call")
+    print("=" * 60)
+    set_response_cache(None)
+    items = [(f"Question {i}", f"Answer {i}") for i in range(1, 4)]
+    with fake_client([batch_response(1, 2, 3)]) as client:
+        results = asyncio.run(EvaluatorAgent().evaluate_batch(items))
+    print(f"✅ Scores: {[r['score'] for r in results]}, calls: {client.calls}")
+    assert [r["score"] for r in results] == [1, 2, 3]
+    assert client.calls == 1
+    print("=" * 60)
+
+
+def test_missing_answers_evaluated_individually():
+    print("\n🧪 TEST: Answers missing from the batch response fall back to single calls")
+    print("=" * 60)
+    set_response_cache(None)
+    items = [(f"Question {i}", f"Answer {i}") for i in range(1, 4)]
+    with fake_client([batch_response(1, 3), EVALUATION]) as client:
+        results = asyncio.run(EvaluatorAgent().evaluate_batch(items))
+    print(f"✅ Feedback: {[r['feedback'] for r in results]}")
+    assert [r["feedback"] for r in results] == ["Answer 1", "Single", "Answer 3"]
+    assert client.calls == 2
+    print("=" * 60)
+
+
+def test_deferred_session_flushes_before_report():
+    print("\n🧪 TEST: Deferred answers are recorded as pending and batch-evaluated for the report")
+    print("=" * 60)
+    set_response_cache(None)
+    saved_mode = Config.MOCK_MODE
+
+    async def run():
+        await orchestrator.submit_answer("deferred-test", "Explain REST", "Stateless resources")
+        pending = orchestrator.SESSIONS["deferred-test"]["progress"]["answers"][-1]["evaluation"]
+        await orchestrator.submit_answer("deferred-test", "Explain caching", "Keep hot data close")
+        report = await orchestrator.generate_report("deferred-test")
+        return pending, report
+
+    with fake_client([batch_response(1, 2), REPORT]) as client:
+        Config.MOCK_MODE = False
+        try:
+            orchestrator.SESSIONS["deferred-test"] = {
+                "mode": "experience",
+                "collaboration_mode": "sequential",
+                "evaluation_mode": "deferred",
+                "agents": {"evaluator": EvaluatorAgent()},
+                "questions": {"resume": ["Explain REST", "Explain caching"], "behavior": []},
+                "progress": {"round": 2, "answers": [], "resume_index": 0, "behavior_index": 0},
+            }
+            pending, report = asyncio.run(run())
+            answers = orchestrator.SESSIONS["deferred-test"]["progress"]["answers"]
+        finally:
+            Config.MOCK_MODE = saved_mode
+            orchestrator.SESSIONS.pop("deferred-test", None)
+
+    print(f"✅ Scores: {[a['evaluation']['score'] for a in answers]}, calls: {client.calls}")
+    # Claimed by this process when the batch ran
+    assert pending["status"] == "pending" and pending["claimed_by"] == orchestrator.WORKER_ID
+    assert [a["evaluation"]["score"] for a in answers] == [1, 2]
+    assert report["report"]["strengths"] == ["Clear"]
+    # One batch call plus the report
+    assert client.calls == 2
+    print("=" * 60)
+
+
+def test_report_uses_evaluations_stored_by_flush():
+    print("\n🧪 TEST: The report reads evaluations back from a store that returns copies")
+    print("=" * 60)
+    set_response_cache(None)
+    saved_mode, saved_sessions = Config.MOCK_MODE, orchestrator.SESSIONS
+
+    async def run():
+        await orchestrator.submit_answer("copy-test", "Explain REST", "Stateless resources")
+        await orchestrator.submit_answer("copy-test", "Explain caching", "Keep hot data close")
+        return await orchestrator.generate_report("copy-test")
+
+    with tempfile.TemporaryDirectory() as tmp, fake_client([batch_response(1, 2), REPORT]):
+        Config.MOCK_MODE = False
+        # No hot cache: every read is a fresh copy from the database
+        orchestrator.SESSIONS = SQLiteSessionStore(
+            str(Path(tmp) / "sessions.sqlite3"), restore=orchestrator._restore_session
+        )
+        try:
+            orchestrator.SESSIONS["copy-test"] = {
+                "mode": "experience",
+                "collaboration_mode": "sequential",
+                "evaluation_mode": "deferred",
+                "questions": {"resume": ["Explain REST", "Explain caching"], "behavior": []},
+                "progress": {"round": 2, "answers": [], "resume_index": 0, "behavior_index": 0},
+            }
+            report = asyncio.run(run())
+        finally:
+            orchestrator.SESSIONS.close()
+            Config.MOCK_MODE, orchestrator.SESSIONS = saved_mode, saved_sessions
+
+    scores = [a["evaluation"].get("score") for a in report["answers"]]
+    print(f"✅ Report scores: {scores}")
+    assert scores == [1, 2]
+    print("=" * 60)
+
+
+def test_answers_claimed_by_another_worker_not_reevaluated():
+    print("\n🧪 TEST: The report waits for answers another worker claimed instead of re-evaluating them")
+    print("=" * 60)
+    set_response_cache(None)
+    saved = Config.MOCK_MODE, Config.EVALUATION_CLAIM_POLL_SECONDS
+    now = time.time()
+
+    def answer(question, claimed_by, claimed_at):
+        return {"question": question, "answer": "...", "evaluation": {
+            "status": "pending", "claimed_by": claimed_by, "claimed_at": claimed_at
+        }}
+
+    async def run():
+        async def other_worker_finishes():
+            await asyncio.sleep(0.2)
+            orchestrator._store_evaluations("claim-test", {0: {"score": 9, "feedback": "Other", "recommendations": []}})
+
+        finishing = asyncio.create_task(other_worker_finishes())
+        report = await orchestrator.generate_report("claim-test")
+        await finishing
+        return report
+
+    with fake_client([batch_response(1), REPORT]) as client:
+        Config.MOCK_MODE, Config.EVALUATION_CLAIM_POLL_SECONDS = False, 0.05
+        try:
+            orchestrator.SESSIONS["claim-test"] = {
+                "mode": "experience",
+                "evaluation_mode": "deferred",
+                "agents": {"evaluator": EvaluatorAgent()},
+                "progress": {"round": 4, "answers": [
+                    answer("Claimed by a live worker", "other-worker", now),
+                    # Its worker stopped long ago: evaluated here
+                    answer("Claim lapsed", "dead-worker", now - Config.EVALUATION_CLAIM_SECONDS - 1),
+                ]},
+            }
+            report = asyncio.run(run())
+        finally:
+            Config.MOCK_MODE, Config.EVALUATION_CLAIM_POLL_SECONDS = saved
+            orchestrator.SESSIONS.pop("claim-test", None)
+
+    scores = [a["evaluation"].get("score") for a in report["answers"]]
+    print(f"✅ Report scores: {scores}, calls: {client.calls}")
+    assert scores == [9, 1]
+    # One batch call (the lapsed claim only) plus the report
+    assert client.calls == 2
+    print("=" * 60)
+
+
+def test_restored_sessions_build_evaluator_on_use():
+    print("\n🧪 TEST: Reads from the database don't build an evaluator until one is used")
+    print("=" * 60)
+    built = []
+    saved_mode, saved_agent = Config.MOCK_MODE, orchestrator.EvaluatorAgent
+
+    with tempfile.TemporaryDirectory() as tmp:
+        Config.MOCK_MODE = False
+        orchestrator.EvaluatorAgent = lambda mode: built.append(mode) or object()
+        store = SQLiteSessionStore(str(Path(tmp) / "sessions.sqlite3"), restore=orchestrator._restore_session)
+        try:
+            store["s"] = {"mode": "teach", "progress": {"round": 1, "answers": []}}
+            for _ in range(5):
+                store["s"]["progress"]["round"]
+            assert built == []
+            agents = store["s"]["agents"]
+            assert agents["evaluator"] is agents["evaluator"]
+        finally:
+            store.close()
+            Config.MOCK_MODE, orchestrator.EvaluatorAgent = saved_mode, saved_agent
+    print(f"✅ Evaluators built: {built}")
+    assert built == ["teach"]
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_batch_single_call()
+    test_missing_answers_evaluated_individually()
+    test_deferred_session_flushes_before_report()
+    test_report_uses_evaluations_stored_by_flush()
+    test_answers_claimed_by_another_worker_not_reevaluated()
+    test_restored_sessions_build_evaluator_on_use()
+    print("\n✅ ALL DEFERRED EVALUATION TESTS COMPLETE")
@@ -0,0 +1,158 @@
+"""
+Test hedged requests to the backup provider (no API calls)
+"""
+import os
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+os.environ.setdefault("MOCK_MODE", "true")
+
+import asyncio
+import time
+from app.config import Config, ModelClientFactory
+from app.agents.base_agent import BaseAgent, hedge_stats
+from app.hedging import LatencyTracker, run_hedged
+from app.llm_cache import set_response_cache
+from agent_fakes import RecordingClient, two_providers
+
+
+def test_latency_percentile():
+    print("\n🧪 TEST: Latency percentile needs enough samples")
+    print("=" * 60)
+    tracker = LatencyTracker(window=100)
+    for i in range(1, 101):
+        tracker.record(i / 100)
+    assert tracker.percentile(95) == 0.95
+    assert LatencyTracker().percentile(95, min_samples=5) is None
+    print("=" * 60)
+
+
+def test_run_hedged_cancels_loser():
+    print("\n🧪 TEST: Fast backup wins and the slow primary is cancelled")
+    print("=" * 60)
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(1)
+            return "primary"
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def fast():
+        await asyncio.sleep(0.01)
+        return "backup"
+
+    result, winner, hedged = asyncio.run(run_hedged(slow, fast, delay=0.05))
+    print(f"✅ Result: {result}, winner: {winner}, hedged: {hedged}")
+    assert (result, winner, hedged) == ("backup", "backup", True)
+    assert cancelled == [True]
+
+    result, winner, hedged = asyncio.run(run_hedged(fast, slow, delay=0.5))
+    assert (winner, hedged) == ("primary", False)
+    print("=" * 60)
+
+
+def test_run_hedged_survives_cancelled_backup():
+    print("\n🧪 TEST: A cancelled hedge attempt doesn't break the call")
+    print("=" * 60)
+
+    async def primary():
+        await asyncio.sleep(0.1)
+        return "primary"
+
+    async def cancelled_backup():
+        raise asyncio.CancelledError()
+
+    result, winner, hedged = asyncio.run(run_hedged(primary, cancelled_backup, delay=0.01))
+    print(f"✅ Result: {result}, winner: {winner}, hedged: {hedged}")
+    assert (result, winner, hedged) == ("primary", "primary", True)
+    print("=" * 60)
+
+
+def test_run_hedged_respects_backup_gate():
+    print("\n🧪 TEST: No hedge is sent when the backup is not admitted")
+    print("=" * 60)
+    started = []
+
+    async def primary():
+        await asyncio.sleep(0.1)
+        return "primary"
+
+    async def backup():
+        started.append(True)
+        return "backup"
+
+    result, winner, hedged = asyncio.run(run_hedged(primary, backup, delay=0.01, allow_backup=lambda: False))
+    assert (result, winner, hedged) == ("primary", "primary", False)
+    assert started == []
+    print("=" * 60)
+
+
+def test_ask_hedges_stalled_primary():
+    print("\n🧪 TEST: BaseAgent.ask hedges a stalled primary")
+    print("=" * 60)
+    primary = RecordingClient(["too slow"], delay=2)
+    backup = RecordingClient(["from backup"])
+    set_response_cache(None)
+    hedge_stats.reset()
+
+    saved = (Config.HEDGE_MIN_DELAY, Config.HEDGE_DEFAULT_DELAY)
+    Config.HEDGE_MIN_DELAY = Config.HEDGE_DEFAULT_DELAY = 0.05
+    try:
+        with two_providers(clients={"gemini": primary, "openrouter": backup}):
+            agent = BaseAgent("HedgeAgent", "You are a test agent.", stateless=True)
+            start = time.perf_counter()
+            response = asyncio.run(agent.ask("stall please", hedge=True))
+            elapsed = time.perf_counter() - start
+    finally:
+        Config.HEDGE_MIN_DELAY, Config.HEDGE_DEFAULT_DELAY = saved
+
+    stats = hedge_stats.get_stats()["HedgeAgent"]
+    print(f"✅ Response: {response} in {elapsed:.2f}s, stats: {stats}")
+    assert response == "from backup"
+    assert elapsed < 1
+    assert stats["hedged"] == 1 and stats["backup_wins"] == 1
+    print("=" * 60)
+
+
+def test_ask_skips_hedge_when_backup_circuit_opens():
+    print("\n🧪 TEST: The hedge checks the backup's circuit when it fires")
+    print("=" * 60)
+    primary = RecordingClient(["from primary"], delay=0.3)
+    backup = RecordingClient(["from backup"])
+    set_response_cache(None)
+
+    saved = (Config.HEDGE_MIN_DELAY, Config.HEDGE_DEFAULT_DELAY)
+    Config.HEDGE_MIN_DELAY = Config.HEDGE_DEFAULT_DELAY = 0.1
+    try:
+        with two_providers(cooldown=5, clients={"gemini": primary, "openrouter": backup}):
+            agent = BaseAgent("GatedHedgeAgent", "You are a test agent.", stateless=True)
+
+            async def run():
+                call = asyncio.ensure_future(agent.ask("slow please", hedge=True))
+                # The backup hits its quota while the primary is still running
+                await asyncio.sleep(0.03)
+                ModelClientFactory.get_breaker("openrouter").record_failure("quota", trip=True)
+                return await call
+
+            response = asyncio.run(run())
+    finally:
+        Config.HEDGE_MIN_DELAY, Config.HEDGE_DEFAULT_DELAY = saved
+
+    print(f"✅ Response: {response}, backup calls: {backup.calls}")
+    assert response == "from primary"
+    assert backup.calls == 0
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_latency_percentile()
+    test_run_hedged_cancels_loser()
+    test_run_hedged_survives_cancelled_backup()
+    test_run_hedged_respects_backup_gate()
+    test_ask_hedges_stalled_primary()
+    test_ask_skips_hedge_when_backup_circuit_opens()
+    print("\n✅ ALL HEDGING TESTS COMPLETE")
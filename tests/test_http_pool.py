@@ -0,0 +1,115 @@
+"""
+Test the shared per-provider HTTP pools and startup warm-up (local server only)
+"""
+import os
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+os.environ.setdefault("MOCK_MODE", "true")
+
+import asyncio
+from app.config import Config, ModelClientFactory
+from app.http_pool import HTTPPoolRegistry
+
+
+async def serve_models(requests_seen):
+    """Tiny keep-alive HTTP server that answers every request with {}"""
+
+    async def handle(reader, writer):
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            if not head:
+                break
+            requests_seen.append(head.split(b"\r\n", 1)[0].decode())
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: 2\r\n\r\n{}")
+            await writer.drain()
+
+    async def safe_handle(reader, writer):
+        try:
+            await handle(reader, writer)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(safe_handle, "127.0.0.1", 0)
+
+
+def test_clients_share_one_pool_per_provider():
+    print("\n🧪 TEST: Every client for a provider reuses the same HTTP pool")
+    print("=" * 60)
+    saved = (Config.MOCK_MODE, Config.GEMINI_API_KEY, Config.OPENROUTER_API_KEY)
+    Config.MOCK_MODE, Config.GEMINI_API_KEY, Config.OPENROUTER_API_KEY = False, "test", "test"
+    try:
+        first = ModelClientFactory.create_client("gemini")
+        second = ModelClientFactory.create_client("gemini")
+        backup = ModelClientFactory.create_client("openrouter")
+    finally:
+        Config.MOCK_MODE, Config.GEMINI_API_KEY, Config.OPENROUTER_API_KEY = saved
+
+    assert first is not second
+    assert first._client._client is second._client._client is HTTPPoolRegistry.get("gemini")
+    assert backup._client._client is HTTPPoolRegistry.get("openrouter")
+    assert backup._client._client is not first._client._client
+    print("✅ gemini clients share a pool; openrouter has its own")
+    print("=" * 60)
+
+
+def test_warm_up_opens_connections():
+    print("\n🧪 TEST: Warm-up leaves idle keep-alive connections in the pool")
+    print("=" * 60)
+
+    async def run():
+        requests_seen = []
+        server = await serve_models(requests_seen)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            await HTTPPoolRegistry.close()
+            results = await HTTPPoolRegistry.warm_up(
+                {"local": f"http://127.0.0.1:{port}/v1/"},
+                api_keys={"local": "secret"},
+                connections=2
+            )
+            stats = HTTPPoolRegistry.get_stats()["local"]
+
+            # A later request reuses a warm connection
+            await HTTPPoolRegistry.get("local").get(f"http://127.0.0.1:{port}/v1/models")
+            after = HTTPPoolRegistry.get_stats()["local"]
+            return requests_seen, results, stats, after
+        finally:
+            await HTTPPoolRegistry.close()
+            server.close()
+            await server.wait_closed()
+
+    requests_seen, results, stats, after = asyncio.run(run())
+    print(f"✅ Results: {results}")
+    print(f"✅ Pool after warm-up: {stats}")
+    assert results["local"]["ok"]
+    assert requests_seen[:2] == ["GET /v1/models HTTP/1.1"] * 2
+    assert stats["open"] == 2 and stats["idle"] == 2 and stats["waiting"] == 0
+    assert after["open"] == 2
+    print("=" * 60)
+
+
+def test_warm_up_failure_is_reported():
+    print("\n🧪 TEST: An unreachable provider doesn't break warm-up")
+    print("=" * 60)
+
+    async def run():
+        try:
+            return await HTTPPoolRegistry.warm_up({"down": "http://127.0.0.1:9/v1"}, timeout=1)
+        finally:
+            await HTTPPoolRegistry.close()
+
+    results = asyncio.run(run())
+    print(f"✅ Results: {results}")
+    assert results["down"]["ok"] is False
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_clients_share_one_pool_per_provider()
+    test_warm_up_opens_connections()
+    test_warm_up_failure_is_reported()
+    print("\n✅ ALL HTTP POOL TESTS COMPLETE")
@@ -0,0 +1,190 @@
+"""
+Test the LLM response cache (no API calls)
+"""
+import os
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+os.environ.setdefault("MOCK_MODE", "true")
+
+import asyncio
+import tempfile
+import time
+from app.agents.base_agent import BaseAgent
+from app.agents.coding_agent import CodingAgent
+from app.config import Config, ModelClientFactory
+from app.llm_cache import MemoryLRUTier, SQLiteTier, ResponseCache, set_response_cache
+from agent_fakes import RecordingClient, fake_client, two_providers
+
+
+def test_memory_tier_lru_and_ttl():
+    print("\n🧪 TEST: Memory tier LRU eviction and TTL")
+    print("=" * 60)
+    tier = MemoryLRUTier(max_entries=2)
+    future = time.time() + 60
+    tier.set("a", "1", future)
+    tier.set("b", "2", future)
+    tier.get("a")  # 'a' becomes most recently used
+    tier.set("c", "3", future)
+    assert tier.get("b") is None
+    assert tier.get("a") == "1"
+    tier.set("d", "4", time.time() - 1)
+    assert tier.get("d") is None
+    print(f"✅ Evictions: {tier.evictions}")
+    print("=" * 60)
+
+
+def test_sqlite_tier_survives_restart():
+    print("\n🧪 TEST: SQLite tier persists and promotes on hit")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "cache.sqlite3")
+
+        async def run():
+            first = ResponseCache([MemoryLRUTier(), SQLiteTier(path)])
+            await first.set("k", "cached answer")
+
+            # A new process only has the disk copy
+            memory = MemoryLRUTier()
+            second = ResponseCache([memory, SQLiteTier(path, max_entries=1)])
+            assert await second.get("k") == "cached answer"
+            assert memory.get("k") == "cached answer"
+            assert await second.get("missing") is None
+            return second.get_stats()
+
+        stats = asyncio.run(run())
+    print(f"✅ Stats: {stats}")
+    assert stats["tier_hits"]["sqlite"] == 1
+    assert stats["misses"] == 1
+    print("=" * 60)
+
+
+def test_promotion_keeps_expiry():
+    print("\n🧪 TEST: A promoted entry keeps its expiry instead of a fresh TTL")
+    print("=" * 60)
+    disk = SQLiteTier(":memory:")
+    disk.set("k", "cached answer", time.time() + 0.1)
+    memory = MemoryLRUTier()
+    cache = ResponseCache([memory, disk], ttl_seconds=3600)
+
+    async def run():
+        first = await cache.get("k")
+        await asyncio.sleep(0.15)
+        return first, await cache.get("k")
+
+    first, later = asyncio.run(run())
+    print(f"✅ Before expiry: {first!r}, after: {later!r}")
+    assert first == "cached answer"
+    assert later is None
+    print("=" * 60)
+
+
+def test_ask_uses_cache_and_bypass():
+    print("\n🧪 TEST: BaseAgent.ask cache hits and bypass flag")
+    print("=" * 60)
+    cache = ResponseCache([MemoryLRUTier()])
+    set_response_cache(cache)
+
+    async def run(agent):
+        one = await agent.ask("same prompt")
+        two = await agent.ask("same prompt")
+        fresh = await agent.ask("same prompt", use_cache=False)
+        return one, two, fresh
+
+    try:
+        with fake_client(["first", "second"]):
+            agent = BaseAgent("CacheAgent", "You are a test agent.", stateless=True)
+            one, two, fresh = asyncio.run(run(agent))
+    finally:
+        set_response_cache(None)
+
+    print(f"✅ Responses: {one}, {two}, {fresh}")
+    assert (one, two, fresh) == ("first", "first", "second")
+    assert cache.hits == 1
+    print("=" * 60)
+
+
+def test_lookup_keyed_on_routed_provider():
+    print("\n🧪 TEST: Cache lookups use the provider the call is routed to")
+    print("=" * 60)
+    cache = ResponseCache([MemoryLRUTier()])
+    set_response_cache(cache)
+    backup_client = RecordingClient(["from backup", "again from backup"])
+
+    async def run(agent):
+        return await agent.ask("same prompt", hedge=False), await agent.ask("same prompt", hedge=False)
+
+    try:
+        with two_providers(cooldown=60, clients={Config.BACKUP_PROVIDER: backup_client}):
+            # The primary's circuit is open, but it is still the active provider
+            ModelClientFactory.get_breaker(Config.PRIMARY_PROVIDER).record_failure("429", trip=True)
+            assert Config.CURRENT_PROVIDER == Config.PRIMARY_PROVIDER
+            agent = BaseAgent("CacheAgent", "You are a test agent.", stateless=True)
+            first, second = asyncio.run(run(agent))
+    finally:
+        set_response_cache(None)
+
+    print(f"✅ Responses: {first}, {second}, backup calls: {backup_client.calls}")
+    assert first == second == "from backup"
+    assert backup_client.calls == 1
+    print("=" * 60)
+
+
+def test_fresh_calls_are_not_coalesced():
+    print("\n🧪 TEST: use_cache=False calls are neither cached nor shared")
+    print("=" * 60)
+    set_response_cache(ResponseCache([MemoryLRUTier()]))
+
+    async def run(agent):
+        return await asyncio.gather(*(agent.ask("questions", use_cache=False) for _ in range(2)))
+
+    try:
+        with fake_client(["one", "two"], delay=0.05) as client:
+            agent = BaseAgent("FreshAgent", "You are a test agent.", stateless=True)
+            answers = asyncio.run(run(agent))
+    finally:
+        set_response_cache(None)
+
+    print(f"✅ Answers: {answers}")
+    assert sorted(answers) == ["one", "two"]
+    assert client.calls == 2
+    print("=" * 60)
+
+
+def test_followups_cached_by_problem_and_answer():
+    print("\n🧪 TEST: Follow-ups are cached under the problem (and answer)")
+    print("=" * 60)
+    set_response_cache(ResponseCache([MemoryLRUTier()]))
+
+    async def run(agent):
+        return (
+            await agent.generate_followups("Two sum"),
+            await agent.generate_followups("Two sum"),
+            await agent.followups_for_answer("Two sum", "hash map"),
+            await agent.followups_for_answer("Two sum", "hash map"),
+            await agent.followups_for_answer("Two sum", "sorting"),
+        )
+
+    try:
+        with fake_client(["f1", "f2", "f3"]) as client:
+            agent = CodingAgent()
+            answers = asyncio.run(run(agent))
+    finally:
+        set_response_cache(None)
+
+    print(f"✅ Follow-ups: {answers}, calls: {client.calls}")
+    assert answers == ("f1", "f1", "f2", "f2", "f3")
+    assert client.calls == 3
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_memory_tier_lru_and_ttl()
+    test_sqlite_tier_survives_restart()
+    test_promotion_keeps_expiry()
+    test_ask_uses_cache_and_bypass()
+    test_lookup_keyed_on_routed_provider()
+    test_fresh_calls_are_not_coalesced()
+    test_followups_cached_by_problem_and_answer()
+    print("\n✅ ALL LLM CACHE TESTS COMPLETE")
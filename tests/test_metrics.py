@@ -0,0 +1,100 @@
+"""
+Test per-agent metrics and the Prometheus /metrics endpoint (no API calls)
+"""
+import os
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+os.environ.setdefault("MOCK_MODE", "true")
+
+import asyncio
+from fastapi.testclient import TestClient
+from app.config import Config
+from app.metrics import (
+    Histogram, registry, estimate_cost,
+    agent_request_seconds, agent_requests_total, agent_prompt_tokens, agent_cost_usd
+)
+from app.agents.base_agent import BaseAgent
+from app.llm_cache import ResponseCache, MemoryLRUTier, set_response_cache
+from app.main import app
+from agent_fakes import fake_client
+
+
+def test_histogram_text_format():
+    print("\n🧪 TEST: Histograms render cumulative buckets, sum and count")
+    print("=" * 60)
+    histogram = Histogram("demo_seconds", "Demo", ("agent",), buckets=(1, 5))
+    histogram.observe(0.5, agent="A")
+    histogram.observe(3, agent="A")
+    histogram.observe(10, agent="A")
+    lines = histogram.render()
+    for line in lines:
+        print(f"  {line}")
+    assert lines == [
+        'demo_seconds_bucket{agent="A",le="1"} 1',
+        'demo_seconds_bucket{agent="A",le="5"} 2',
+        'demo_seconds_bucket{agent="A",le="+Inf"} 3',
+        'demo_seconds_sum{agent="A"} 13.5',
+        'demo_seconds_count{agent="A"} 3',
+    ]
+    print("=" * 60)
+
+
+def test_ask_records_latency_tokens_and_cache():
+    print("\n🧪 TEST: ask records latency, usage, cost and cache outcome")
+    print("=" * 60)
+    registry.reset()
+    set_response_cache(ResponseCache([MemoryLRUTier()]))
+    provider = Config.CURRENT_PROVIDER
+    try:
+        with fake_client(["A problem about intervals"]):
+            agent = BaseAgent(name="MetricsAgent", system_message="You measure.")
+            asyncio.run(agent.ask("make a problem", method="generate_problem"))
+            asyncio.run(agent.ask("make a problem", method="generate_problem"))
+    finally:
+        set_response_cache(None)
+
+    labels = {"agent": "MetricsAgent", "method": "generate_problem", "provider": provider}
+    assert agent_request_seconds.count(cache="miss", **labels) == 1
+    assert agent_request_seconds.count(cache="hit", **labels) == 1
+    assert agent_requests_total.value(cache="miss", outcome="success", **labels) == 1
+    # Usage comes from the one real call only
+    assert agent_prompt_tokens.count(**labels) == 1
+    assert agent_prompt_tokens.sum(**labels) > 0
+    assert agent_cost_usd.count(**labels) == 1
+    print(f"✅ Prompt tokens: {agent_prompt_tokens.sum(**labels)}, cost: {agent_cost_usd.sum(**labels)}")
+    print("=" * 60)
+
+
+def test_cost_estimate():
+    print("\n🧪 TEST: Cost uses the configured per-million prices")
+    print("=" * 60)
+    saved = Config.MODEL_PRICES
+    Config.MODEL_PRICES = {"gemini": {"prompt_per_million": 1.0, "completion_per_million": 4.0}}
+    try:
+        assert estimate_cost("gemini", 1_000_000, 500_000) == 3.0
+        assert estimate_cost("unknown", 1000, 1000) == 0.0
+    finally:
+        Config.MODEL_PRICES = saved
+    print("=" * 60)
+
+
+def test_metrics_endpoint():
+    print("\n🧪 TEST: /metrics serves Prometheus text")
+    print("=" * 60)
+    response = TestClient(app).get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE questai_agent_request_duration_seconds histogram" in response.text
+    assert "# TYPE questai_agent_requests_total counter" in response.text
+    print(f"✅ {len(response.text.splitlines())} lines")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_histogram_text_format()
+    test_ask_records_latency_tokens_and_cache()
+    test_cost_estimate()
+    test_metrics_endpoint()
+    print("\n✅ ALL METRICS TESTS COMPLETE")
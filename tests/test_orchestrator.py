@@ -0,0 +1,194 @@
+"""
+Test interview orchestration with fake agents (no API calls)
+"""
+import os
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+os.environ.setdefault("MOCK_MODE", "true")
+
+import asyncio
+import time
+from contextlib import contextmanager
+from app.config import Config
+from app.agents import orchestrator
+from app.metrics import speculative_tasks_total
+
+
+class FakeCodingAgent:
+    def __init__(self, delay=0.2):
+        self.delay = delay
+
+    async def generate_problem(self, resume_text="", jd_text="", difficulty="medium", previous_problem=""):
+        await asyncio.sleep(self.delay)
+        return f"A {difficulty} problem"
+
+    async def generate_followups(self, problem_statement):
+        await asyncio.sleep(self.delay)
+        return "1. Brute force?\n2. Optimal?"
+
+
+class FakeQuestionAgent:
+    def __init__(self, delay=0.2, fail=False):
+        self.delay = delay
+        self.fail = fail
+
+    async def generate_questions(self, *args, **kwargs):
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("provider down")
+        return ["Question one?", "Question two?"]
+
+
+class FakeEvaluator:
+    def __init__(self, mode="experience"):
+        self.mode = mode
+
+    async def evaluate(self, question, answer, round_type="coding"):
+        return {"score": 8, "feedback": "ok", "recommendations": []}
+
+
+@contextmanager
+def fake_agents(coding=None, resume=None, behavior=None):
+    """Swap the orchestrator's agent singletons for fakes (real-agent mode)"""
+    saved = (
+        Config.MOCK_MODE,
+        orchestrator.coding_agent,
+        orchestrator.resume_agent,
+        orchestrator.behavior_agent,
+        orchestrator.EvaluatorAgent,
+    )
+    Config.MOCK_MODE = False
+    orchestrator.coding_agent = coding or FakeCodingAgent()
+    orchestrator.resume_agent = resume or FakeQuestionAgent()
+    orchestrator.behavior_agent = behavior or FakeQuestionAgent()
+    orchestrator.EvaluatorAgent = FakeEvaluator
+    try:
+        yield
+    finally:
+        (
+            Config.MOCK_MODE,
+            orchestrator.coding_agent,
+            orchestrator.resume_agent,
+            orchestrator.behavior_agent,
+            orchestrator.EvaluatorAgent,
+        ) = saved
+
+
+def test_create_session_runs_branches_concurrently():
+    print("\n🧪 TEST: Concurrent question generation")
+    print("=" * 60)
+    with fake_agents():
+        start = time.perf_counter()
+        result = asyncio.run(orchestrator.create_session("resume", "jd", mode="teach"))
+        elapsed = time.perf_counter() - start
+
+    # problem + followups (0.4s) run alongside resume/behavior (0.2s each)
+    print(f"✅ Session created in {elapsed:.2f}s")
+    assert elapsed < 0.7
+    assert result["first_question"] == "A medium problem"
+    print("=" * 60)
+
+
+def test_create_session_survives_failed_branch():
+    print("\n🧪 TEST: Partial failure falls back to canned questions")
+    print("=" * 60)
+    with fake_agents(resume=FakeQuestionAgent(fail=True)):
+        result = asyncio.run(orchestrator.create_session("resume", "jd", mode="teach"))
+
+    sess = orchestrator.SESSIONS[result["session_id"]]
+    print(f"✅ Degraded branches: {sess['degraded']}")
+    assert sess["degraded"] == ["resume"]
+    assert sess["questions"]["resume"] == orchestrator.MOCK_RESUME_QUESTIONS
+    print("=" * 60)
+
+
+def test_coding_branch_shares_one_timeout():
+    print("\n🧪 TEST: Problem and follow-ups share one branch timeout")
+    print("=" * 60)
+    saved_timeout = Config.SESSION_BRANCH_TIMEOUT
+    Config.SESSION_BRANCH_TIMEOUT = 0.5
+    try:
+        with fake_agents(coding=FakeCodingAgent(delay=0.3)):
+            start = time.perf_counter()
+            result = asyncio.run(orchestrator.create_session("resume", "jd", mode="teach"))
+            elapsed = time.perf_counter() - start
+    finally:
+        Config.SESSION_BRANCH_TIMEOUT = saved_timeout
+
+    sess = orchestrator.SESSIONS[result["session_id"]]
+    print(f"✅ Session created in {elapsed:.2f}s, degraded: {sess['degraded']}")
+    # Each step fits the timeout on its own, but not both together
+    assert result["first_question"] == "A medium problem"
+    assert sess["degraded"] == ["followups"]
+    orchestrator.SESSIONS.pop(result["session_id"], None)
+    print("=" * 60)
+
+
+def test_second_problem_prefetched():
+    print("\n🧪 TEST: Both second problems are prefetched and the unused one is dropped")
+    print("=" * 60)
+    used_before = speculative_tasks_total.value(task="q2_hard", outcome="used")
+    dropped_before = (
+        speculative_tasks_total.value(task="q2_easy", outcome="cancelled")
+        + speculative_tasks_total.value(task="q2_easy", outcome="discarded")
+    )
+
+    async def run():
+        session = await orchestrator.create_session("resume", "jd", mode="teach", evaluation_mode="immediate")
+        prefetches = dict(orchestrator.CODING_PREFETCHES[session["session_id"]])
+        # FakeEvaluator scores 8, so the hard problem is picked
+        result = await orchestrator.submit_answer(session["session_id"], session["first_question"], "answer")
+        return session["session_id"], prefetches, result
+
+    with fake_agents():
+        session_id, prefetches, result = asyncio.run(run())
+
+    print(f"✅ Next question: {result['next_question']}")
+    assert result["next_question"] == "A hard problem"
+    assert prefetches["q2_easy"].cancelled() or prefetches["q2_easy"].done()
+    assert session_id not in orchestrator.CODING_PREFETCHES
+    assert speculative_tasks_total.value(task="q2_hard", outcome="used") == used_before + 1
+    dropped = (
+        speculative_tasks_total.value(task="q2_easy", outcome="cancelled")
+        + speculative_tasks_total.value(task="q2_easy", outcome="discarded")
+    )
+    assert dropped == dropped_before + 1
+    orchestrator.SESSIONS.pop(session_id, None)
+    print("=" * 60)
+
+
+def test_slow_prefetch_falls_back():
+    print("\n🧪 TEST: An answer doesn't wait long for an unfinished prefetch")
+    print("=" * 60)
+    saved_wait = Config.CODING_PREFETCH_WAIT_SECONDS
+    Config.CODING_PREFETCH_WAIT_SECONDS = 0.05
+
+    async def run():
+        session = await orchestrator.create_session("resume", "jd", mode="teach", evaluation_mode="immediate")
+        start = time.perf_counter()
+        result = await orchestrator.submit_answer(session["session_id"], session["first_question"], "answer")
+        return session["session_id"], result, time.perf_counter() - start
+
+    try:
+        with fake_agents(coding=FakeCodingAgent(delay=0.5)):
+            session_id, result, elapsed = asyncio.run(run())
+    finally:
+        Config.CODING_PREFETCH_WAIT_SECONDS = saved_wait
+
+    print(f"✅ Answered in {elapsed:.2f}s with: {result['next_question'][:60]}")
+    assert elapsed < 0.3
+    assert result["next_question"] == orchestrator.FALLBACK_SECOND_PROBLEMS["q2_hard"]
+    assert session_id not in orchestrator.CODING_PREFETCHES
+    orchestrator.SESSIONS.pop(session_id, None)
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_create_session_runs_branches_concurrently()
+    test_create_session_survives_failed_branch()
+    test_coding_branch_shares_one_timeout()
+    test_second_problem_prefetched()
+    test_slow_prefetch_falls_back()
+    print("\n✅ ALL ORCHESTRATOR TESTS COMPLETE")
@@ -0,0 +1,121 @@
+"""
+Test token-aware prompt budgeting (no API calls)
+"""
+import os
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+os.environ.setdefault("MOCK_MODE", "true")
+
+import time
+from app import prompt_budget
+from app.config import Config
+from app.prompt_budget import PromptBudget, TokenCounter, TRUNCATION_MARKER
+from app.agents.orchestrator import _build_report_prompt
+
+
+def words(n: int, word: str = "experience") -> str:
+    return " ".join(f"{word}{i}" for i in range(n))
+
+
+def test_truncate_respects_token_limit():
+    print("\n🧪 TEST: Truncation stays within the token limit at a word boundary")
+    print("=" * 60)
+    counter = TokenCounter()
+    text = words(500)
+    trimmed = counter.truncate(text, 50)
+    print(f"✅ {counter.count(text)} → {counter.count(trimmed)} tokens")
+    assert counter.count(trimmed) <= 50
+    assert trimmed.endswith(TRUNCATION_MARKER)
+    assert trimmed[:-len(TRUNCATION_MARKER)].split()[-1] in text.split()
+    assert counter.truncate("short text", 50) == "short text"
+    print("=" * 60)
+
+
+def test_short_sections_donate_budget():
+    print("\n🧪 TEST: Unused budget from short sections goes to long ones")
+    print("=" * 60)
+    budget = PromptBudget(300)
+    fitted = budget.fit({"resume": words(1000), "jd": "Python developer"})
+    counts = {name: budget.counter.count(text) for name, text in fitted.items()}
+    print(f"✅ Section tokens: {counts}")
+    assert fitted["jd"] == "Python developer"
+    assert counts["resume"] > 250
+    assert sum(counts.values()) <= 300
+    print("=" * 60)
+
+
+def test_weights_split_oversized_sections():
+    print("\n🧪 TEST: Oversized sections split the budget by weight")
+    print("=" * 60)
+    budget = PromptBudget(300)
+    allocation = budget.allocate({"q": words(500), "a": words(500)}, {"a": 2.0})
+    print(f"✅ Allocation: {allocation}")
+    assert allocation == {"q": 100, "a": 200}
+    print("=" * 60)
+
+
+def test_report_prompt_is_bounded():
+    print("\n🧪 TEST: The report prompt fits the budget and keeps every evaluation")
+    print("=" * 60)
+    answers = [
+        {
+            "question": f"Question {i}: " + words(200, "design"),
+            "answer": words(2000, "answer"),
+            "evaluation": {"score": i, "feedback": "Clear structure", "recommendations": ["x"] * 50}
+        }
+        for i in range(8)
+    ]
+    prompt = _build_report_prompt(answers)
+    tokens = TokenCounter().count(prompt)
+    print(f"✅ Report prompt: {tokens} tokens (budget {Config.PROMPT_BUDGETS['report']})")
+    assert tokens <= Config.PROMPT_BUDGETS["report"]
+    for i in range(8):
+        assert f"Eval: {i}/10 - Clear structure" in prompt
+    assert "recommendations" not in prompt.split("\n\n", 1)[1]
+    print("=" * 60)
+
+
+def test_encoding_loads_off_the_request_path():
+    print("\n🧪 TEST: A slow tokenizer download doesn't block counting")
+    print("=" * 60)
+
+    class SlowTiktoken:
+        @staticmethod
+        def encoding_for_model(model):
+            raise KeyError(model)
+
+        @staticmethod
+        def get_encoding(name):
+            time.sleep(0.3)
+
+            class Encoding:
+                encode = staticmethod(str.split)
+            return Encoding()
+
+    original = prompt_budget.tiktoken
+    prompt_budget.tiktoken = SlowTiktoken
+    try:
+        start = time.perf_counter()
+        counter = TokenCounter("slow-model")
+        elapsed = time.perf_counter() - start
+        assert counter.encoding is None and counter.count("two words") > 0
+        print(f"✅ Counter ready in {elapsed * 1000:.1f} ms (heuristic while loading)")
+        assert elapsed < 0.1
+        time.sleep(0.5)
+        assert TokenCounter("slow-model").count("two words") == 2
+    finally:
+        prompt_budget.tiktoken = original
+        TokenCounter._encodings.pop("slow-model", None)
+        TokenCounter._loading.discard("slow-model")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_truncate_respects_token_limit()
+    test_short_sections_donate_budget()
+    test_weights_split_oversized_sections()
+    test_report_prompt_is_bounded()
+    test_encoding_loads_off_the_request_path()
+    print("\n✅ ALL PROMPT BUDGET TESTS COMPLETE")
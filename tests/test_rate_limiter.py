@@ -0,0 +1,82 @@
+"""
+Test the proactive per-provider rate limiter (no API calls)
+"""
+import os
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+os.environ.setdefault("MOCK_MODE", "true")
+
+import asyncio
+import time
+from app.rate_limiter import TokenBucket, ProviderLimiter
+
+
+def test_token_bucket_reports_wait():
+    print("\n🧪 TEST: Token bucket burst and refill wait")
+    print("=" * 60)
+    bucket = TokenBucket(rate_per_minute=60, capacity=2)
+    assert bucket.try_take(1) == 0
+    assert bucket.try_take(1) == 0
+    wait = bucket.try_take(1)
+    print(f"✅ Wait for third token: {wait:.2f}s")
+    assert 0.9 < wait <= 1.0
+    assert TokenBucket(0).try_take(10 ** 6) == 0
+    print("=" * 60)
+
+
+def test_concurrency_cap_queues_calls():
+    print("\n🧪 TEST: Concurrency cap queues instead of failing")
+    print("=" * 60)
+    limiter = ProviderLimiter("test", max_concurrency=2)
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        async with limiter.acquire(100):
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.05)
+
+    async def run():
+        await asyncio.gather(*(call() for _ in range(6)))
+
+    start = time.perf_counter()
+    asyncio.run(run())
+    elapsed = time.perf_counter() - start
+    stats = limiter.get_stats()
+    print(f"✅ Peak in-flight: {peak}, elapsed {elapsed:.2f}s, stats: {stats}")
+    assert peak == 2
+    assert elapsed >= 0.15
+    assert stats["acquired"] == 6
+    assert stats["queue_depth"] == 0 and stats["in_flight"] == 0
+    print("=" * 60)
+
+
+def test_request_rate_spreads_calls():
+    print("\n🧪 TEST: Requests-per-minute budget delays the overflow")
+    print("=" * 60)
+    # Burst of 2, then one request every 0.1s
+    limiter = ProviderLimiter("test", requests_per_minute=600)
+    limiter.requests.capacity = limiter.requests.tokens = 2
+
+    async def run():
+        async def call():
+            async with limiter.acquire():
+                pass
+        await asyncio.gather(*(call() for _ in range(4)))
+
+    start = time.perf_counter()
+    asyncio.run(run())
+    elapsed = time.perf_counter() - start
+    print(f"✅ Four calls took {elapsed:.2f}s, max wait {limiter.max_wait:.2f}s")
+    assert elapsed >= 0.18
+    assert limiter.delayed == 2
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_token_bucket_reports_wait()
+    test_concurrency_cap_queues_calls()
+    test_request_rate_spreads_calls()
+    print("\n✅ ALL RATE LIMITER TESTS COMPLETE")
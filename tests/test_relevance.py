@@ -0,0 +1,91 @@
+"""
+Test BM25 passage selection for resume/JD prompt sections (no API calls)
+"""
+import os
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+os.environ.setdefault("MOCK_MODE", "true")
+
+from app.config import Config
+from app.prompt_budget import PromptBudget, TokenCounter
+from app.relevance import BM25Index, select_relevant, split_passages, tokenize
+
+RESUME = """Jane Doe
+jane.doe@example.com | +1 555 0100 | linkedin.com/in/janedoe | github.com/janedoe
+123 Main Street, Springfield
+Hobbies: hiking, photography, chess, travel, cooking, reading science fiction
+Volunteer at the local animal shelter on weekends and organiser of a book club
+- Built Kafka streaming pipelines in Python processing 2M events per day
+- Led migration of PostgreSQL services to Kubernetes on AWS
+- Mentored three junior engineers
+"""
+
+JD = "Senior Python engineer to own Kafka streaming pipelines and Kubernetes deployments on AWS."
+
+
+def test_tokenize_keeps_tech_terms():
+    print("\n🧪 TEST: Tokenizer keeps terms like c++ and node.js")
+    print("=" * 60)
+    terms = tokenize("Experience with C++, C# and Node.js for the team.")
+    print(f"✅ Terms: {terms}")
+    assert terms == ["experience", "c++", "c#", "node.js"]
+    print("=" * 60)
+
+
+def test_bm25_ranks_relevant_passages_first():
+    print("\n🧪 TEST: BM25 ranks passages matching the JD first")
+    print("=" * 60)
+    passages = split_passages(RESUME)
+    ranking = BM25Index(passages).rank(JD)
+    top = [passages[i] for i in ranking[:2]]
+    for passage in top:
+        print(f"  {passage}")
+    assert any("Kafka" in p for p in top)
+    assert any("Kubernetes" in p for p in top)
+    print("=" * 60)
+
+
+def test_selection_skips_contact_header():
+    print("\n🧪 TEST: A small budget keeps experience instead of contact details")
+    print("=" * 60)
+    counter = TokenCounter()
+    selected = select_relevant(RESUME, JD, 40, counter)
+    print(f"✅ Selected:\n{selected}")
+    assert "Kafka streaming pipelines" in selected
+    assert "555 0100" not in selected
+    assert counter.count(selected) <= 40
+    # Document order is kept
+    assert selected.index("Kafka") < selected.index("Kubernetes")
+
+    # Plain truncation would have kept the header instead
+    assert "Kafka" not in counter.truncate(RESUME, 40)
+    print("=" * 60)
+
+
+def test_budget_uses_queries_only_when_enabled():
+    print("\n🧪 TEST: PromptBudget.fit selects by relevance when queries are given")
+    print("=" * 60)
+    budget = PromptBudget(80)
+    fitted = budget.fit({"resume": RESUME, "jd": JD}, queries={"resume": JD, "jd": RESUME})
+    print(f"✅ Resume section:\n{fitted['resume']}")
+    assert fitted["jd"] == JD
+    assert "Kafka" in fitted["resume"]
+
+    saved = Config.PROMPT_RELEVANCE_SELECTION
+    Config.PROMPT_RELEVANCE_SELECTION = False
+    try:
+        plain = budget.fit({"resume": RESUME, "jd": JD}, queries={"resume": JD})
+    finally:
+        Config.PROMPT_RELEVANCE_SELECTION = saved
+    assert plain["resume"].startswith("Jane Doe")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_tokenize_keeps_tech_terms()
+    test_bm25_ranks_relevant_passages_first()
+    test_selection_skips_contact_header()
+    test_budget_uses_queries_only_when_enabled()
+    print("\n✅ ALL RELEVANCE TESTS COMPLETE")
@@ -0,0 +1,205 @@
+"""
+Test error classification and the retry policy in BaseAgent (no API calls)
+"""
+import os
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+os.environ.setdefault("MOCK_MODE", "true")
+
+import asyncio
+import time
+import openai
+from app.config import Config
+from app.retry_policy import (
+    RetryPolicy, classify_error, retry_after_seconds,
+    RATE_LIMIT, TIMEOUT, CONNECTION, SERVER, AUTH, BAD_REQUEST, UNKNOWN
+)
+from app.agents.base_agent import BaseAgent, AgentCallError
+from app.llm_cache import set_response_cache
+from agent_fakes import RecordingClient, fake_client, two_providers
+
+
+class FakeResponse:
+    """Just enough of an HTTP response for openai.APIStatusError"""
+
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.request = None
+
+
+def status_error(cls, status_code, headers=None):
+    return cls(f"Error code: {status_code}", response=FakeResponse(status_code, headers), body=None)
+
+
+class FlakyClient(RecordingClient):
+    """Raises the queued errors first, then replays responses"""
+
+    def __init__(self, responses, errors):
+        super().__init__(responses)
+        self.errors = list(errors)
+
+    async def create(self, messages, **kwargs):
+        if self.errors:
+            self.calls += 1
+            raise self.errors.pop(0)
+        return await super().create(messages, **kwargs)
+
+
+class retry_settings:
+    """Temporarily override the RETRY_* settings"""
+
+    def __init__(self, **overrides):
+        self.overrides = overrides
+        self.saved = {}
+
+    def __enter__(self):
+        for name, value in self.overrides.items():
+            self.saved[name] = getattr(Config, name)
+            setattr(Config, name, value)
+
+    def __exit__(self, *exc):
+        for name, value in self.saved.items():
+            setattr(Config, name, value)
+
+
+def test_classification():
+    print("\n🧪 TEST: Typed errors and status codes are classified")
+    print("=" * 60)
+    cases = [
+        (status_error(openai.RateLimitError, 429), RATE_LIMIT),
+        (status_error(openai.InternalServerError, 503), SERVER),
+        (status_error(openai.AuthenticationError, 401), AUTH),
+        (status_error(openai.BadRequestError, 400), BAD_REQUEST),
+        (openai.APITimeoutError(request=None), TIMEOUT),
+        (openai.APIConnectionError(request=None), CONNECTION),
+        (asyncio.TimeoutError(), TIMEOUT),
+        (ConnectionResetError("reset by peer"), CONNECTION),
+        (RuntimeError("Error code: 429 - quota exceeded"), RATE_LIMIT),
+        (RuntimeError("502 Bad Gateway"), SERVER),
+        (ValueError("could not parse"), UNKNOWN),
+    ]
+    for error, expected in cases:
+        kind = classify_error(error)
+        print(f"  {type(error).__name__}: {kind}")
+        assert kind == expected, (error, kind)
+
+    # Wrapped errors are classified by their cause
+    try:
+        try:
+            raise openai.APITimeoutError(request=None)
+        except Exception as inner:
+            raise RuntimeError("model call failed") from inner
+    except RuntimeError as wrapped:
+        assert classify_error(wrapped) == TIMEOUT
+
+    limited = status_error(openai.RateLimitError, 429, {"retry-after": "2"})
+    assert retry_after_seconds(limited) == 2.0
+    print("=" * 60)
+
+
+def test_backoff_bounds():
+    print("\n🧪 TEST: Backoff grows exponentially with bounded jitter")
+    print("=" * 60)
+    policy = RetryPolicy(base_delay=1.0, max_delay=4.0, jitter=0.5)
+    for attempt, ceiling in [(1, 1.0), (2, 2.0), (3, 4.0), (6, 4.0)]:
+        delay = policy.backoff(attempt)
+        print(f"  attempt {attempt}: {delay:.2f}s")
+        assert ceiling / 2 <= delay <= ceiling
+    assert policy.backoff(1, retry_after=3.0) == 3.0
+    assert policy.backoff(1, retry_after=60.0) == 4.0
+    print("=" * 60)
+
+
+def test_transient_errors_are_absorbed():
+    print("\n🧪 TEST: Timeouts and 5xx are retried instead of returned")
+    print("=" * 60)
+    set_response_cache(None)
+    errors = [openai.APITimeoutError(request=None), status_error(openai.InternalServerError, 503)]
+    with retry_settings(RETRY_MAX_ATTEMPTS=3, RETRY_BASE_DELAY=0.01, RETRY_MAX_DELAY=0.02):
+        flaky = FlakyClient(["recovered"], errors)
+        with fake_client(client=flaky):
+            agent = BaseAgent(name="RetryAgent", system_message="You retry.")
+            response = asyncio.run(agent.ask("hello"))
+
+    print(f"✅ Response after {flaky.calls} calls: {response}")
+    assert response == "recovered"
+    assert flaky.calls == 3
+    assert agent.error_count == 1
+    print("=" * 60)
+
+
+def test_non_retryable_fails_fast():
+    print("\n🧪 TEST: Bad requests are not retried")
+    print("=" * 60)
+    set_response_cache(None)
+    errors = [status_error(openai.BadRequestError, 400)] * 3
+    with retry_settings(RETRY_MAX_ATTEMPTS=3, RETRY_BASE_DELAY=0.01):
+        flaky = FlakyClient(["never"], errors)
+        with fake_client(client=flaky):
+            agent = BaseAgent(name="RetryAgent", system_message="You retry.")
+
+            response = asyncio.run(agent.ask("bad"))
+            assert response.startswith("ERROR_CALLING_AGENT")
+            assert flaky.calls == 1
+
+            try:
+                asyncio.run(agent.ask("bad again", raise_on_error=True))
+                raise AssertionError("expected AgentCallError")
+            except AgentCallError as e:
+                print(f"✅ Raised {e.kind} after {e.attempts} attempt(s)")
+                assert e.kind == BAD_REQUEST and e.attempts == 1
+    print("=" * 60)
+
+
+def test_deadline_stops_retries():
+    print("\n🧪 TEST: The deadline caps total retry time")
+    print("=" * 60)
+    set_response_cache(None)
+    errors = [openai.APIConnectionError(request=None)] * 10
+    with retry_settings(RETRY_MAX_ATTEMPTS=10, RETRY_BASE_DELAY=0.2, RETRY_MAX_DELAY=0.2,
+                        RETRY_JITTER=0.0, RETRY_DEADLINE=0.5):
+        flaky = FlakyClient(["never"], errors)
+        with fake_client(client=flaky):
+            agent = BaseAgent(name="RetryAgent", system_message="You retry.")
+            start = time.monotonic()
+            response = asyncio.run(agent.ask("unreachable"))
+            elapsed = time.monotonic() - start
+
+    print(f"✅ Gave up after {flaky.calls} calls in {elapsed:.2f}s: {response[:80]}")
+    assert response.startswith("ERROR")
+    assert flaky.calls == 3
+    assert elapsed < 0.5
+    print("=" * 60)
+
+
+def test_rate_limit_fails_over_without_delay():
+    print("\n🧪 TEST: A 429 fails over to the backup immediately")
+    print("=" * 60)
+    set_response_cache(None)
+    primary = FlakyClient(["unused"], [status_error(openai.RateLimitError, 429, {"retry-after": "30"})])
+    backup = RecordingClient(["from backup"])
+    clients = {Config.PRIMARY_PROVIDER: primary, Config.BACKUP_PROVIDER: backup}
+    with two_providers(cooldown=60, clients=clients):
+        agent = BaseAgent(name="RetryAgent", system_message="You retry.")
+        start = time.monotonic()
+        response = asyncio.run(agent.ask("hello"))
+        elapsed = time.monotonic() - start
+        assert Config.CURRENT_PROVIDER == Config.BACKUP_PROVIDER
+
+    print(f"✅ {response} in {elapsed:.2f}s")
+    assert response == "from backup"
+    assert elapsed < 1
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_classification()
+    test_backoff_bounds()
+    test_transient_errors_are_absorbed()
+    test_non_retryable_fails_fast()
+    test_deadline_stops_retries()
+    test_rate_limit_fails_over_without_delay()
+    print("\n✅ ALL RETRY POLICY TESTS COMPLETE")
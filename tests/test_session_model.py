@@ -0,0 +1,95 @@
+"""
+Test the slotted session model and its serialisation (no API calls)
+"""
+import os
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+os.environ.setdefault("MOCK_MODE", "true")
+
+import json
+from app.session_model import Answer, Evaluation, Progress, QuestionSet, Session, pack, to_plain, unpack
+from app.session_store import estimate_size
+
+
+def make_session():
+    return Session(
+        mode="teach",
+        collaboration_mode="sequential",
+        user_name="Candidate",
+        resume="resume text",
+        jd="jd text",
+        agents={"evaluator": object()},
+        questions=QuestionSet(coding={"q1": "Two sum"}, resume=["Project X?"], behavior=["A conflict?"]),
+        progress=Progress(round=2, resume_index=0, behavior_index=0, answers=[
+            Answer(question="Two sum", answer="hash map",
+                   evaluation=Evaluation(score=8, feedback="Good", recommendations=["Edge cases"])),
+            Answer(question="Project X?", answer="...", evaluation=Evaluation(status="pending")),
+        ]),
+        degraded=[],
+        version=3,
+    )
+
+
+def test_dict_style_access():
+    print("\n🧪 TEST: Records read and write like the dicts they replace")
+    print("=" * 60)
+    sess = make_session()
+    assert sess["progress"]["answers"][0]["evaluation"]["score"] == 8
+    assert sess.get("evaluation_mode", "immediate") == "immediate"
+    assert "evaluation_mode" not in sess
+    sess.setdefault("outbox", []).append("event")
+    assert sess.pop("outbox") == ["event"]
+    assert sess["progress"]["answers"][1]["evaluation"] == {"status": "pending"}
+    try:
+        sess["unknown"] = 1
+        assert False, "unknown fields should be rejected"
+    except KeyError:
+        pass
+    assert not hasattr(sess, "__dict__")
+    print("✅ Dict-style access works on slotted records")
+    print("=" * 60)
+
+
+def test_pack_round_trip():
+    print("\n🧪 TEST: pack/unpack round trip without transient fields")
+    print("=" * 60)
+    sess = make_session()
+    data = pack(sess)
+    restored = unpack(data)
+    print(f"✅ Packed {len(data)} bytes (plain JSON: {len(json.dumps(to_plain(dict(sess, agents=None))))})")
+    assert isinstance(restored, Session)
+    assert isinstance(restored["progress"]["answers"][0], Answer)
+    assert "agents" not in restored
+    assert to_plain(restored) == to_plain({k: v for k, v in sess.items() if k != "agents"})
+    print("=" * 60)
+
+
+def test_legacy_json_sessions_load():
+    print("\n🧪 TEST: Sessions stored as JSON dicts still load")
+    print("=" * 60)
+    legacy = {"mode": "experience", "progress": {"round": 1, "answers": []}}
+    assert unpack(json.dumps(legacy)) == legacy
+    assert unpack(json.dumps(legacy).encode("utf-8")) == legacy
+    print("=" * 60)
+
+
+def test_records_smaller_than_dicts():
+    print("\n🧪 TEST: A session takes less memory as records than as dicts")
+    print("=" * 60)
+    sess = make_session()
+    del sess["agents"]
+    as_records = estimate_size(sess)
+    as_dicts = estimate_size(to_plain(sess))
+    print(f"✅ Records: {as_records} bytes, dicts: {as_dicts} bytes")
+    assert as_records < as_dicts
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_dict_style_access()
+    test_pack_round_trip()
+    test_legacy_json_sessions_load()
+    test_records_smaller_than_dicts()
+    print("\n✅ ALL SESSION MODEL TESTS COMPLETE")
@@ -0,0 +1,346 @@
+"""
+Test the bounded interview session store (no API calls)
+"""
+import os
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+os.environ.setdefault("MOCK_MODE", "true")
+
+import asyncio
+import sqlite3
+import tempfile
+import time
+from app.session_store import (
+    CachedSessionStore, SessionStore, SQLiteSessionStore, SessionConflictError, SPILL_SUFFIX,
+    build_session_store, estimate_size
+)
+from app.config import Config
+from app.metrics import session_evictions_total, sessions_live
+
+
+def make_session(text="resume"):
+    return {
+        "mode": "teach",
+        "resume": text,
+        "agents": {"evaluator": object()},
+        "progress": {"round": 1, "answers": []},
+    }
+
+
+def test_lru_eviction_by_entries():
+    print("\n🧪 TEST: Least recently used sessions are evicted past max_entries")
+    print("=" * 60)
+    evicted = []
+    store = SessionStore(ttl_seconds=0, max_entries=2, on_evict=lambda sid, reason: evicted.append((sid, reason)))
+    store["a"] = make_session()
+    store["b"] = make_session()
+    store["a"]  # 'a' becomes most recently used
+    store["c"] = make_session()
+    print(f"✅ Evicted: {evicted}, live gauge: {sessions_live.value()}")
+    assert "b" not in store
+    assert "a" in store and "c" in store
+    assert evicted == [("b", "entries")]
+    assert sessions_live.value() == 2
+    print("=" * 60)
+
+
+def test_idle_ttl():
+    print("\n🧪 TEST: Idle sessions expire")
+    print("=" * 60)
+    store = SessionStore(ttl_seconds=0.05, max_entries=0)
+    store["a"] = make_session()
+    time.sleep(0.1)
+    assert store.get("a") is None
+    store["b"] = make_session()
+    time.sleep(0.1)
+    assert store.prune() == 1
+    assert len(store) == 0
+    print("=" * 60)
+
+
+def test_byte_limit_tracks_in_place_growth():
+    print("\n🧪 TEST: Sessions growing in place count towards max_bytes")
+    print("=" * 60)
+    small = estimate_size(make_session())
+    store = SessionStore(ttl_seconds=0, max_entries=0, max_bytes=small * 3)
+    store["a"] = make_session()
+    store["b"] = make_session()
+    before = session_evictions_total.value(reason="bytes", action="dropped")
+
+    # The orchestrator mutates sessions it has read
+    store["a"]["progress"]["answers"].append({"answer": "x" * (small * 2)})
+    store["b"]
+    print(f"✅ Memory: {store.memory_bytes} bytes, sessions: {list(store)}")
+    assert "a" not in store
+    assert session_evictions_total.value(reason="bytes", action="dropped") == before + 1
+    print("=" * 60)
+
+
+def test_spill_and_restore():
+    print("\n🧪 TEST: Evicted sessions spill to disk and come back without live agents")
+    print("=" * 60)
+    restored, evicted = [], []
+
+    def restore(sess):
+        restored.append(sess["resume"])
+        sess["agents"] = {"evaluator": "rebuilt"}
+        return sess
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SessionStore(ttl_seconds=60, max_entries=1, spill_dir=tmp, restore=restore,
+                             on_evict=lambda sid, reason: evicted.append((sid, reason)))
+        store["a"] = make_session("first resume")
+        store["b"] = make_session("second resume")
+        assert len(store) == 1
+        assert (Path(tmp) / f"a{SPILL_SUFFIX}").exists()
+
+        sess = store["a"]
+        print(f"✅ Restored: {restored}, stats: {store.get_stats()}")
+        assert sess["resume"] == "first resume"
+        assert sess["agents"] == {"evaluator": "rebuilt"}
+        # 'b' was spilled to make room
+        assert (Path(tmp) / f"b{SPILL_SUFFIX}").exists()
+        del store["b"]
+        assert not (Path(tmp) / f"b{SPILL_SUFFIX}").exists()
+        # Spilled sessions are still alive; only the deletion is reported
+        assert evicted == [("b", "deleted")]
+    print("=" * 60)
+
+
+def test_sqlite_store_survives_restart():
+    print("\n🧪 TEST: SQLite sessions survive a restart and come back with rebuilt agents")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "sessions.sqlite3")
+        store = SQLiteSessionStore(path)
+        store["a"] = make_session("resume text")
+        store.close()
+
+        # A new process (or worker) opening the same file
+        reopened = SQLiteSessionStore(path, restore=lambda sess: dict(sess, agents={"evaluator": "rebuilt"}))
+        sess = reopened["a"]
+        print(f"✅ Reloaded: resume={sess['resume']!r} version={sess['version']}")
+        assert "a" in reopened and len(reopened) == 1
+        assert sess["resume"] == "resume text"
+        assert sess["agents"] == {"evaluator": "rebuilt"}
+        mode = reopened._conn.execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode == "wal"
+        reopened.close()
+    print("=" * 60)
+
+
+def test_sqlite_optimistic_concurrency():
+    print("\n🧪 TEST: Stale writes are rejected and update_session retries on a fresh copy")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "sessions.sqlite3")
+        worker_a = SQLiteSessionStore(path)
+        worker_b = SQLiteSessionStore(path)
+        worker_a["s"] = make_session()
+
+        stale = worker_a["s"]
+        worker_b.update_session("s", lambda sess: sess["progress"]["answers"].append("from b"))
+        stale["progress"]["answers"].append("from a")
+        try:
+            worker_a.save("s", stale)
+            raise AssertionError("stale save was accepted")
+        except SessionConflictError:
+            pass
+
+        # update_session re-reads, so neither change is lost
+        worker_a.update_session("s", lambda sess: sess["progress"]["answers"].append("from a"))
+        answers = worker_b["s"]["progress"]["answers"]
+        print(f"✅ Answers: {answers}, conflicts: {worker_a.conflicts}")
+        assert answers == ["from b", "from a"]
+        assert worker_a.conflicts == 1
+        worker_a.close()
+        worker_b.close()
+    print("=" * 60)
+
+
+def test_sqlite_ttl():
+    print("\n🧪 TEST: SQLite sessions expire after the idle TTL")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteSessionStore(str(Path(tmp) / "sessions.sqlite3"), ttl_seconds=0.05)
+        store["a"] = make_session()
+        time.sleep(0.1)
+        assert "a" not in store
+        assert store.prune() == 1
+        store.close()
+    print("=" * 60)
+
+
+def test_evict_hook_only_for_sessions_gone_for_good():
+    print("\n🧪 TEST: SQLite expiry and deletion call on_evict, hot-cache spills don't")
+    print("=" * 60)
+    evicted = []
+    saved = (Config.SESSION_BACKEND, Config.SESSION_DB_PATH, Config.SESSION_CACHE_ENABLED,
+             Config.SESSION_MAX_ENTRIES, Config.SESSION_TTL_SECONDS)
+    with tempfile.TemporaryDirectory() as tmp:
+        Config.SESSION_BACKEND, Config.SESSION_DB_PATH = "sqlite", str(Path(tmp) / "sessions.sqlite3")
+        Config.SESSION_CACHE_ENABLED, Config.SESSION_MAX_ENTRIES, Config.SESSION_TTL_SECONDS = True, 1, 0.05
+        try:
+            store = build_session_store(on_evict=lambda session_id, reason: evicted.append((session_id, reason)))
+        finally:
+            (Config.SESSION_BACKEND, Config.SESSION_DB_PATH, Config.SESSION_CACHE_ENABLED,
+             Config.SESSION_MAX_ENTRIES, Config.SESSION_TTL_SECONDS) = saved
+        store["a"] = make_session()
+        store["b"] = make_session()
+        store["c"] = make_session()
+        # 'a' and 'b' left the hot cache but are alive in the database
+        assert evicted == []
+        del store["c"]
+        assert evicted == [("c", "deleted")]
+
+        time.sleep(0.1)
+        assert store.prune() == 2
+        print(f"✅ Evictions: {evicted}")
+        assert sorted(evicted[1:]) == [("a", "expired"), ("b", "expired")]
+        store.cold.close()
+    print("=" * 60)
+
+
+def test_background_pruning():
+    print("\n🧪 TEST: Expired sessions are pruned by the background task")
+    print("=" * 60)
+    from app import main
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteSessionStore(str(Path(tmp) / "sessions.sqlite3"), ttl_seconds=0.05)
+        store["a"] = make_session()
+        original, main.SESSIONS = main.SESSIONS, store
+
+        async def run():
+            pruner = asyncio.create_task(main.prune_sessions_periodically(interval=0.05))
+            await asyncio.sleep(0.2)
+            pruner.cancel()
+
+        try:
+            asyncio.run(run())
+        finally:
+            main.SESSIONS = original
+        # Nothing left for a manual prune
+        assert store.prune() == 0
+        store.close()
+    print("=" * 60)
+
+
+def make_cache(path, write_delay=0.05):
+    cold = SQLiteSessionStore(path, restore=lambda sess: dict(sess, agents={"evaluator": "rebuilt"}))
+    return CachedSessionStore(cold, SessionStore(ttl_seconds=0, max_entries=10), write_delay=write_delay)
+
+
+def test_cache_hits_and_detects_stale_entries():
+    print("\n🧪 TEST: The hot cache serves current sessions and reloads ones changed elsewhere")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "sessions.sqlite3")
+        worker_a, worker_b = make_cache(path), make_cache(path)
+        sess = make_session()
+        worker_a["s"] = sess
+
+        assert worker_a["s"] is sess  # live agents kept
+        assert worker_b["s"]["agents"] == {"evaluator": "rebuilt"}
+        worker_b.save("s", dict(worker_b["s"], resume="edited on b"))
+
+        reloaded = worker_a["s"]
+        print(f"✅ Stats: {worker_a.get_stats()['hits']} hits, {worker_a.get_stats()['stale']} stale")
+        assert reloaded["resume"] == "edited on b"
+        assert worker_a.hits == 1 and worker_a.stale == 1
+        assert worker_b.misses == 1
+    print("=" * 60)
+
+
+def test_cache_coalesces_writes():
+    print("\n🧪 TEST: Changes in quick succession are written once")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "sessions.sqlite3")
+        cache = make_cache(path)
+        cache["s"] = make_session()
+
+        async def run():
+            cache.update_session("s", lambda sess: sess["progress"]["answers"].append(1))
+            cache.update_session("s", lambda sess: sess["progress"]["answers"].append(2))
+            buffered = cache.cold.version_of("s")
+            await asyncio.sleep(0.1)
+            return buffered
+
+        buffered = asyncio.run(run())
+        written = cache.cold.version_of("s")
+        print(f"✅ Version while buffered: {buffered}, after write-behind: {written}")
+        assert buffered == 1 and written == 2
+        assert cache.cold["s"]["progress"]["answers"] == [1, 2]
+    print("=" * 60)
+
+
+def test_cache_replays_changes_after_conflict():
+    print("\n🧪 TEST: Buffered changes are replayed on a version saved by another worker")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "sessions.sqlite3")
+        worker_a, worker_b = make_cache(path, write_delay=60), make_cache(path)
+        worker_a["s"] = make_session()
+
+        async def run():
+            worker_a.update_session("s", lambda sess: sess["progress"]["answers"].append("from a"))
+            worker_b.update_session("s", lambda sess: sess["progress"]["answers"].append("from b"))
+            await asyncio.sleep(0.1)  # b's write lands first
+            worker_a.flush()
+
+        asyncio.run(run())
+        answers = worker_b.cold["s"]["progress"]["answers"]
+        print(f"✅ Answers: {answers}")
+        assert answers == ["from b", "from a"]
+        assert worker_a["s"]["progress"]["answers"] == ["from b", "from a"]
+    print("=" * 60)
+
+
+def test_cache_retries_failed_writes():
+    print("\n🧪 TEST: A write that hits a locked database is kept and retried")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "sessions.sqlite3")
+        cache = make_cache(path)
+        cache["s"] = make_session()
+        # Another process holds the write lock past the busy timeout
+        blocker = sqlite3.connect(path)
+        blocker.execute("BEGIN IMMEDIATE")
+
+        async def run():
+            cache.update_session("s", lambda sess: sess["progress"]["answers"].append(1))
+            await asyncio.sleep(0.4)
+            locked = cache.get_stats()["pending_writes"]
+            blocker.rollback()
+            await asyncio.sleep(0.5)
+            return locked
+
+        locked = asyncio.run(run())
+        blocker.close()
+        print(f"✅ Pending while locked: {locked}, version after retry: {cache.cold.version_of('s')}")
+        assert locked == 1
+        assert cache.get_stats()["pending_writes"] == 0
+        assert cache.cold["s"]["progress"]["answers"] == [1]
+        # The connection wasn't left mid-transaction by the failed save
+        assert not cache.cold._conn.in_transaction
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_lru_eviction_by_entries()
+    test_idle_ttl()
+    test_byte_limit_tracks_in_place_growth()
+    test_spill_and_restore()
+    test_sqlite_store_survives_restart()
+    test_sqlite_optimistic_concurrency()
+    test_sqlite_ttl()
+    test_evict_hook_only_for_sessions_gone_for_good()
+    test_background_pruning()
+    test_cache_hits_and_detects_stale_entries()
+    test_cache_coalesces_writes()
+    test_cache_replays_changes_after_conflict()
+    test_cache_retries_failed_writes()
+    print("\n✅ ALL SESSION STORE TESTS COMPLETE")
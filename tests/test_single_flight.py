@@ -0,0 +1,92 @@
+"""
+Test single-flight coalescing of identical in-flight requests (no API calls)
+"""
+import os
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+os.environ.setdefault("MOCK_MODE", "true")
+
+import asyncio
+import gc
+from app.agents.base_agent import BaseAgent, request_coalescer
+from app.llm_cache import set_response_cache
+from app.single_flight import SingleFlight
+from agent_fakes import fake_client
+
+
+def test_single_flight_shares_result():
+    print("\n🧪 TEST: SingleFlight runs the work once")
+    print("=" * 60)
+    flight = SingleFlight("test")
+    runs = []
+
+    async def work():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def run():
+        return await asyncio.gather(*(flight.do("k", work) for _ in range(5)))
+
+    results = asyncio.run(run())
+    print(f"✅ Stats: {flight.get_stats()}")
+    assert results == ["done"] * 5
+    assert len(runs) == 1
+    assert flight.coalesced == 4
+    assert flight.get_stats()["in_flight"] == 0
+    print("=" * 60)
+
+
+def test_concurrent_asks_make_one_provider_call():
+    print("\n🧪 TEST: Concurrent identical asks coalesce")
+    print("=" * 60)
+    set_response_cache(None)
+    request_coalescer.reset_stats()
+
+    async def run():
+        # Separate instances, as /match_score creates one per request
+        agents = [BaseAgent("MatchAgent", "Score the match.") for _ in range(3)]
+        return await asyncio.gather(*(a.ask("same resume and JD") for a in agents))
+
+    with fake_client(["shared answer", "unexpected second call"], delay=0.1) as client:
+        results = asyncio.run(run())
+
+    print(f"✅ Provider calls: {client.calls}, stats: {request_coalescer.get_stats()}")
+    assert results == ["shared answer"] * 3
+    assert client.calls == 1
+    assert request_coalescer.coalesced == 2
+    print("=" * 60)
+
+
+def test_failure_with_no_awaiters_is_retrieved():
+    print("\n🧪 TEST: A shared call that fails after every awaiter left doesn't leak its exception")
+    print("=" * 60)
+    flight = SingleFlight("test")
+    unretrieved = []
+
+    async def failing():
+        await asyncio.sleep(0.05)
+        raise RuntimeError("provider down")
+
+    async def run():
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: unretrieved.append(context))
+        caller = asyncio.ensure_future(flight.do("key", failing))
+        await asyncio.sleep(0.01)
+        caller.cancel()
+        await asyncio.sleep(0.1)
+        gc.collect()
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    print(f"✅ Unretrieved exceptions: {len(unretrieved)}")
+    assert unretrieved == []
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_single_flight_shares_result()
+    test_concurrent_asks_make_one_provider_call()
+    test_failure_with_no_awaiters_is_retrieved()
+    print("\n✅ ALL SINGLE-FLIGHT TESTS COMPLETE")
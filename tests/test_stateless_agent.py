@@ -0,0 +1,70 @@
+"""
+Test stateless agent invocation (no API calls - uses a replay model client)
+"""
+import os
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+os.environ.setdefault("MOCK_MODE", "true")
+
+import asyncio
+from app.agents.base_agent import BaseAgent
+from app.llm_cache import set_response_cache
+from agent_fakes import fake_client
+
+# Every call must reach the model client
+set_response_cache(None)
+
+
+def test_stateless_calls_have_flat_context():
+    print("\n🧪 TEST: Stateless calls do not accumulate context")
+    print("=" * 60)
+    async def run(agent):
+        for prompt in ("a", "b", "c"):
+            await agent.ask(prompt)
+
+    with fake_client(["one", "two", "three"]) as client:
+        asyncio.run(run(BaseAgent("TestAgent", "You are a test agent.", stateless=True)))
+    print(f"✅ Messages per call: {client.message_counts}")
+    assert client.message_counts == [2, 2, 2]
+    print("=" * 60)
+
+
+def test_session_memory_is_opt_in():
+    print("\n🧪 TEST: Session memory is scoped to its session")
+    print("=" * 60)
+    async def run(agent):
+        await agent.ask("a", session_id="s1")
+        await agent.ask("b", session_id="s1")
+        await agent.ask("c", session_id="s2")
+
+    with fake_client(["one", "two", "three"]) as client:
+        agent = BaseAgent("TestAgent", "You are a test agent.", stateless=True)
+        asyncio.run(run(agent))
+    print(f"✅ Messages per call: {client.message_counts}")
+    assert client.message_counts == [2, 4, 2]
+    agent.clear_session_memory("s1")
+    assert agent.get_stats()["sessions_with_memory"] == 1
+    print("=" * 60)
+
+
+def test_stateful_mode_keeps_history():
+    print("\n🧪 TEST: Stateful mode reuses the shared agent")
+    print("=" * 60)
+    async def run(agent):
+        await agent.ask("a")
+        await agent.ask("b")
+
+    with fake_client(["one", "two"]) as client:
+        asyncio.run(run(BaseAgent("TestAgent", "You are a test agent.", stateless=False)))
+    print(f"✅ Messages per call: {client.message_counts}")
+    assert client.message_counts == [2, 4]
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_stateless_calls_have_flat_context()
+    test_session_memory_is_opt_in()
+    test_stateful_mode_keeps_history()
+    print("\n✅ ALL STATELESS AGENT TESTS COMPLETE")
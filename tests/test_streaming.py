@@ -0,0 +1,189 @@
+"""
+Test token streaming from BaseAgent and the SSE endpoints (no API calls)
+"""
+import os
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+os.environ.setdefault("MOCK_MODE", "true")
+
+import asyncio
+import json
+import openai
+from fastapi.testclient import TestClient
+from app.config import Config
+from app.agents.base_agent import BaseAgent
+from app.agents.evaluator_agent import EvaluatorAgent
+from app.agents import orchestrator
+from app.llm_cache import set_response_cache
+from app.main import app
+from agent_fakes import RecordingClient, fake_client, two_providers
+
+EVALUATION = '{"score": 8, "feedback": "Clear explanation of hashing and collisions", "recommendations": ["Mention resizing"]}'
+
+
+class RateLimitResponse:
+    """Just enough of an HTTP response for openai.RateLimitError"""
+    status_code = 429
+    headers = {}
+    request = None
+
+
+class RateLimitedStreamClient(RecordingClient):
+    """Replay client whose first stream fails with a 429 before any chunk"""
+
+    def __init__(self, responses):
+        super().__init__(responses)
+        self.streams = 0
+
+    async def create_stream(self, messages, **kwargs):
+        self.streams += 1
+        if self.streams == 1:
+            raise openai.RateLimitError("Error code: 429", response=RateLimitResponse(), body=None)
+        async for item in super().create_stream(messages, **kwargs):
+            yield item
+
+
+def parse_sse(text):
+    """Split an SSE body into (event, data) tuples"""
+    events = []
+    for block in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+async def collect(stream):
+    return [item async for item in stream]
+
+
+def test_ask_stream_yields_chunks():
+    print("\n🧪 TEST: ask_stream yields the response incrementally")
+    print("=" * 60)
+    set_response_cache(None)
+    with fake_client([EVALUATION]):
+        agent = BaseAgent(name="StreamAgent", system_message="You stream.")
+        chunks = asyncio.run(collect(agent.ask_stream("evaluate this")))
+
+    print(f"✅ {len(chunks)} chunks: {chunks[:3]}...")
+    assert len(chunks) > 1
+    assert "".join(chunks) == EVALUATION
+    assert agent.conversation_history[-1] == {"role": "assistant", "content": EVALUATION}
+    print("=" * 60)
+
+
+def test_stream_retried_under_the_retry_policy():
+    print("\n🧪 TEST: A stream rate limited before its first chunk fails over and still streams")
+    print("=" * 60)
+    set_response_cache(None)
+    primary = RateLimitedStreamClient(["unused"])
+    backup = RateLimitedStreamClient([EVALUATION])
+    backup.streams = 1
+    clients = {Config.PRIMARY_PROVIDER: primary, Config.BACKUP_PROVIDER: backup}
+    with two_providers(cooldown=60, clients=clients):
+        agent = BaseAgent(name="StreamRetryAgent", system_message="You stream.")
+        chunks = asyncio.run(collect(agent.ask_stream("evaluate this")))
+        assert Config.CURRENT_PROVIDER == Config.BACKUP_PROVIDER
+
+    print(f"✅ {len(chunks)} chunks from the backup after the primary's 429")
+    assert primary.streams == 1 and backup.streams == 2
+    assert len(chunks) > 1 and "".join(chunks) == EVALUATION
+    # Retried as a stream, not as a regular call
+    assert primary.calls == 0 and backup.calls == 0
+    print("=" * 60)
+
+
+def test_evaluate_stream_ends_with_parsed_score():
+    print("\n🧪 TEST: evaluate_stream emits tokens, then the parsed evaluation")
+    print("=" * 60)
+    set_response_cache(None)
+    with fake_client([EVALUATION]):
+        evaluator = EvaluatorAgent()
+        events = asyncio.run(collect(evaluator.evaluate_stream("What is a hash map?", "A table...")))
+
+    kinds = [event for event, _ in events]
+    print(f"✅ Events: {kinds}")
+    assert kinds[-1] == "evaluation" and kinds.count("token") > 1
+    assert events[-1][1]["score"] == 8
+    print("=" * 60)
+
+
+def test_submit_answer_sse():
+    print("\n🧪 TEST: /submit_answer/stream sends token events and a result")
+    print("=" * 60)
+    set_response_cache(None)
+    client = TestClient(app)
+
+    missing = client.post("/submit_answer/stream", json={
+        "session_id": "missing", "question": "q", "answer": "a"
+    })
+    assert missing.status_code == 404
+
+    saved_mode = Config.MOCK_MODE
+    with fake_client([EVALUATION]):
+        Config.MOCK_MODE = False
+        try:
+            orchestrator.SESSIONS["stream-test"] = {
+                "collaboration_mode": "sequential",
+                "agents": {"evaluator": EvaluatorAgent()},
+                "questions": {"coding": {"q2_easy": "Easy follow-up", "q2_hard": "Hard follow-up"}},
+                "progress": {"round": 1, "answers": [], "resume_index": 0, "behavior_index": 0},
+            }
+            response = client.post("/submit_answer/stream", json={
+                "session_id": "stream-test",
+                "question": "What is a hash map?",
+                "answer": "A table of buckets keyed by hash"
+            })
+        finally:
+            Config.MOCK_MODE = saved_mode
+            orchestrator.SESSIONS.pop("stream-test", None)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_sse(response.text)
+    tokens = "".join(data["text"] for event, data in events if event == "token")
+    event, result = events[-1]
+    print(f"✅ {len(events) - 1} token events, final: {event} score={result['evaluation']['score']}")
+    assert tokens == EVALUATION
+    assert event == "result"
+    assert result["next_question"] == "Hard follow-up"
+    print("=" * 60)
+
+
+def test_report_stream_failure_skips_repair():
+    print("\n🧪 TEST: A failed report stream ends with the error as the raw report, no repair call")
+    print("=" * 60)
+    set_response_cache(None)
+    saved_mode = Config.MOCK_MODE
+    # No responses left: every call fails
+    with fake_client([]) as client:
+        Config.MOCK_MODE = False
+        try:
+            orchestrator.SESSIONS["report-stream-test"] = {
+                "collaboration_mode": "sequential",
+                "agents": {"evaluator": EvaluatorAgent()},
+                "progress": {"round": 2, "answers": [{
+                    "question": "What is a hash map?", "answer": "A table",
+                    "evaluation": {"score": 8, "feedback": "Good", "recommendations": []}
+                }], "resume_index": 0, "behavior_index": 0},
+            }
+            events = asyncio.run(collect(orchestrator.generate_report_stream("report-stream-test")))
+        finally:
+            Config.MOCK_MODE = saved_mode
+            orchestrator.SESSIONS.pop("report-stream-test", None)
+
+    print(f"✅ Events: {[event for event, _ in events]}")
+    assert [event for event, _ in events] == ["report"]
+    assert events[0][1]["report"]["raw"].startswith("ERROR")
+    assert client.calls == 0
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_ask_stream_yields_chunks()
+    test_stream_retried_under_the_retry_policy()
+    test_evaluate_stream_ends_with_parsed_score()
+    test_submit_answer_sse()
+    test_report_stream_failure_skips_repair()
+    print("\n✅ ALL STREAMING TESTS COMPLETE")
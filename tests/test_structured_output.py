@@ -0,0 +1,118 @@
+"""
+Test structured (schema-validated) output for evaluations and reports (no API calls)
+"""
+import os
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+os.environ.setdefault("MOCK_MODE", "true")
+
+import asyncio
+from app.models import EvaluationResult, InterviewReport
+from app.structured_output import parse_structured
+from app.agents.evaluator_agent import EvaluatorAgent
+from app.llm_cache import ResponseCache, MemoryLRUTier, set_response_cache
+from app.metrics import structured_outputs_total
+from agent_fakes import RecordingClient, fake_client
+
+VALID = '{"score": 7, "feedback": "Solid answer", "recommendations": ["Discuss trade-offs"]}'
+
+
+class StructuredClient(RecordingClient):
+    """Replay client that advertises native structured output and records the requested schema"""
+
+    def __init__(self, responses):
+        super().__init__(responses)
+        self.json_outputs = []
+
+    @property
+    def model_info(self):
+        return dict(super().model_info, json_output=True, structured_output=True)
+
+    async def create(self, messages, **kwargs):
+        self.json_outputs.append(kwargs.get("json_output"))
+        return await super().create(messages, **kwargs)
+
+
+def test_parse_structured_variants():
+    print("\n🧪 TEST: Bare, fenced and prose-wrapped JSON all parse; bad values don't")
+    print("=" * 60)
+    assert parse_structured(VALID, EvaluationResult).score == 7
+    assert parse_structured(f"```json\n{VALID}\n```", EvaluationResult).score == 7
+    assert parse_structured(f"Here you go:\n{VALID}\nThanks", EvaluationResult).score == 7
+    assert parse_structured('{"score": 42, "feedback": "x"}', EvaluationResult) is None
+    # Half points are rounded instead of failing validation
+    assert parse_structured('{"score": 7.5, "feedback": "x"}', EvaluationResult).score == 8
+    assert parse_structured("no json here", EvaluationResult) is None
+    # Empty or unrelated objects aren't a report
+    assert parse_structured("{}", InterviewReport) is None
+    assert parse_structured('{"score": 7, "feedback": "x"}', InterviewReport) is None
+    print("=" * 60)
+
+
+def test_native_structured_output():
+    print("\n🧪 TEST: Providers with structured output get the schema as response format")
+    print("=" * 60)
+    set_response_cache(None)
+    with fake_client(client=StructuredClient([VALID])) as client:
+        result = asyncio.run(EvaluatorAgent().evaluate("Reverse a list", "Use two pointers"))
+    print(f"✅ Result: {result}")
+    assert result["score"] == 7
+    assert client.json_outputs == [EvaluationResult]
+    print("=" * 60)
+
+
+def test_invalid_response_is_repaired():
+    print("\n🧪 TEST: A response that doesn't validate gets one repair call")
+    print("=" * 60)
+    set_response_cache(None)
+    before = structured_outputs_total.value(agent="EvaluatorAgent", method="evaluate", outcome="repaired")
+    with fake_client(["Score: 7. Good job overall!", VALID]) as client:
+        result = asyncio.run(EvaluatorAgent().evaluate("Reverse a list", "Use two pointers"))
+    print(f"✅ Result after repair: {result}")
+    assert result["score"] == 7 and result["feedback"] == "Solid answer"
+    assert client.calls == 2
+    after = structured_outputs_total.value(agent="EvaluatorAgent", method="evaluate", outcome="repaired")
+    assert after == before + 1
+    print("=" * 60)
+
+
+def test_native_validation_failure_falls_back():
+    print("\n🧪 TEST: Invalid native output falls back to a prompt JSON request")
+    print("=" * 60)
+    set_response_cache(None)
+    with fake_client(client=StructuredClient(["not json", VALID])) as client:
+        result = asyncio.run(EvaluatorAgent().evaluate("Reverse a list", "Use two pointers"))
+    print(f"✅ Result: {result}")
+    assert result["score"] == 7
+    # Second call is the plain (prompt JSON) request
+    assert client.json_outputs == [EvaluationResult, None]
+    print("=" * 60)
+
+
+def test_only_valid_responses_are_cached():
+    print("\n🧪 TEST: Responses that fail validation are not cached")
+    print("=" * 60)
+    set_response_cache(ResponseCache([MemoryLRUTier()]))
+    try:
+        with fake_client(["garbage", VALID, VALID]) as client:
+            evaluator = EvaluatorAgent()
+            first = asyncio.run(evaluator.evaluate("Q", "A"))
+            second = asyncio.run(evaluator.evaluate("Q", "A"))
+    finally:
+        set_response_cache(None)
+    print(f"✅ First: {first['score']}, second: {second['score']}, calls: {client.calls}")
+    assert first["score"] == second["score"] == 7
+    # garbage + repair, then a fresh call because garbage wasn't cached
+    assert client.calls == 3
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_parse_structured_variants()
+    test_native_structured_output()
+    test_invalid_response_is_repaired()
+    test_native_validation_failure_falls_back()
+    test_only_valid_responses_are_cached()
+    print("\n✅ ALL STRUCTURED OUTPUT TESTS COMPLETE")